@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Activity Scheduler - เลือกว่าแท่งนี้ควรประเมิน symbol ไหนบ้าง ตามความเคลื่อนไหวล่าสุด
+
+แต่ละ symbol มีคะแนน activity จาก kline ชุดล่าสุดที่ประเมิน:
+- volume spike: volume เฉลี่ยช่วงสั้น / ช่วงยาว
+- ATR expansion: true range เฉลี่ยช่วงสั้น / ช่วงยาว
+- ความใกล้ breakout: ระยะจาก close ถึง high/low ของ N แท่งก่อนหน้า (หน่วย ATR)
+
+คะแนนสูง -> ประเมินทุกแท่ง, คะแนนต่ำ -> เว้นได้สูงสุด max_interval แท่ง
+symbol ที่มี position เปิดอยู่ หรือยังไม่เคยประเมิน ถูกประเมินทุกแท่งเสมอ
+budget (ถ้าตั้ง) จำกัดจำนวน symbol ต่อแท่ง โดยเลือกตาม priority
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+def activity_score(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                   fast: int = 5, slow: int = 50, breakout: int = 20) -> float:
+    """
+    คะแนน activity (~1.2 เมื่อตลาดปกติ)
+
+    max(volume ratio, ATR ratio) + proximity โดย proximity = 1 เมื่ออยู่ที่ระดับ breakout,
+    0.5 เมื่อห่าง 1 ATR
+    """
+    if len(close) < breakout + 2:
+        return float('inf')  # ข้อมูลไม่พอ ถือว่าต้องดู
+    previous_close = np.concatenate(([close[0]], close[:-1]))
+    true_range = np.maximum(high, previous_close) - np.minimum(low, previous_close)
+    atr = true_range[-slow:].mean()
+    if atr <= 0:
+        return 0.0
+    atr_ratio = true_range[-fast:].mean() / atr
+    volume_mean = volume[-slow:].mean()
+    volume_ratio = volume[-fast:].mean() / volume_mean if volume_mean > 0 else 0.0
+
+    level_high = high[-breakout - 1:-1].max()
+    level_low = low[-breakout - 1:-1].min()
+    distance = min(level_high - close[-1], close[-1] - level_low) / atr
+    proximity = 1.0 / (1.0 + max(distance, 0.0))
+    return float(max(atr_ratio, volume_ratio) + proximity)
+
+
+class ActivityScheduler:
+    def __init__(self, max_interval: int = 5, hot_score: float = 2.0, quiet_score: float = 1.2,
+                 budget: int = 0):
+        """
+        Args:
+            max_interval: symbol ที่เงียบที่สุดถูกประเมินทุกกี่แท่ง
+            hot_score: คะแนนตั้งแต่นี้ขึ้นไปประเมินทุกแท่ง
+            quiet_score: คะแนนตั้งแต่นี้ลงไปประเมินทุก max_interval แท่ง (ระหว่างนั้นไล่แบบเส้นตรง)
+            budget: จำนวน symbol สูงสุดต่อแท่ง (0 = ไม่จำกัด)
+        """
+        self.max_interval = max_interval
+        self.hot_score = hot_score
+        self.quiet_score = quiet_score
+        self.budget = budget
+        self.scores: Dict[str, float] = {}
+        self.last_tick: Dict[str, int] = {}
+
+    def update(self, symbol: str, columns: Dict[str, np.ndarray]):
+        """บันทึกคะแนนจาก kline ที่เพิ่งใช้ประเมิน symbol"""
+        self.scores[symbol] = activity_score(columns['high'], columns['low'],
+                                             columns['close'], columns['volume'])
+
+    def interval(self, symbol: str) -> int:
+        """ประเมิน symbol นี้ทุกกี่แท่ง"""
+        score = self.scores.get(symbol, float('inf'))
+        if score >= self.hot_score:
+            return 1
+        if score <= self.quiet_score:
+            return self.max_interval
+        fraction = (self.hot_score - score) / (self.hot_score - self.quiet_score)
+        return 1 + int(round(fraction * (self.max_interval - 1)))
+
+    def select(self, symbols: Iterable[str], tick: int, open_positions: Iterable[str] = ()) -> List[str]:
+        """
+        symbol ที่ต้องประเมินในแท่ง `tick` (เช่น close_ms // interval_ms) เรียงตาม priority
+
+        symbol ที่ถูกเลือกถือว่าประเมินแล้วที่ tick นี้
+        """
+        open_positions = set(open_positions)
+        due = []
+        for symbol in symbols:
+            interval = 1 if symbol in open_positions else self.interval(symbol)
+            waited = tick - self.last_tick.setdefault(symbol, tick - interval)
+            if waited >= interval:
+                # position ก่อน, แล้วตามสัดส่วนที่เลยกำหนด (กัน symbol ที่ถูกข้ามอดตลอด), แล้วตามคะแนน
+                priority = (symbol in open_positions, waited / interval, self.scores.get(symbol, float('inf')))
+                due.append((priority, symbol))
+
+        due.sort(key=lambda item: item[0], reverse=True)
+        selected = [symbol for _, symbol in due]
+        if self.budget:
+            selected = selected[:self.budget]
+        for symbol in selected:
+            self.last_tick[symbol] = tick
+        return selected
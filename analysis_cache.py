@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Analysis Cache - cache ผลวิเคราะห์ต่อ symbol แบบจำกัดขนาด (LRU) และมี TTL ต่อ entry
+
+แทน dict ที่ key เป็น "symbol_ชั่วโมง" (ไม่เคยลบ และหมดอายุพร้อมกันทุก symbol ต้นชั่วโมง):
+- TTL ของแต่ละ entry สุ่มลดลงไม่เกิน jitter -> การวิเคราะห์ใหม่กระจายไปทั้งชั่วโมง
+- เมื่ออายุเกิน refresh_ahead ของ TTL entry ถูกบอกว่าควร refresh (ผู้ใช้ refresh ใน background)
+  ระหว่างนั้นยังคืนค่าเดิมได้ (stale) จึงไม่ต้องรอ network บน path ที่เทรด
+- เกิน max_entries -> ลบ entry ที่ใช้ล่าสุดนานที่สุด
+"""
+
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int = 512, ttl: float = 3600, jitter: float = 0.2,
+                 refresh_ahead: float = 0.8, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            max_entries: จำนวน entry สูงสุด (LRU)
+            ttl: อายุสูงสุดของ entry (วินาที)
+            jitter: สัดส่วนของ TTL ที่สุ่มลดลงต่อ entry (0.2 = อายุ 80-100% ของ ttl)
+            refresh_ahead: สัดส่วนของอายุ entry ที่เริ่มควร refresh
+            clock: แหล่งเวลา (replay ส่งนาฬิกาจำลอง)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.jitter = jitter
+        self.refresh_ahead = refresh_ahead
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def set(self, key: Hashable, value: Any, age: float = 0):
+        """เก็บค่า (age = อายุของค่าแล้วตอนเก็บ เช่นค่าที่โหลดจาก snapshot)"""
+        now = self.clock() - age
+        lifetime = self.ttl * (1 - random.uniform(0, self.jitter))
+        self._entries[key] = {
+            'value': value,
+            'stored_at': now,
+            'refresh_at': now + lifetime * self.refresh_ahead,
+            'expires_at': now + lifetime,
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[Any]:
+        """ค่าใน cache (None ถ้าไม่มี หรือหมดอายุและไม่ allow_stale)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if self.clock() >= entry['expires_at']:
+            if not allow_stale:
+                self.misses += 1
+                return None
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        self._entries.move_to_end(key)
+        return entry['value']
+
+    def needs_refresh(self, key: Hashable) -> bool:
+        """ไม่มี entry หรืออายุเลยจุด refresh-ahead แล้ว"""
+        entry = self._entries.get(key)
+        return entry is None or self.clock() >= entry['refresh_at']
+
+    def items(self) -> Iterator[Tuple[Hashable, Any, float]]:
+        """(key, value, อายุเป็นวินาที) ของทุก entry จากเก่าไปใหม่ตามการใช้งาน"""
+        now = self.clock()
+        for key, entry in list(self._entries.items()):
+            yield key, entry['value'], now - entry['stored_at']
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
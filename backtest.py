@@ -1,20 +1,25 @@
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
-import json
 import os
 from loguru import logger
 import config
 from trading_bot import TradingBot
+from backtest_store import BacktestResultStore
+from backtest_plots import ReportRenderer, render_report
+from exit_engine import ExitEngine
+from performance_stats import StreamingStats
+from checkpoint import CheckpointStore
+from kline_store import KlineStore, interval_to_ms, klines_to_columns
 import asyncio
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List, Tuple
+import sys
+from typing import Dict, List, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
 class BacktestEngine:
-    def __init__(self, start_date: str, end_date: str, initial_balance: float = 1000):
+    def __init__(self, start_date: str, end_date: str, initial_balance: float = 1000,
+                 max_hold_candles: int = 10, checkpoint_every: int = 500,
+                 trading_bot: TradingBot = None):
         """
         Initialize backtest engine
         
@@ -22,23 +27,26 @@ class BacktestEngine:
             start_date: Start date in 'YYYY-MM-DD' format
             end_date: End date in 'YYYY-MM-DD' format
             initial_balance: Initial balance in USDT
+            max_hold_candles: Time-based exit after this many candles
+            checkpoint_every: Save a resumable checkpoint every N candles (0 = off)
+            trading_bot: Bot used for indicators/signals (default: new TradingBot with a live client)
         """
         self.start_date = datetime.strptime(start_date, '%Y-%m-%d')
         self.end_date = datetime.strptime(end_date, '%Y-%m-%d')
         self.initial_balance = initial_balance
         self.current_balance = initial_balance
-        self.trading_bot = TradingBot()
+        self.max_hold_candles = max_hold_candles
+        self.trading_bot = trading_bot or TradingBot()
+        self.result_store = BacktestResultStore()
+        self.checkpoint_store = CheckpointStore()
+        self.kline_store = KlineStore()
+        self.checkpoint_every = checkpoint_every
         self.trades = []
-        self.daily_returns = []
         self.strategy_performance = {}
         self.signal_counts = {}
         
-        # Performance metrics
-        self.total_trades = 0
-        self.winning_trades = 0
-        self.losing_trades = 0
-        self.max_drawdown = 0
-        self.peak_balance = initial_balance
+        # Performance metrics (online: O(1) per trade / per candle)
+        self.stats = StreamingStats(initial_balance)
         
         # Strategy tracking
         self.strategy_signals = {
@@ -59,6 +67,79 @@ class BacktestEngine:
             'momentum_based': 0
         }
 
+    @property
+    def total_trades(self) -> int:
+        return self.stats.total_trades
+
+    @property
+    def winning_trades(self) -> int:
+        return self.stats.winning_trades
+
+    @property
+    def losing_trades(self) -> int:
+        return self.stats.losing_trades
+
+    @property
+    def max_drawdown(self) -> float:
+        return self.stats.max_drawdown
+
+    @property
+    def peak_balance(self) -> float:
+        return self.stats.peak_balance
+
+    @property
+    def daily_returns(self) -> List[Dict]:
+        return self.stats.equity_curve
+
+    def reset(self):
+        """รีเซ็ต balance และสถิติก่อนรัน symbol ถัดไป"""
+        self.current_balance = self.initial_balance
+        self.trades = []
+        self.stats = StreamingStats(self.initial_balance)
+        self.strategy_signals = {k: 0 for k in self.strategy_signals}
+        self.strategy_wins = {k: 0 for k in self.strategy_wins}
+
+    @property
+    def period(self) -> Tuple[str, str]:
+        return self.start_date.strftime('%Y-%m-%d'), self.end_date.strftime('%Y-%m-%d')
+
+    def get_state(self) -> Dict:
+        """state ของ engine (balance, trades, สถิติสะสม) สำหรับ checkpoint"""
+        return {
+            'current_balance': self.current_balance,
+            'trades': self.trades,
+            'stats': self.stats.to_state(),
+            'strategy_signals': dict(self.strategy_signals),
+            'strategy_wins': dict(self.strategy_wins),
+        }
+
+    def load_state(self, state: Dict):
+        """คืนค่า state ที่ได้จาก get_state()"""
+        self.current_balance = state['current_balance']
+        self.trades = state['trades']
+        self.stats = StreamingStats.from_state(state['stats'])
+        self.strategy_signals = dict(state['strategy_signals'])
+        self.strategy_wins = dict(state['strategy_wins'])
+
+    @staticmethod
+    def checkpoint_name(symbol: str, interval: str) -> str:
+        return f"backtest_{symbol}_{interval}"
+
+    def load_cached_klines(self, symbol: str, interval: str) -> pd.DataFrame:
+        """โหลดข้อมูลจาก KlineStore ถ้าครอบคลุมช่วงวันที่ครบ (ไม่งั้นคืน DataFrame ว่าง)"""
+        try:
+            step = interval_to_ms(interval)
+            start_ms = pd.Timestamp(self.start_date).value // 1_000_000
+            end_ms = pd.Timestamp(self.end_date).value // 1_000_000
+            open_time = self.kline_store.load(symbol, interval, start_ms, end_ms, columns=['open_time'])['open_time']
+            if len(open_time) < (end_ms - start_ms) // step:
+                return pd.DataFrame()
+            df = self.kline_store.load_frame(symbol, interval, start_ms, end_ms)
+            logger.info(f"Loaded {len(df)} cached {interval} candles for {symbol}")
+            return df
+        except (FileNotFoundError, ValueError):
+            return pd.DataFrame()
+
     async def get_historical_data(self, symbol: str, interval: str = '15m') -> pd.DataFrame:
         """Get historical data from Binance"""
         try:
@@ -72,6 +153,11 @@ class BacktestEngine:
             }
             binance_interval = interval_map.get(interval, '3m')
             
+            # Candles fetched by an earlier (possibly interrupted) run
+            cached = self.load_cached_klines(symbol, binance_interval)
+            if not cached.empty:
+                return cached
+            
             # Calculate total days needed
             days_diff = (self.end_date - self.start_date).days
             
@@ -149,6 +235,12 @@ class BacktestEngine:
                 logger.error("No historical data received from any batch")
                 return pd.DataFrame()
             
+            # Keep what was fetched so a resumed run does not hit the API again
+            try:
+                self.kline_store.merge(symbol, binance_interval, klines_to_columns(all_data))
+            except Exception as e:
+                logger.warning(f"Could not cache klines for {symbol}: {e}")
+            
             # Convert to DataFrame
             df = pd.DataFrame(all_data, columns=[
                 'timestamp', 'open', 'high', 'low', 'close', 'volume',
@@ -331,7 +423,8 @@ class BacktestEngine:
             logger.error(f"Error determining trade signal: {e}")
             return "NONE", "error"
 
-    def execute_trade(self, signal: str, entry_price: float, timestamp: datetime, strategy: str) -> Dict:
+    def execute_trade(self, signal: str, entry_price: float, timestamp: datetime, strategy: str,
+                      entry_index: int = None) -> Dict:
         """Execute a trade and return trade details"""
         try:
             # Calculate position size (simplified for backtest)
@@ -343,7 +436,8 @@ class BacktestEngine:
                 'entry_price': entry_price,
                 'position_size': position_size,
                 'strategy': strategy,
-                'balance_before': self.current_balance
+                'balance_before': self.current_balance,
+                'entry_index': entry_index
             }
             
             return trade
@@ -352,7 +446,8 @@ class BacktestEngine:
             logger.error(f"Error executing trade: {e}")
             return {}
 
-    def close_trade(self, trade: Dict, exit_price: float, timestamp: datetime) -> float:
+    def close_trade(self, trade: Dict, exit_price: float, timestamp: datetime,
+                    exit_reason: str = None, exit_index: int = None) -> float:
         """Close a trade and calculate P&L"""
         try:
             if trade['signal'] == "BUY":
@@ -368,22 +463,14 @@ class BacktestEngine:
             trade['exit_timestamp'] = timestamp
             trade['pnl'] = pnl
             trade['balance_after'] = self.current_balance
+            trade['exit_reason'] = exit_reason
+            if exit_index is not None and trade.get('entry_index') is not None:
+                trade['candles_held'] = exit_index - trade['entry_index']
             
-            # Update statistics
-            self.total_trades += 1
+            # Update statistics (counters, Welford P&L, peak / drawdown)
+            self.stats.record_trade(pnl, trade['strategy'], timestamp, self.current_balance)
             if pnl > 0:
-                self.winning_trades += 1
                 self.strategy_wins[trade['strategy']] += 1
-            else:
-                self.losing_trades += 1
-            
-            # Update peak balance and drawdown
-            if self.current_balance > self.peak_balance:
-                self.peak_balance = self.current_balance
-            else:
-                drawdown = (self.peak_balance - self.current_balance) / self.peak_balance
-                if drawdown > self.max_drawdown:
-                    self.max_drawdown = drawdown
             
             return pnl
             
@@ -391,8 +478,8 @@ class BacktestEngine:
             logger.error(f"Error closing trade: {e}")
             return 0
 
-    async def run_backtest(self, symbol: str, interval: str = '3m') -> Dict:
-        """Run complete backtest"""
+    async def run_backtest(self, symbol: str, interval: str = '3m', resume: bool = False) -> Dict:
+        """Run complete backtest (resume=True ทำต่อจาก checkpoint ล่าสุดของ symbol นี้)"""
         try:
             logger.info(f"Starting backtest for {symbol} from {self.start_date} to {self.end_date}")
             
@@ -407,15 +494,59 @@ class BacktestEngine:
             # Initialize variables
             current_position = None
             current_trade = None
+            planned_exit = None
+            
+            # TP / SL / trailing stop / max-hold are resolved on the price arrays
+            # once per entry instead of being re-checked candle by candle
+            exit_engine = ExitEngine(
+                df['high'].values, df['low'].values, df['close'].values, df['open'].values,
+                max_hold=self.max_hold_candles
+            )
+            
+            start_index = 100  # Start from 100 to have enough data for indicators
+            checkpoint_name = self.checkpoint_name(symbol, interval)
+            if resume:
+                checkpoint = self.checkpoint_store.load(checkpoint_name)
+                if checkpoint and checkpoint['period'] == self.period and checkpoint['candles'] == len(df):
+                    self.load_state(checkpoint['engine'])
+                    start_index = checkpoint['next_index']
+                    current_position = checkpoint['current_position']
+                    current_trade = self.trades[-1] if current_position else None
+                    planned_exit = checkpoint['planned_exit']
+                    logger.info(f"Resuming {symbol} backtest from candle {start_index}/{len(df)}")
+                elif checkpoint:
+                    logger.warning(f"Checkpoint for {symbol} does not match this run, starting over")
             
             # Process each candle
-            for i in range(100, len(df)):  # Start from 100 to have enough data for indicators
+            for i in range(start_index, len(df)):
+                if self.checkpoint_every and i > start_index and (i - start_index) % self.checkpoint_every == 0:
+                    self.checkpoint_store.save(checkpoint_name, {
+                        'period': self.period,
+                        'candles': len(df),
+                        'next_index': i,
+                        'current_position': current_position,
+                        'planned_exit': planned_exit,
+                        'engine': self.get_state(),
+                    })
                 try:
                     # Get current data window
                     current_df = df.iloc[:i+1].copy()
                     current_price = float(current_df['close'].iloc[-1])
                     current_timestamp = current_df['timestamp'].iloc[-1]
                     
+                    # Track balance / drawdown; daily returns are bucketed by timestamp
+                    self.stats.update_balance(current_timestamp, self.current_balance)
+                    
+                    # Close on the bar where the exit engine found TP / stop / max-hold
+                    if current_trade and planned_exit and i == planned_exit[0]:
+                        exit_index, exit_price, exit_reason = planned_exit
+                        pnl = self.close_trade(current_trade, exit_price, current_timestamp, exit_reason, exit_index)
+                        logger.info(f"Closed {current_position} position at {exit_price} ({exit_reason}), P&L: {pnl:.2f}")
+                        current_position = None
+                        current_trade = None
+                        planned_exit = None
+                        continue
+                    
                     # Calculate indicators
                     current_df = self.calculate_indicators(current_df)
                     
@@ -432,37 +563,22 @@ class BacktestEngine:
                     # Execute trades
                     if signal and signal != "NONE" and current_position is None:
                         # Open new position
-                        current_trade = self.execute_trade(signal, current_price, current_timestamp, strategy)
+                        current_trade = self.execute_trade(signal, current_price, current_timestamp, strategy, i)
                         current_position = signal
+                        planned_exit = exit_engine.find_exit(i, signal, current_price)
                         self.trades.append(current_trade)
                         logger.info(f"Opened {signal} position at {current_price} using {strategy}")
                         
-                    elif current_position and current_trade:
-                        # Check exit conditions (simplified - exit after 10 candles or on opposite signal)
-                        candles_held = i - len([t for t in self.trades if t == current_trade])
-                        exit_condition = (
-                            (signal and signal != "NONE" and signal != current_position) or  # Opposite signal
-                            candles_held >= 10  # Time-based exit
-                        )
+                    elif current_position and current_trade and signal and signal != "NONE" and signal != current_position:
+                        # Opposite signal before the planned exit
+                        pnl = self.close_trade(current_trade, current_price, current_timestamp, 'opposite_signal', i)
+                        logger.info(f"Closed {current_position} position at {current_price}, P&L: {pnl:.2f}")
                         
-                        if exit_condition:
-                            # Close position
-                            pnl = self.close_trade(current_trade, current_price, current_timestamp)
-                            logger.info(f"Closed {current_position} position at {current_price}, P&L: {pnl:.2f}")
-                            
-                            # Reset position
-                            current_position = None
-                            current_trade = None
+                        # Reset position
+                        current_position = None
+                        current_trade = None
+                        planned_exit = None
                     
-                    # Track daily returns
-                    if i % 96 == 0:  # Daily (96 candles for 15m)
-                        daily_return = (self.current_balance - self.initial_balance) / self.initial_balance
-                        self.daily_returns.append({
-                            'date': current_timestamp.date(),
-                            'balance': self.current_balance,
-                            'return': daily_return
-                        })
-                        
                 except Exception as e:
                     logger.error(f"Error processing candle {i}: {e}")
                     continue
@@ -471,11 +587,15 @@ class BacktestEngine:
             if current_position and current_trade:
                 final_price = float(df['close'].iloc[-1])
                 final_timestamp = df['timestamp'].iloc[-1]
-                pnl = self.close_trade(current_trade, final_price, final_timestamp)
+                pnl = self.close_trade(current_trade, final_price, final_timestamp, 'end_of_data', len(df) - 1)
                 logger.info(f"Closed final position, P&L: {pnl:.2f}")
             
             # Calculate final statistics
-            return self.calculate_statistics()
+            results = self.calculate_statistics()
+            if results:
+                results['symbol'] = symbol
+                results['interval'] = interval
+            return results
             
         except Exception as e:
             logger.error(f"Error running backtest: {e}")
@@ -484,17 +604,9 @@ class BacktestEngine:
     def calculate_statistics(self) -> Dict:
         """Calculate comprehensive backtest statistics"""
         try:
-            # Basic statistics
-            total_return = (self.current_balance - self.initial_balance) / self.initial_balance * 100
-            win_rate = (self.winning_trades / self.total_trades * 100) if self.total_trades > 0 else 0
-            
-            # Calculate average trade metrics
-            if self.trades:
-                avg_win = np.mean([t['pnl'] for t in self.trades if t['pnl'] > 0]) if any(t['pnl'] > 0 for t in self.trades) else 0
-                avg_loss = np.mean([t['pnl'] for t in self.trades if t['pnl'] < 0]) if any(t['pnl'] < 0 for t in self.trades) else 0
-                profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else float('inf')
-            else:
-                avg_win = avg_loss = profit_factor = 0
+            # Close the last return period, then read the running metrics
+            daily_returns = self.stats.finalize()
+            metrics = self.stats.snapshot()
             
             # Strategy performance
             strategy_performance = {}
@@ -507,42 +619,24 @@ class BacktestEngine:
                         'win_rate': win_rate_strategy
                     }
             
-            # Calculate Sharpe ratio (simplified)
-            if self.daily_returns:
-                returns = [d['return'] for d in self.daily_returns]
-                sharpe_ratio = np.mean(returns) / np.std(returns) if np.std(returns) > 0 else 0
-            else:
-                sharpe_ratio = 0
-            
-            return {
-                'initial_balance': self.initial_balance,
-                'final_balance': self.current_balance,
-                'total_return_pct': total_return,
-                'total_trades': self.total_trades,
-                'winning_trades': self.winning_trades,
-                'losing_trades': self.losing_trades,
-                'win_rate_pct': win_rate,
-                'avg_win': avg_win,
-                'avg_loss': avg_loss,
-                'profit_factor': profit_factor,
-                'max_drawdown_pct': self.max_drawdown * 100,
-                'sharpe_ratio': sharpe_ratio,
+            metrics['final_balance'] = self.current_balance
+            metrics.update({
                 'strategy_performance': strategy_performance,
                 'strategy_signals': self.strategy_signals,
                 'trades': self.trades,
-                'daily_returns': self.daily_returns
-            }
+                'daily_returns': daily_returns
+            })
+            return metrics
             
         except Exception as e:
             logger.error(f"Error calculating statistics: {e}")
             return {}
 
-    def generate_report(self, results: Dict, output_file: str = 'backtest_report.json'):
+    def generate_report(self, results: Dict, output_name: str = 'backtest_report'):
         """Generate comprehensive backtest report"""
         try:
-            # Save detailed results
-            with open(output_file, 'w') as f:
-                json.dump(results, f, indent=2, default=str)
+            # Save detailed results (columnar tables + summary.json)
+            output_path = self.result_store.save(results, output_name)
             
             # Generate summary report
             summary = f"""
@@ -570,7 +664,7 @@ STRATEGY PERFORMANCE:
             with open('backtest_summary.txt', 'w') as f:
                 f.write(summary)
             
-            logger.info(f"Backtest report saved to {output_file}")
+            logger.info(f"Backtest report saved to {output_path}")
             logger.info(f"Summary saved to backtest_summary.txt")
             
             return summary
@@ -579,59 +673,18 @@ STRATEGY PERFORMANCE:
             logger.error(f"Error generating report: {e}")
             return ""
 
-    def plot_results(self, results: Dict):
-        """Generate performance charts"""
-        try:
-            # Create figure with subplots
-            fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
-            
-            # 1. Balance over time
-            if results.get('daily_returns'):
-                dates = [d['date'] for d in results['daily_returns']]
-                balances = [d['balance'] for d in results['daily_returns']]
-                ax1.plot(dates, balances)
-                ax1.set_title('Account Balance Over Time')
-                ax1.set_xlabel('Date')
-                ax1.set_ylabel('Balance (USDT)')
-                ax1.grid(True)
-            
-            # 2. Strategy performance
-            strategies = list(results.get('strategy_performance', {}).keys())
-            win_rates = [results['strategy_performance'][s]['win_rate'] for s in strategies]
-            ax2.bar(strategies, win_rates)
-            ax2.set_title('Strategy Win Rates')
-            ax2.set_xlabel('Strategy')
-            ax2.set_ylabel('Win Rate (%)')
-            ax2.tick_params(axis='x', rotation=45)
-            
-            # 3. Trade P&L distribution
-            if results.get('trades'):
-                pnls = [t['pnl'] for t in results['trades']]
-                ax3.hist(pnls, bins=20, alpha=0.7)
-                ax3.set_title('Trade P&L Distribution')
-                ax3.set_xlabel('P&L (USDT)')
-                ax3.set_ylabel('Frequency')
-                ax3.axvline(0, color='red', linestyle='--')
-            
-            # 4. Strategy signal counts
-            signal_counts = results.get('strategy_signals', {})
-            ax4.bar(signal_counts.keys(), signal_counts.values())
-            ax4.set_title('Strategy Signal Counts')
-            ax4.set_xlabel('Strategy')
-            ax4.set_ylabel('Number of Signals')
-            ax4.tick_params(axis='x', rotation=45)
-            
-            plt.tight_layout()
-            plt.savefig('backtest_results.png', dpi=300, bbox_inches='tight')
-            plt.show()
-            
-            logger.info("Performance charts saved to backtest_results.png")
-            
-        except Exception as e:
-            logger.error(f"Error plotting results: {e}")
+    def plot_results(self, output_name: str = 'backtest_report') -> Optional[str]:
+        """Render performance charts inline from the stored results (batch runs use ReportRenderer)"""
+        return render_report(output_name, self.result_store.base_dir)
 
-async def main():
-    """Main function to run backtest"""
+async def main(resume: bool = False, plots: bool = True):
+    """
+    Main function to run backtest
+
+    resume=True ข้าม symbol ที่เสร็จแล้วและทำต่อจาก checkpoint
+    plots=False ไม่ render กราฟ (render ทีหลังได้ด้วย backtest_plots.py)
+    """
+    renderer = ReportRenderer(enabled=plots)
     try:
         # Initialize backtest engine
         backtest = BacktestEngine(
@@ -658,32 +711,38 @@ async def main():
             "ICPUSDT"
         ]
         
+        # Per-symbol progress so an interrupted run can skip finished symbols
+        progress = backtest.checkpoint_store.load('backtest_progress') if resume else None
+        if not progress or progress.get('period') != backtest.period:
+            progress = {'period': backtest.period, 'completed': []}
+        
         for symbol in symbols:
+            if symbol in progress['completed']:
+                logger.info(f"Skipping {symbol}: already completed")
+                continue
+            
             logger.info(f"Running backtest for {symbol}")
-            results = await backtest.run_backtest(symbol, interval='1h')
+            results = await backtest.run_backtest(symbol, interval='1h', resume=resume)
             
             if results:
                 # Generate report
-                summary = backtest.generate_report(results, f'backtest_report_{symbol}.json')
+                summary = backtest.generate_report(results, f'backtest_report_{symbol}')
                 print(summary)
                 
-                # Generate plots
-                backtest.plot_results(results)
+                # Charts render in a worker process from the saved tables
+                renderer.submit(f'backtest_report_{symbol}')
                 
-                # Reset for next symbol
-                backtest.current_balance = backtest.initial_balance
-                backtest.trades = []
-                backtest.daily_returns = []
-                backtest.strategy_signals = {k: 0 for k in backtest.strategy_signals}
-                backtest.strategy_wins = {k: 0 for k in backtest.strategy_wins}
-                backtest.total_trades = 0
-                backtest.winning_trades = 0
-                backtest.losing_trades = 0
-                backtest.max_drawdown = 0
-                backtest.peak_balance = backtest.initial_balance
+                progress['completed'].append(symbol)
+                backtest.checkpoint_store.save('backtest_progress', progress)
+                backtest.checkpoint_store.remove(backtest.checkpoint_name(symbol, '1h'))
+            
+            # Reset for next symbol
+            backtest.reset()
         
     except Exception as e:
         logger.error(f"Error in main: {e}")
+    finally:
+        renderer.close()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main(resume="--resume" in sys.argv, plots="--no-plots" not in sys.argv)) 
\ No newline at end of file
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Backtest Plots - สร้างกราฟรายงานจากผลลัพธ์ที่บันทึกไว้ใน BacktestResultStore
+
+แยกออกจาก BacktestEngine เพื่อให้ backtest แบบ batch ไม่ต้องรอ render กราฟ:
+- import matplotlib แบบ lazy และใช้ backend 'Agg' (ไม่ต้องมีจอ, ไม่มี plt.show)
+- อ่านข้อมูลจากตาราง columnar ที่ save ไว้ ไม่ใช่ object ในหน่วยความจำ
+- ReportRenderer ส่งงาน render ไปทำใน worker process
+
+Usage:
+    python backtest_plots.py                         # render ทุกผลลัพธ์ใน backtest_results/
+    python backtest_plots.py backtest_report_BTCUSDT
+"""
+
+import os
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional
+
+from loguru import logger
+
+from backtest_store import BacktestResultStore
+
+
+def render_report(name: str, base_dir: str = 'backtest_results', output_path: Optional[str] = None,
+                  dpi: int = 150) -> Optional[str]:
+    """
+    Render กราฟ 4 ช่อง (balance, win rate ต่อ strategy, P&L distribution, signal counts)
+
+    Returns:
+        path ของไฟล์ PNG (None ถ้า render ไม่สำเร็จ)
+    """
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        store = BacktestResultStore(base_dir)
+        summary = store.load_summary(name)
+        if summary is None:
+            logger.error(f"No backtest results named {name}")
+            return None
+        tables = summary.get('tables', {})
+
+        def load(table, columns):
+            available = tables.get(table, {}).get('columns', {})
+            if not all(c in available for c in columns):
+                return None
+            return store.load_table(name, table, columns)
+
+        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
+
+        # 1. Balance over time
+        equity = load('equity', ['date', 'balance'])
+        if equity is not None:
+            ax1.plot(equity['date'], equity['balance'])
+            ax1.set_title('Account Balance Over Time')
+            ax1.set_xlabel('Date')
+            ax1.set_ylabel('Balance (USDT)')
+            ax1.grid(True)
+
+        # 2. Strategy performance
+        strategies = load('strategies', ['strategy', 'win_rate'])
+        if strategies is not None:
+            ax2.bar(list(strategies['strategy']), strategies['win_rate'])
+        ax2.set_title('Strategy Win Rates')
+        ax2.set_xlabel('Strategy')
+        ax2.set_ylabel('Win Rate (%)')
+        ax2.tick_params(axis='x', rotation=45)
+
+        # 3. Trade P&L distribution
+        trades = load('trades', ['pnl'])
+        if trades is not None:
+            ax3.hist(trades['pnl'], bins=20, alpha=0.7)
+            ax3.set_title('Trade P&L Distribution')
+            ax3.set_xlabel('P&L (USDT)')
+            ax3.set_ylabel('Frequency')
+            ax3.axvline(0, color='red', linestyle='--')
+
+        # 4. Strategy signal counts
+        signal_counts = summary.get('strategy_signals', {})
+        ax4.bar(list(signal_counts.keys()), list(signal_counts.values()))
+        ax4.set_title('Strategy Signal Counts')
+        ax4.set_xlabel('Strategy')
+        ax4.set_ylabel('Number of Signals')
+        ax4.tick_params(axis='x', rotation=45)
+
+        fig.tight_layout()
+        output_path = output_path or os.path.join(store.result_path(name), 'charts.png')
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+        plt.close(fig)
+
+        logger.info(f"Performance charts saved to {output_path}")
+        return output_path
+
+    except Exception as e:
+        logger.error(f"Error plotting results for {name}: {e}")
+        return None
+
+
+class ReportRenderer:
+    """Render รายงานใน worker process แยกจาก simulation (enabled=False = ข้ามการ render)"""
+
+    def __init__(self, base_dir: str = 'backtest_results', max_workers: int = 1, enabled: bool = True):
+        self.base_dir = base_dir
+        self.enabled = enabled
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending: List[Future] = []
+
+    def submit(self, name: str) -> Optional[Future]:
+        if not self.enabled:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        future = self._executor.submit(render_report, name, self.base_dir)
+        self._pending.append(future)
+        return future
+
+    def close(self) -> List[Optional[str]]:
+        """รอให้ render ที่ค้างอยู่เสร็จ แล้วคืน path ของไฟล์ที่ได้"""
+        paths = [future.result() for future in self._pending]
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    store = BacktestResultStore()
+    names = sys.argv[1:]
+    if not names and os.path.isdir(store.base_dir):
+        names = sorted(n for n in os.listdir(store.base_dir) if store.exists(n))
+    with ReportRenderer(store.base_dir, max_workers=min(4, max(1, len(names)))) as renderer:
+        for name in names:
+            renderer.submit(name)
+
+
+if __name__ == "__main__":
+    main()
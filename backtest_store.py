@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Backtest Result Store - เก็บผลลัพธ์ backtest แบบ columnar (NumPy .npy ต่อคอลัมน์) + summary JSON
+
+Layout ของผลลัพธ์แต่ละชุด:
+    backtest_results/<name>/
+        summary.json              # metrics หลัก + manifest ของตาราง
+        trades/<column>.npy       # หนึ่งไฟล์ต่อคอลัมน์
+        equity/<column>.npy
+        strategies/<column>.npy
+
+ทุกคอลัมน์มี dtype ที่แน่นอน (timestamp = datetime64[ms], ตัวเลข = float64,
+ข้อความ = unicode ความยาวคงที่) จึงโหลดแบบ memory-mapped ได้เฉพาะคอลัมน์ที่ต้องการ
+"""
+
+import json
+import os
+import shutil
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+FORMAT_VERSION = 1
+
+# ตารางที่เก็บแยกออกจาก summary
+TABLE_SOURCES = {
+    'trades': 'trades',
+    'equity': 'daily_returns',
+}
+
+
+class BacktestResultStore:
+    def __init__(self, base_dir: str = 'backtest_results'):
+        self.base_dir = base_dir
+
+    def result_path(self, name: str) -> str:
+        """Directory ของผลลัพธ์ชุด `name`"""
+        if os.path.isabs(name) or os.path.dirname(name):
+            return name
+        return os.path.join(self.base_dir, name)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.result_path(name), 'summary.json'))
+
+    # ------------------------------------------------------------------ write
+
+    def save(self, results: Dict, name: str) -> str:
+        """บันทึกผลลัพธ์ backtest เป็นตาราง columnar + summary.json"""
+        path = self.result_path(name)
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+
+        manifest = {}
+        for table, source_key in TABLE_SOURCES.items():
+            columns = self._rows_to_columns(results.get(source_key) or [])
+            manifest[table] = self._write_table(os.path.join(tmp_path, table), columns)
+
+        strategy_columns = self._strategy_columns(results.get('strategy_performance') or {})
+        manifest['strategies'] = self._write_table(os.path.join(tmp_path, 'strategies'), strategy_columns)
+
+        summary = {
+            key: value for key, value in results.items()
+            if key not in TABLE_SOURCES.values()
+        }
+        summary['format_version'] = FORMAT_VERSION
+        summary['tables'] = manifest
+        with open(os.path.join(tmp_path, 'summary.json'), 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+
+        # สลับ directory ทีเดียว เพื่อไม่ให้ผู้อ่านเห็นผลลัพธ์ที่เขียนไม่ครบ
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+        logger.info(f"Backtest results saved to {path}")
+        return path
+
+    def _rows_to_columns(self, rows: List[Dict]) -> Dict[str, np.ndarray]:
+        """แปลง list ของ dict เป็นคอลัมน์ที่มี dtype ชัดเจน"""
+        if not rows:
+            return {}
+        names = []
+        for row in rows:
+            for key in row:
+                if key not in names:
+                    names.append(key)
+        return {name: self._to_array([row.get(name) for row in rows]) for name in names}
+
+    def _strategy_columns(self, strategy_performance: Dict[str, Dict]) -> Dict[str, np.ndarray]:
+        if not strategy_performance:
+            return {}
+        rows = [{'strategy': name, **perf} for name, perf in strategy_performance.items()]
+        return self._rows_to_columns(rows)
+
+    @staticmethod
+    def _to_array(values: List) -> np.ndarray:
+        present = [v for v in values if v is not None and not (isinstance(v, float) and np.isnan(v))]
+        sample = present[0] if present else None
+
+        if isinstance(sample, (datetime, date, np.datetime64, pd.Timestamp)):
+            return pd.to_datetime(pd.Series(values)).values.astype('datetime64[ms]')
+        if isinstance(sample, (bool, np.bool_)) and all(isinstance(v, (bool, np.bool_)) for v in present):
+            return np.array([bool(v) for v in values], dtype=bool)
+        if isinstance(sample, (int, float, np.integer, np.floating)):
+            return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+        return np.array(['' if v is None else str(v) for v in values], dtype=str)
+
+    @staticmethod
+    def _write_table(table_dir: str, columns: Dict[str, np.ndarray]) -> Dict:
+        os.makedirs(table_dir, exist_ok=True)
+        rows = 0
+        dtypes = {}
+        for name, array in columns.items():
+            np.save(os.path.join(table_dir, f"{name}.npy"), array, allow_pickle=False)
+            rows = len(array)
+            dtypes[name] = array.dtype.str
+        return {'rows': rows, 'columns': dtypes}
+
+    # ------------------------------------------------------------------- read
+
+    def load_summary(self, name: str) -> Optional[Dict]:
+        """โหลดเฉพาะ summary (metrics + strategy_performance) โดยไม่แตะตาราง"""
+        summary_file = os.path.join(self.result_path(name), 'summary.json')
+        if not os.path.exists(summary_file):
+            return None
+        with open(summary_file, 'r') as f:
+            return json.load(f)
+
+    def load_table(self, name: str, table: str, columns: Iterable[str] = None,
+                   mmap: bool = True) -> Dict[str, np.ndarray]:
+        """โหลดคอลัมน์ของตาราง (memory-mapped เป็นค่าเริ่มต้น)"""
+        summary = self.load_summary(name)
+        if summary is None:
+            raise FileNotFoundError(f"No backtest results at {self.result_path(name)}")
+        available = summary['tables'].get(table, {}).get('columns', {})
+        wanted = list(columns) if columns is not None else list(available)
+        missing = [c for c in wanted if c not in available]
+        if missing:
+            raise KeyError(f"Unknown columns for table '{table}': {missing}")
+
+        table_dir = os.path.join(self.result_path(name), table)
+        return {
+            column: np.load(os.path.join(table_dir, f"{column}.npy"),
+                            mmap_mode='r' if mmap else None, allow_pickle=False)
+            for column in wanted
+        }
+
+    def load_frame(self, name: str, table: str, columns: Iterable[str] = None) -> pd.DataFrame:
+        """โหลดตารางเป็น DataFrame"""
+        return pd.DataFrame(self.load_table(name, table, columns, mmap=False))
+
+    def load_results(self, name: str) -> Optional[Dict]:
+        """ประกอบผลลัพธ์กลับเป็นรูปแบบ dict เดิม (trades/daily_returns เป็น list ของ dict)"""
+        summary = self.load_summary(name)
+        if summary is None:
+            return None
+        results = {k: v for k, v in summary.items() if k not in ('tables', 'format_version')}
+        for table, source_key in TABLE_SOURCES.items():
+            frame = self.load_frame(name, table)
+            results[source_key] = frame.to_dict('records')
+        return results
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Macro Benchmarks - วัด throughput ของ backtest และ latency ของ scan cycle แบบ offline
+
+- backtest: candles/second ของ BacktestEngine.run_backtest ต่อ engine mode
+- scan_cycle: เวลาต่อรอบ check_market_conditions ของ N symbols ผ่าน ReplayClient
+- peak memory (tracemalloc) ของแต่ละงาน วัดแยกอีกรอบเพื่อไม่ให้กระทบเวลา
+
+ผลลัพธ์บันทึกเป็น JSON และเทียบกับ baseline ได้:
+    python benchmark_macro.py run --output benchmarks/macro_baseline.json
+    python benchmark_macro.py run --output benchmarks/macro_current.json
+    python benchmark_macro.py compare benchmarks/macro_baseline.json benchmarks/macro_current.json --threshold 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+import config
+from kline_store import KlineStore
+from synthetic_data import SyntheticMarket
+
+BENCHMARK_VERSION = 1
+START = '2024-01-01'
+
+# Engine mode -> BacktestEngine keyword arguments and config overrides
+BACKTEST_MODES = {
+    'default': {'engine': {'checkpoint_every': 0}, 'config': {}},
+    'checkpointing': {'engine': {'checkpoint_every': 100}, 'config': {}},
+    'numpy_indicators': {'engine': {'checkpoint_every': 0}, 'config': {'INDICATOR_BACKEND': 'numpy'}},
+}
+
+
+def synthetic_columns(candles: int, interval: str = '1m', seed: int = 0) -> Dict[str, np.ndarray]:
+    """ข้อมูลจำลองที่ seed คงที่ เพื่อให้ทุกรอบวัดบนข้อมูลเดียวกัน"""
+    return SyntheticMarket().generate(candles, interval, START, seed)
+
+
+def write_synthetic_klines(store: KlineStore, symbol: str, interval: str, candles: int, seed: int = 0):
+    store.save(symbol, interval, synthetic_columns(candles, interval, seed))
+
+
+@contextlib.contextmanager
+def _workdir():
+    """รันใน temp dir เพื่อไม่ให้ logs / checkpoints ปนกับ repo"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='bench_') as tmp:
+        os.makedirs(os.path.join(tmp, 'logs'), exist_ok=True)
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(previous)
+
+
+@contextlib.contextmanager
+def _peak_memory(result: Dict):
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        result['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+
+def bench_backtest(store: KlineStore, symbol: str, interval: str, mode: str) -> Dict:
+    """รัน backtest ทั้งชุดหนึ่งครั้ง คืน candles/second"""
+    from backtest import BacktestEngine
+    from replay import ReplayClient, SimulatedClock
+    from trading_bot import TradingBot
+
+    columns = store.load(symbol, interval, columns=['open_time', 'close_time'], mmap=False)
+    start = pd.Timestamp(int(columns['open_time'][0]), unit='ms')
+    end = pd.Timestamp(int(columns['open_time'][-1]), unit='ms')
+    client = ReplayClient(store, [symbol], SimulatedClock(int(columns['close_time'][-1])), interval)
+
+    with _workdir(), contextlib.ExitStack() as stack:
+        for key, value in BACKTEST_MODES[mode]['config'].items():
+            stack.enter_context(mock.patch.object(config, key, value))
+        engine = BacktestEngine(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'),
+                                trading_bot=TradingBot(client=client), **BACKTEST_MODES[mode]['engine'])
+        engine.kline_store = store
+        started = time.perf_counter()
+        results = asyncio.run(engine.run_backtest(symbol, interval))
+        elapsed = time.perf_counter() - started
+
+    candles = len(columns['open_time']) - 100  # run_backtest skips the indicator warm-up
+    return {
+        'candles': candles,
+        'seconds': elapsed,
+        'candles_per_second': candles / elapsed if elapsed > 0 else 0.0,
+        'trades': results.get('total_trades', 0),
+    }
+
+
+def bench_scan_cycle(store: KlineStore, symbols: List[str], cycles: int) -> Dict:
+    """เวลาต่อรอบ scan ของ TradingBot จริงผ่าน ReplayHarness"""
+    from replay import ReplayHarness
+
+    warmup = 100
+    end = pd.Timestamp(START) + pd.Timedelta(minutes=warmup + cycles)
+    harness = ReplayHarness(symbols, end=str(end), store=store, warmup_bars=warmup, manage_exits=False)
+    with _workdir() as tmp:
+        harness.workdir = tmp
+        report = asyncio.run(harness.run())
+    return {
+        'cycles': report['bars'],
+        'symbols': len(symbols),
+        'cycle_p50_ms': report['cycle_p50_ms'],
+        'cycle_p95_ms': report['cycle_p95_ms'],
+        'cycles_per_second': report['bars_per_second'],
+    }
+
+
+def run_suite(args) -> Dict:
+    metrics = {}
+
+    def record(name, value, unit, higher_is_better):
+        metrics[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        print(f"  {name:<45} {value:>12.3f} {unit}")
+
+    with tempfile.TemporaryDirectory(prefix='bench_data_') as tmp:
+        if args.data_dir:
+            store = KlineStore(args.data_dir)
+            backtest_symbol = args.backtest_symbol or store.symbols()[0]
+            scan_symbols = store.symbols()
+        else:
+            store = KlineStore(tmp)
+            backtest_symbol = 'BENCH0USDT'
+            write_synthetic_klines(store, backtest_symbol, '1h', args.candles + 100, seed=0)
+            scan_symbols = [f"BENCH{i}USDT" for i in range(max(args.symbols))]
+            for i, symbol in enumerate(scan_symbols):
+                write_synthetic_klines(store, symbol, '1m', 100 + args.cycles + 1, seed=i)
+
+        with mock.patch.object(config, 'LOG_LEVEL', args.log_level):
+            for mode in args.modes:
+                result = bench_backtest(store, backtest_symbol, '1h', mode)
+                record(f"backtest.{mode}.candles_per_second", result['candles_per_second'], 'candles/s', True)
+                if args.memory:
+                    with _peak_memory(result):
+                        bench_backtest(store, backtest_symbol, '1h', mode)
+                    record(f"backtest.{mode}.peak_memory_mb", result['peak_memory_mb'], 'MB', False)
+
+            for count in args.symbols:
+                symbols = scan_symbols[:count]
+                result = bench_scan_cycle(store, symbols, args.cycles)
+                record(f"scan_cycle.{count}_symbols.p50_ms", result['cycle_p50_ms'], 'ms', False)
+                record(f"scan_cycle.{count}_symbols.p95_ms", result['cycle_p95_ms'], 'ms', False)
+                if args.memory:
+                    with _peak_memory(result):
+                        bench_scan_cycle(store, symbols, args.cycles)
+                    record(f"scan_cycle.{count}_symbols.peak_memory_mb", result['peak_memory_mb'], 'MB', False)
+
+    return {
+        'version': BENCHMARK_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'params': {
+            'candles': args.candles, 'cycles': args.cycles, 'symbols': args.symbols,
+            'modes': args.modes, 'data_dir': args.data_dir,
+        },
+        'metrics': metrics,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold_pct: float) -> List[Dict]:
+    """เทียบ metrics ที่มีทั้งสองไฟล์ คืนรายการพร้อม flag regression ที่ช้าลงเกิน threshold"""
+    rows = []
+    for name, base in baseline['metrics'].items():
+        if name not in current['metrics']:
+            continue
+        old, new = base['value'], current['metrics'][name]['value']
+        change_pct = (new - old) / old * 100 if old else 0.0
+        worse_pct = -change_pct if base['higher_is_better'] else change_pct
+        rows.append({
+            'name': name, 'unit': base['unit'], 'baseline': old, 'current': new,
+            'change_pct': change_pct, 'regression': worse_pct > threshold_pct,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline macro benchmarks for backtest and scan cycle")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="run the suite and write a JSON result")
+    run.add_argument('--output', default=os.path.join('benchmarks', 'macro_latest.json'))
+    run.add_argument('--candles', type=int, default=500, help="backtest candles after warm-up")
+    run.add_argument('--cycles', type=int, default=30, help="scan cycles per symbol count")
+    run.add_argument('--symbols', type=int, nargs='+', default=[1, 5], help="symbol counts for scan cycle")
+    run.add_argument('--modes', nargs='+', default=list(BACKTEST_MODES), choices=list(BACKTEST_MODES))
+    run.add_argument('--data-dir', default=None, help="recorded KlineStore instead of synthetic data")
+    run.add_argument('--backtest-symbol', default=None)
+    run.add_argument('--no-memory', dest='memory', action='store_false', help="skip tracemalloc pass")
+    run.add_argument('--log-level', default='WARNING')
+
+    cmp = sub.add_parser('compare', help="compare a result against a baseline")
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=10.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        print("⏱️  MACRO BENCHMARKS")
+        result = run_suite(args)
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        logger.info(f"Benchmark results saved to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        flag = "❌ REGRESSION" if row['regression'] else "✅"
+        print(f"{flag:<13} {row['name']:<45} {row['baseline']:>10.3f} -> {row['current']:>10.3f} "
+              f"{row['unit']} ({row['change_pct']:+.1f}%)")
+    regressions = [row for row in rows if row['regression']]
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0f}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Micro Benchmarks - เวลา CPU ต่อฟังก์ชันของ TradingBot (indicators และทุก strategy)
+
+วัด calculate_indicators, ทุก check_*_signal, calculate_signal_strength,
+get_weighted_signal, check_market_conditions_filter และ pipeline evaluate_signals
+ที่หลายขนาด window และทั้งสอง indicator backend ('pandas_ta', 'numpy')
+แล้วพิมพ์ตารางเรียงตามเวลาที่ใช้ เพื่อดูว่า strategy ไหนคุ้มที่จะ optimize หรือตัดทิ้ง
+
+Usage:
+    python benchmark_micro.py
+    python benchmark_micro.py --sizes 100 1000 --backends numpy --output benchmarks/micro.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+from unittest import mock
+
+import pandas as pd
+from loguru import logger
+
+import config
+from benchmark_macro import synthetic_columns
+
+DEFAULT_SIZES = [100, 1000, 100000]
+BACKENDS = ['pandas_ta', 'numpy']
+
+# check_* methods that also take the current price
+PRICE_ARGUMENT_METHODS = {'check_bollinger_rsi_signal'}
+
+
+def strategy_methods() -> List[str]:
+    from trading_bot import TradingBot
+    return sorted(name for name in dir(TradingBot) if name.startswith('check_') and name.endswith('_signal'))
+
+
+def candles_frame(size: int, seed: int = 0) -> pd.DataFrame:
+    """DataFrame รูปแบบเดียวกับที่ check_market_conditions สร้างจาก futures_klines"""
+    columns = synthetic_columns(size, '1m', seed)
+    df = pd.DataFrame({c: columns[c] for c in ('open', 'high', 'low', 'close', 'volume')})
+    df.insert(0, 'timestamp', columns['open_time'])
+    return df
+
+
+def time_call(func: Callable, make_args: Callable, repeat: int) -> float:
+    """เวลาที่ดีที่สุด (วินาที) จาก `repeat` รอบ; เตรียม argument นอกช่วงจับเวลา"""
+    best = float('inf')
+    for _ in range(repeat):
+        args = make_args()
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def repeats_for(size: int, base: int) -> int:
+    return max(1, base if size <= 1000 else base // 5)
+
+
+def bench_size(bot, size: int, backend: str, repeat: int) -> List[Dict]:
+    rows = []
+
+    def record(name, seconds, group):
+        rows.append({'function': name, 'group': group, 'size': size, 'backend': backend,
+                     'ms': seconds * 1000})
+
+    df = candles_frame(size)
+    with mock.patch.object(config, 'INDICATOR_BACKEND', backend):
+        record('calculate_indicators', time_call(bot.calculate_indicators, lambda: (df.copy(),), repeat),
+               'indicators')
+        indicators = bot.calculate_indicators(df.copy())
+
+    current_price = float(indicators['close'].iloc[-1])
+    signals = {}
+    for name in strategy_methods():
+        method = getattr(bot, name)
+        if name in PRICE_ARGUMENT_METHODS:
+            make_args = lambda: (indicators.copy(), current_price)
+        else:
+            make_args = lambda: (indicators.copy(),)
+        record(name, time_call(method, make_args, repeat), 'strategy')
+        signals[name] = method(*make_args())
+
+    # check_market_conditions_filter reads the ADX column added by the SAR/ADX strategy
+    enriched = indicators.copy()
+    bot.check_parabolic_sar_adx_signal(enriched)
+    record('calculate_signal_strength',
+           time_call(bot.calculate_signal_strength, lambda: (enriched.copy(), 'BUY'), repeat), 'scoring')
+    record('get_weighted_signal', time_call(bot.get_weighted_signal, lambda: (signals,), repeat), 'scoring')
+    record('check_market_conditions_filter',
+           time_call(bot.check_market_conditions_filter, lambda: (enriched.copy(),), repeat), 'scoring')
+    # staged pipeline as run by check_market_conditions (cheap gates short-circuit the strategies)
+    with mock.patch.object(config, 'INDICATOR_BACKEND', backend):
+        record('evaluate_signals', time_call(bot.evaluate_signals, lambda: (df.copy(), current_price), repeat),
+               'pipeline')
+    return rows
+
+
+def print_ranking(rows: List[Dict]):
+    """ตารางต่อ (backend, size) เรียงจากฟังก์ชันที่ใช้เวลามากสุด"""
+    for backend in sorted({r['backend'] for r in rows}):
+        for size in sorted({r['size'] for r in rows}):
+            group = sorted((r for r in rows if r['backend'] == backend and r['size'] == size),
+                           key=lambda r: r['ms'], reverse=True)
+            if not group:
+                continue
+            total = sum(r['ms'] for r in group)
+            print(f"\n📊 backend={backend} size={size:,} candles (total {total:.2f} ms)")
+            print(f"{'#':>3}  {'function':<45} {'ms':>10} {'share':>7}")
+            for rank, row in enumerate(group, 1):
+                print(f"{rank:>3}  {row['function']:<45} {row['ms']:>10.3f} {row['ms'] / total:>7.1%}")
+
+    backends = sorted({r['backend'] for r in rows})
+    if len(backends) == 2 and 'calculate_indicators' in {r['function'] for r in rows}:
+        print("\n⚡ calculate_indicators speedup (pandas_ta / numpy)")
+        for size in sorted({r['size'] for r in rows}):
+            times = {r['backend']: r['ms'] for r in rows
+                     if r['function'] == 'calculate_indicators' and r['size'] == size}
+            if times.get('numpy'):
+                print(f"  {size:>8,} candles: {times['pandas_ta'] / times['numpy']:.1f}x")
+
+
+@contextlib.contextmanager
+def _quiet_bot():
+    """TradingBot ที่ไม่ต่อ network (ReplayClient เปล่า) ใน temp dir"""
+    from kline_store import KlineStore
+    from replay import ReplayClient, SimulatedClock
+    from trading_bot import TradingBot
+
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='bench_micro_') as tmp:
+        os.makedirs(os.path.join(tmp, 'logs'), exist_ok=True)
+        os.chdir(tmp)
+        try:
+            with mock.patch.object(config, 'LOG_LEVEL', 'ERROR'):
+                yield TradingBot(client=ReplayClient(KlineStore(tmp), [], SimulatedClock()))
+        finally:
+            os.chdir(previous)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-function CPU benchmarks for indicators and strategies")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--backends', nargs='+', default=BACKENDS, choices=BACKENDS)
+    parser.add_argument('--repeat', type=int, default=5, help="best-of repeats (fewer for large windows)")
+    parser.add_argument('--output', default=None, help="write rows as JSON")
+    args = parser.parse_args()
+
+    rows = []
+    with _quiet_bot() as bot:
+        for backend in args.backends:
+            for size in args.sizes:
+                print(f"⏱️  {backend} @ {size:,} candles ...")
+                rows.extend(bench_size(bot, size, backend, repeats_for(size, args.repeat)))
+
+    print_ranking(rows)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'rows': rows}, f, indent=2)
+        logger.info(f"Micro benchmark results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Binance Fixtures - บันทึก / เล่นซ้ำ response ของ Binance client เพื่อรันแบบ offline
+
+- RecordingClient: ห่อ binance Client ตัวจริง เก็บ (method, arguments, response) ทุก call
+- FixtureClient: ตอบจากไฟล์ fixture แทน Binance พร้อม latency จำลองแบบ deterministic
+- create_client(): เลือก live / record / replay จาก environment variables
+
+Environment:
+    BINANCE_FIXTURE_MODE=record|replay   (ไม่ตั้ง = live)
+    BINANCE_FIXTURES=fixtures/binance/default.json
+    BINANCE_FIXTURE_LATENCY_MS=0         (replay เท่านั้น)
+    BINANCE_FIXTURE_JITTER_MS=0
+
+ตัวอย่าง:
+    BINANCE_FIXTURE_MODE=record BINANCE_FIXTURES=fixtures/binance/winrate.json python quick_winrate_test.py
+    BINANCE_FIXTURE_MODE=replay BINANCE_FIXTURES=fixtures/binance/winrate.json python quick_winrate_test.py
+"""
+
+import atexit
+import functools
+import json
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+FIXTURE_VERSION = 1
+DEFAULT_FIXTURE_PATH = os.path.join('fixtures', 'binance', 'default.json')
+
+# client เดียวต่อไฟล์ fixture ภายใน process (หลาย TradingBot บันทึก/เล่นซ้ำลงชุดเดียวกัน)
+_shared_clients: Dict[str, Any] = {}
+
+
+def call_key(args, kwargs) -> str:
+    """key ของ call ที่ไม่ขึ้นกับลำดับ keyword arguments"""
+    return json.dumps({'args': list(args), 'kwargs': kwargs}, sort_keys=True, default=str)
+
+
+def load_fixture(path: str) -> Dict:
+    with open(path, 'r') as f:
+        fixture = json.load(f)
+    if fixture.get('version') != FIXTURE_VERSION:
+        raise ValueError(f"Unsupported fixture version {fixture.get('version')} in {path}")
+    return fixture
+
+
+class RecordingClient:
+    """ส่ง call ต่อไปยัง client จริงและบันทึก response ลงไฟล์ fixture"""
+
+    def __init__(self, client, path: str = DEFAULT_FIXTURE_PATH):
+        self._client = client
+        self.path = path
+        self.calls: Dict[str, List[Dict]] = defaultdict(list)
+        if os.path.exists(path):
+            # เพิ่มต่อจาก fixture เดิม (เช่นบันทึกหลายสคริปต์ลงไฟล์เดียว)
+            for method, entries in load_fixture(path)['calls'].items():
+                self.calls[method].extend(entries)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)  # คง __name__ ไว้ให้ request_weight
+        def recorded(*args, **kwargs):
+            response = attr(*args, **kwargs)
+            self.calls[name].append({'key': call_key(args, kwargs), 'response': response})
+            return response
+        return recorded
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': FIXTURE_VERSION,
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'calls': dict(self.calls),
+            }, f, default=str)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved {sum(len(v) for v in self.calls.values())} Binance responses to {self.path}")
+
+
+class FixtureClient:
+    """
+    ตอบ call จาก fixture ที่บันทึกไว้
+
+    call เดียวกันที่บันทึกไว้หลายครั้งจะตอบตามลำดับ (ครั้งสุดท้ายซ้ำเมื่อเกินจำนวน)
+    strict=False: call ที่ไม่มีใน fixture ใช้ response แรกของ method นั้นแทน
+    """
+
+    def __init__(self, path: str = DEFAULT_FIXTURE_PATH, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, seed: int = 0, strict: bool = True):
+        self.path = path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.strict = strict
+        self._rng = random.Random(seed)
+        self._responses: Dict[str, Dict[str, List[Any]]] = defaultdict(lambda: defaultdict(list))
+        for method, entries in load_fixture(path)['calls'].items():
+            for entry in entries:
+                self._responses[method][entry['key']].append(entry['response'])
+        self._cursor = Counter()
+        self.call_counts = Counter()
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self._responses:
+            raise AttributeError(f"No recorded Binance responses for '{name}' in {self.path}")
+
+        def replayed(*args, **kwargs):
+            return self._replay(name, args, kwargs)
+        replayed.__name__ = replayed.__qualname__ = name  # สำหรับ request_weight
+        return replayed
+
+    def _replay(self, method: str, args, kwargs):
+        self.call_counts[method] += 1
+        key = call_key(args, kwargs)
+        recorded = self._responses[method]
+        if key not in recorded:
+            if self.strict:
+                raise KeyError(f"No recorded response for {method}({key}) in {self.path}")
+            key = next(iter(recorded))
+
+        responses = recorded[key]
+        index = min(self._cursor[(method, key)], len(responses) - 1)
+        self._cursor[(method, key)] += 1
+
+        delay_ms = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        # copy ผ่าน JSON เพื่อไม่ให้ผู้เรียกแก้ response ที่เก็บไว้
+        return json.loads(json.dumps(responses[index]))
+
+
+def create_client(api_key: Optional[str] = None, api_secret: Optional[str] = None):
+    """สร้าง Binance client ตาม BINANCE_FIXTURE_MODE (live / record / replay)"""
+    mode = os.getenv('BINANCE_FIXTURE_MODE', '').lower()
+    path = os.getenv('BINANCE_FIXTURES', DEFAULT_FIXTURE_PATH)
+
+    if mode == 'replay':
+        if path not in _shared_clients:
+            logger.info(f"Using recorded Binance fixtures from {path}")
+            _shared_clients[path] = FixtureClient(
+                path,
+                latency_ms=float(os.getenv('BINANCE_FIXTURE_LATENCY_MS', 0)),
+                jitter_ms=float(os.getenv('BINANCE_FIXTURE_JITTER_MS', 0)),
+            )
+        return _shared_clients[path]
+
+    from binance.client import Client
+    if mode == 'record':
+        if path not in _shared_clients:
+            recording = RecordingClient(Client(api_key, api_secret), path)
+            atexit.register(recording.save)
+            logger.info(f"Recording Binance responses to {path}")
+            _shared_clients[path] = recording
+        return _shared_clients[path]
+    return Client(api_key, api_secret)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Candle Scheduler - ปลุก TradingBot ตอนแท่งเทียนปิด แทนการ poll ทุก 1 วินาที
+
+strategies ทั้งหมดดูแท่งที่ปิดแล้ว: การประเมินกลางแท่งให้สัญญาณที่กระพริบเปิด/ปิด
+และเป็นงานซ้ำ ~59 ใน 60 ครั้งต่อนาทีต่อ symbol
+
+- เวลาปิดแท่งคำนวณจาก server time ของ Binance (เก็บ offset กับนาฬิกาเครื่อง, sync ใหม่เป็นระยะ)
+- ปลุกหลังเวลาปิด close_offset_ms เพื่อให้ Binance ปิดแท่งเรียบร้อย
+- ระหว่างแท่ง (ถ้าเปิดใช้) ปลุกทุก exit_check_seconds สำหรับเช็ค exit แบบถูกๆ เท่านั้น
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Tuple
+
+from loguru import logger
+
+from kline_store import interval_to_ms
+
+EVENT_CANDLE_CLOSE = 'candle_close'
+EVENT_EXIT_CHECK = 'exit_check'
+
+
+class CandleScheduler:
+    def __init__(self, interval: str = '1m', close_offset_ms: int = 1500,
+                 exit_check_seconds: float = 0, resync_seconds: float = 3600):
+        """
+        Args:
+            interval: interval ของแท่งที่ใช้ตัดสินใจ
+            close_offset_ms: รอหลังเวลาปิดแท่งกี่ ms ก่อนประเมิน
+            exit_check_seconds: ระยะห่างของ exit check ระหว่างแท่ง (0 = ปิด)
+            resync_seconds: sync server time ใหม่ทุกกี่วินาที
+        """
+        self.interval_ms = interval_to_ms(interval)
+        self.close_offset_ms = close_offset_ms
+        self.exit_check_seconds = exit_check_seconds
+        self.resync_seconds = resync_seconds
+        self.offset_ms = 0.0  # server time - local time
+        self.last_sync = None
+        self.last_close_ms = None
+
+    def server_now_ms(self) -> float:
+        return time.time() * 1000 + self.offset_ms
+
+    def next_close_ms(self, now_ms: float) -> int:
+        """เวลาเปิดของแท่งถัดไป = เวลาที่แท่งปัจจุบันปิด"""
+        return (int(now_ms) // self.interval_ms + 1) * self.interval_ms
+
+    async def sync(self, fetch_server_time: Callable[[], Awaitable[dict]]):
+        """วัด offset ระหว่าง server time กับนาฬิกาเครื่อง (ใช้จุดกึ่งกลางของ round trip)"""
+        try:
+            sent = time.time() * 1000
+            response = await fetch_server_time()
+            received = time.time() * 1000
+            self.offset_ms = float(response['serverTime']) - (sent + received) / 2
+            self.last_sync = time.time()
+            logger.info(f"Server time offset: {self.offset_ms:+.0f} ms")
+        except Exception as e:
+            logger.error(f"Error syncing server time: {str(e)}")
+
+    async def wait(self, fetch_server_time: Callable[[], Awaitable[dict]] = None) -> Tuple[str, int]:
+        """
+        รอจนถึง event ถัดไป
+
+        Returns:
+            (EVENT_CANDLE_CLOSE, เวลาปิดแท่ง) หรือ (EVENT_EXIT_CHECK, เวลาปิดแท่งที่กำลังรอ)
+        """
+        if fetch_server_time and (self.last_sync is None or time.time() - self.last_sync >= self.resync_seconds):
+            await self.sync(fetch_server_time)
+
+        now_ms = self.server_now_ms()
+        close_ms = self.next_close_ms(now_ms - self.close_offset_ms)
+        if self.last_close_ms is not None and close_ms <= self.last_close_ms:
+            close_ms = self.last_close_ms + self.interval_ms
+        fire_at = close_ms + self.close_offset_ms
+        delay = (fire_at - now_ms) / 1000
+
+        if self.exit_check_seconds and delay > self.exit_check_seconds:
+            await asyncio.sleep(self.exit_check_seconds)
+            return EVENT_EXIT_CHECK, close_ms
+
+        await asyncio.sleep(max(0.0, delay))
+        self.last_close_ms = close_ms
+        return EVENT_CANDLE_CLOSE, close_ms
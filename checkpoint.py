@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Store - บันทึก state ของงานที่รันนาน (backtest หลาย symbol) ลงดิสก์แบบ atomic
+
+เขียนลงไฟล์ชั่วคราว -> fsync -> os.replace ดังนั้นถ้า process ตายระหว่างเขียน
+checkpoint ก่อนหน้ายังอยู่ครบ ไม่มีไฟล์ครึ่ง ๆ กลาง ๆ
+"""
+
+import os
+import pickle
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointStore:
+    def __init__(self, base_dir: str = 'checkpoints'):
+        self.base_dir = base_dir
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.base_dir, f"{name}.pkl")
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def save(self, name: str, state: Dict[str, Any]):
+        """บันทึก state แบบ atomic (แทนที่ checkpoint เดิมทั้งไฟล์)"""
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self.path(name)
+        tmp_path = f"{path}.tmp"
+        payload = {'version': CHECKPOINT_VERSION, 'saved_at': time.time(), 'state': state}
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """โหลด state ล่าสุด (None ถ้าไม่มีหรือไฟล์ใช้ไม่ได้)"""
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+            if payload.get('version') != CHECKPOINT_VERSION:
+                logger.warning(f"Ignoring checkpoint {path}: version {payload.get('version')}")
+                return None
+            return payload['state']
+        except Exception as e:
+            logger.error(f"Error loading checkpoint {path}: {e}")
+            return None
+
+    def remove(self, name: str):
+        path = self.path(name)
+        if os.path.exists(path):
+            os.remove(path)
@@ -4,22 +4,61 @@ from binance.client import Client
 import asyncio
 from loguru import logger
 import config
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import Counter
+from kline_store import interval_to_ms, klines_to_columns
+from timeframe_aggregator import BASE_INTERVAL, TimeframeAggregator
+from rate_limiter import AsyncRateLimiter, request_weight
+from analysis_cache import AnalysisCache
+from rolling_metrics import RollingMetrics
+import coin_scoring
 
 class CoinAnalyzer:
-    def __init__(self, client: Client):
+    def __init__(self, client: Client, rate_limiter: AsyncRateLimiter = None,
+                 max_concurrency: int = None, request_timeout: float = None):
+        """
+        Args:
+            client: binance Client (sync) - ทุก call รันใน worker thread
+            rate_limiter: ใช้ร่วมกับ TradingBot (default: สร้างใหม่ตาม API_WEIGHT_PER_MINUTE)
+            max_concurrency: จำนวน request ที่รันพร้อมกันได้
+            request_timeout: วินาทีต่อ request ก่อนนับเป็น failure แล้ว retry
+        """
         self.client = client
-        self.coin_analysis_cache = {}
-        self.cache_duration = 3600  # 1 hour cache
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(config.API_WEIGHT_PER_MINUTE)
+        self.max_concurrency = max_concurrency or config.COIN_ANALYSIS_CONCURRENCY
+        self.request_timeout = request_timeout or config.API_REQUEST_TIMEOUT
+        self.offload_api_calls = True
+        self._slots = None
+        self._slots_loop = None
+        self.cache_duration = config.COIN_ANALYSIS_TTL
+        self.coin_analysis_cache = AnalysisCache(
+            max_entries=config.COIN_ANALYSIS_CACHE_SIZE,
+            ttl=self.cache_duration,
+            jitter=config.COIN_ANALYSIS_TTL_JITTER,
+            refresh_ahead=config.COIN_ANALYSIS_REFRESH_AHEAD,
+            clock=lambda: time.time(),
+        )
+        self.refresh_tasks: Dict[str, asyncio.Task] = {}  # background refresh ต่อ symbol
+        self.background_refreshes = 0
         self.timeframes = ['1m', '5m', '15m', '1h', '4h', '1d']  # Multiple timeframes
+        # แท่งทุก timeframe สร้างจาก 1m ในเครื่อง (backfill จาก REST ครั้งแรกต่อเหรียญ)
+        self.aggregator = TimeframeAggregator(self.timeframes)
+        # เมตริกต่อ (symbol, timeframe) อัปเดตทีละแท่งที่ปิด จากแท่งชุดเดียวกับ aggregator
+        self.metrics = RollingMetrics(self.aggregator.history)
         
     async def get_market_data_parallel(self, symbol: str, timeframes: List[str] = None) -> Dict[str, pd.DataFrame]:
-        """ดึงข้อมูลตลาดหลาย Timeframe แบบขนาน"""
+        """
+        ดึงข้อมูลตลาดหลาย Timeframe
+
+        ครั้งแรกต่อเหรียญ backfill ทุก timeframe จาก REST แบบขนาน หลังจากนั้นดึงแค่แท่ง 1m
+        ที่ขาด (หรือไม่ดึงเลยถ้า TradingBot ป้อนแท่งล่าสุดให้แล้ว) แล้วรวมเป็นแท่งใหญ่ในเครื่อง
+        """
         if timeframes is None:
             timeframes = self.timeframes
+        local = [tf for tf in timeframes if tf in self.aggregator.timeframes]
+        remote = [tf for tf in timeframes if tf not in self.aggregator.timeframes]
             
         async def fetch_timeframe_data(tf: str) -> Tuple[str, pd.DataFrame]:
             try:
@@ -29,12 +68,18 @@ class CoinAnalyzer:
                 logger.error(f"Error fetching {symbol} {tf}: {e}")
                 return tf, pd.DataFrame()
         
-        # รันการดึงข้อมูลแบบขนาน
-        tasks = [fetch_timeframe_data(tf) for tf in timeframes]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            if not self.aggregator.is_backfilled(symbol):
+                await self.backfill_timeframes(symbol)
+            else:
+                await self.refresh_base_klines(symbol)
+        except Exception as e:
+            logger.error(f"Error updating {symbol} timeframes: {e}")
         
-        # จัดระเบียบผลลัพธ์
-        timeframe_data = {}
+        timeframe_data = {tf: self.aggregator.frame(symbol, tf) for tf in local}
+        
+        # timeframe ที่ aggregator ไม่ได้เก็บ: ดึงจาก REST แบบขนานเหมือนเดิม
+        results = await asyncio.gather(*(fetch_timeframe_data(tf) for tf in remote), return_exceptions=True)
         for result in results:
             if isinstance(result, tuple) and len(result) == 2:
                 tf, df = result
@@ -43,6 +88,37 @@ class CoinAnalyzer:
                 logger.error(f"Unexpected result: {result}")
         
         return timeframe_data
+
+    async def fetch_closed_klines(self, symbol: str, interval: str, limit: int) -> Dict:
+        """klines ที่ปิดแล้ว (ตัดแท่งที่กำลังวิ่ง) เป็นคอลัมน์ NumPy"""
+        klines = await self.safe_api_call(self.client.futures_klines, symbol=symbol, interval=interval, limit=limit)
+        now_ms = time.time() * 1000
+        return klines_to_columns([k for k in klines if int(k[6]) <= now_ms])
+
+    async def backfill_timeframes(self, symbol: str):
+        """ดึงประวัติทุก timeframe จาก REST ครั้งเดียว (1m ยาวพอครอบคลุมแท่งใหญ่ที่ยังไม่ปิด)"""
+        history = self.aggregator.history
+        longest = max(interval_to_ms(tf) for tf in self.aggregator.timeframes)
+        forming_minutes = int(time.time() * 1000) % longest // interval_to_ms(BASE_INTERVAL)
+        base_limit = min(1500, max(history, forming_minutes) + 2)
+
+        higher = [tf for tf in self.aggregator.timeframes if tf != BASE_INTERVAL]
+        results = await asyncio.gather(*(self.fetch_closed_klines(symbol, tf, history + 1) for tf in higher))
+        for tf, columns in zip(higher, results):
+            self.aggregator.backfill(symbol, tf, columns)
+        self.aggregator.backfill(symbol, BASE_INTERVAL, await self.fetch_closed_klines(symbol, BASE_INTERVAL, base_limit))
+        self.aggregator.align(symbol)
+
+    async def refresh_base_klines(self, symbol: str):
+        """ดึงเฉพาะแท่ง 1m ที่ยังไม่มีในเครื่อง"""
+        step = interval_to_ms(BASE_INTERVAL)
+        missing = int((time.time() * 1000 - self.aggregator.last_open_time(symbol)) // step) - 1
+        if missing <= 0:
+            return
+        if missing >= 1500:
+            await self.backfill_timeframes(symbol)  # หายไปนานเกิน limit ของ REST: เริ่มใหม่
+            return
+        self.aggregator.update(symbol, await self.fetch_closed_klines(symbol, BASE_INTERVAL, missing + 1))
     
     async def get_market_data(self, symbol: str, interval: str = '1h', limit: int = 100) -> pd.DataFrame:
         """ดึงข้อมูลตลาดสำหรับการวิเคราะห์"""
@@ -70,12 +146,30 @@ class CoinAnalyzer:
             logger.error(f"Error getting market data for {symbol} {interval}: {e}")
             return pd.DataFrame()
     
+    def request_slots(self) -> asyncio.Semaphore:
+        """Semaphore จำกัด request พร้อมกัน (สร้างใหม่เมื่อเปลี่ยน event loop)"""
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(self.max_concurrency), loop
+        return self._slots
+
     async def safe_api_call(self, api_func, *args, **kwargs):
-        """Safe API call with retry logic"""
+        """
+        Safe API call with retry logic
+
+        client เป็นแบบ blocking จึงรันใน thread: request ของหลาย symbol / timeframe ทำงานพร้อมกันจริง
+        ภายใต้ max_concurrency, rate limiter ที่ใช้ร่วมกัน และ timeout ต่อ request
+        """
         max_retries = 3
+        weight = request_weight(getattr(api_func, '__name__', ''), kwargs)
         for attempt in range(max_retries):
             try:
-                return api_func(*args, **kwargs)
+                async with self.request_slots():
+                    await self.rate_limiter.acquire(weight)
+                    if not self.offload_api_calls:
+                        return api_func(*args, **kwargs)
+                    return await asyncio.wait_for(asyncio.to_thread(api_func, *args, **kwargs),
+                                                  self.request_timeout)
             except Exception as e:
                 if attempt == max_retries - 1:
                     raise e
@@ -99,11 +193,11 @@ class CoinAnalyzer:
         if df.empty:
             return 0.0
         
-        # Calculate daily returns
-        df['returns'] = df['close'].pct_change()
+        # Calculate daily returns (ไม่เพิ่มคอลัมน์ใน df ของผู้เรียก)
+        returns = df['close'].pct_change()
         
         # Calculate volatility (standard deviation of returns)
-        volatility = df['returns'].std() * np.sqrt(24)  # Annualized (24 hours)
+        volatility = returns.std() * np.sqrt(24)  # Annualized (24 hours)
         return volatility * 100  # Convert to percentage
     
     def calculate_volume_profile_multi_tf(self, timeframe_data: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
@@ -194,17 +288,17 @@ class CoinAnalyzer:
         if df.empty or len(df) < 20:
             return 0.0
         
-        # คำนวณ SMA
-        df['sma20'] = df['close'].rolling(window=20).mean()
-        df['sma50'] = df['close'].rolling(window=50).mean()
+        # คำนวณ SMA (ไม่เพิ่มคอลัมน์ใน df ของผู้เรียก)
+        sma20 = df['close'].rolling(window=20).mean()
+        sma50 = df['close'].rolling(window=50).mean()
         
         # ดูทิศทางของ SMA
-        current_sma20 = df['sma20'].iloc[-1]
-        current_sma50 = df['sma50'].iloc[-1]
+        current_sma20 = sma20.iloc[-1]
+        current_sma50 = sma50.iloc[-1]
         
         # คำนวณความชันของ SMA
-        sma20_slope = (df['sma20'].iloc[-1] - df['sma20'].iloc[-10]) / df['sma20'].iloc[-10] * 100
-        sma50_slope = (df['sma50'].iloc[-1] - df['sma50'].iloc[-10]) / df['sma50'].iloc[-10] * 100
+        sma20_slope = (sma20.iloc[-1] - sma20.iloc[-10]) / sma20.iloc[-10] * 100
+        sma50_slope = (sma50.iloc[-1] - sma50.iloc[-10]) / sma50.iloc[-10] * 100
         
         # คำนวณความแข็งแกร่งของเทรนด์
         trend_strength = 0
@@ -237,11 +331,44 @@ class CoinAnalyzer:
         return max(-100, min(100, trend_strength))
     
     async def analyze_coin_multi_tf(self, symbol: str) -> Dict:
-        """วิเคราะห์เหรียญหลาย Timeframe"""
-        cache_key = f"{symbol}_{int(time.time() // self.cache_duration)}"
-        if cache_key in self.coin_analysis_cache:
-            return self.coin_analysis_cache[cache_key]
-        
+        """
+        วิเคราะห์เหรียญหลาย Timeframe
+
+        มีผลใน cache -> คืนทันที (แม้หมดอายุแล้ว) และถ้าใกล้หมดอายุ refresh ใน background
+        ไม่มี -> วิเคราะห์ตอนนี้
+        """
+        cached = self.coin_analysis_cache.get(symbol, allow_stale=True)
+        if cached is not None:
+            if self.coin_analysis_cache.needs_refresh(symbol):
+                self.schedule_refresh(symbol)
+            return cached
+        return await self.refresh_analysis(symbol)
+
+    def cached_analysis(self, symbol: str) -> Optional[Dict]:
+        """ผลวิเคราะห์ใน cache โดยไม่รอ network (ไม่มี / ใกล้หมดอายุ -> วิเคราะห์ใน background)"""
+        cached = self.coin_analysis_cache.get(symbol, allow_stale=True)
+        if self.coin_analysis_cache.needs_refresh(symbol):
+            self.schedule_refresh(symbol)
+        return cached
+
+    def schedule_refresh(self, symbol: str):
+        """วิเคราะห์ symbol ใหม่ใน background (ไม่ซ้อนกันต่อ symbol)"""
+        task = self.refresh_tasks.get(symbol)
+        if task is not None and not task.done():
+            return
+        self.background_refreshes += 1
+        task = asyncio.create_task(self.refresh_analysis(symbol))
+        self.refresh_tasks[symbol] = task
+        task.add_done_callback(lambda _: self.refresh_tasks.pop(symbol, None))
+
+    def cache_stats(self) -> Dict:
+        stats = self.coin_analysis_cache.stats()
+        stats['background_refreshes'] = self.background_refreshes
+        stats['refreshing'] = len(self.refresh_tasks)
+        return stats
+
+    async def refresh_analysis(self, symbol: str) -> Dict:
+        """วิเคราะห์ symbol จากข้อมูลตลาดล่าสุดแล้วเก็บใน cache (ผล default ไม่ถูก cache)"""
         try:
             # ดึงข้อมูลหลาย Timeframe แบบขนาน
             timeframe_data = await self.get_market_data_parallel(symbol)
@@ -249,190 +376,180 @@ class CoinAnalyzer:
             if not timeframe_data or all(df.empty for df in timeframe_data.values()):
                 return self._get_default_analysis(symbol)
             
-            # ใช้ข้อมูล 1h สำหรับราคาปัจจุบัน
-            current_price = 0
-            if '1h' in timeframe_data and not timeframe_data['1h'].empty:
-                current_price = float(timeframe_data['1h']['close'].iloc[-1])
-            elif '5m' in timeframe_data and not timeframe_data['5m'].empty:
-                current_price = float(timeframe_data['5m']['close'].iloc[-1])
-            else:
-                # ใช้ Timeframe แรกที่มีข้อมูล
-                for tf, df in timeframe_data.items():
-                    if not df.empty:
-                        current_price = float(df['close'].iloc[-1])
-                        break
-            
+            self.update_metrics(symbol)
+            current_price = self._current_price(symbol, timeframe_data)
             if current_price == 0:
                 return self._get_default_analysis(symbol)
             
-            # คำนวณเมตริกหลาย Timeframe
-            volatility_multi = self.calculate_volatility_multi_tf(timeframe_data)
-            volume_multi = self.calculate_volume_profile_multi_tf(timeframe_data)
-            liquidity_multi = self.calculate_liquidity_score_multi_tf(timeframe_data)
-            trend_multi = self.calculate_trend_strength_multi_tf(timeframe_data)
-            
-            # คำนวณค่าเฉลี่ยถ่วงน้ำหนัก (ให้น้ำหนักมากกับ Timeframe ที่นานกว่า)
-            tf_weights = {
-                '1m': 0.05, '5m': 0.1, '15m': 0.15, 
-                '1h': 0.25, '4h': 0.25, '1d': 0.2
-            }
-            
-            # คำนวณค่าเฉลี่ยถ่วงน้ำหนัก
-            weighted_volatility = sum(volatility_multi.get(tf, 0) * tf_weights.get(tf, 0) for tf in tf_weights)
-            weighted_volume = sum(volume_multi.get(tf, {}).get('avg_volume', 0) * tf_weights.get(tf, 0) for tf in tf_weights)
-            weighted_liquidity = sum(liquidity_multi.get(tf, 0) * tf_weights.get(tf, 0) for tf in tf_weights)
-            weighted_trend = sum(trend_multi.get(tf, 0) * tf_weights.get(tf, 0) for tf in tf_weights)
-            
-            # สร้าง volume profile รวม
-            combined_volume_profile = {
-                'avg_volume': weighted_volume,
-                'volume_stability': sum(volume_multi.get(tf, {}).get('volume_stability', 0) * tf_weights.get(tf, 0) for tf in tf_weights)
-            }
-            
-            # กำหนดหมวดหมู่
-            order_size_category = self._determine_order_size_category(
-                weighted_volatility, combined_volume_profile, weighted_liquidity
-            )
+            analysis = self.build_analysis(symbol, current_price, self.timeframe_metrics(symbol, timeframe_data))
             
-            leverage_category = self._determine_leverage_category(
-                weighted_volatility, combined_volume_profile, weighted_trend
-            )
+            # Cache the result
+            self.coin_analysis_cache.set(symbol, analysis)
             
-            # คำนวณคำแนะนำ
-            recommendations = self._calculate_recommendations(
-                order_size_category, leverage_category, weighted_volatility, weighted_liquidity
-            )
+            return analysis
             
+        except Exception as e:
+            logger.error(f"Error analyzing {symbol} with multi-TF: {e}")
+            return self._get_default_analysis(symbol)
+    
+    def snapshot_state(self) -> Dict:
+        """state สำหรับ warm restart: ผลวิเคราะห์ (พร้อมอายุ), แท่งใน aggregator และ rolling metrics"""
+        return {
+            'saved_at': time.time(),
+            'analyses': list(self.coin_analysis_cache.items()),
+            'aggregator': self.aggregator.state(),
+            'metrics': self.metrics.state(),
+        }
+
+    def restore_state(self, state: Dict, max_age: float) -> List[str]:
+        """
+        โหลด state จาก snapshot_state (เก่ากว่า max_age วินาที -> ไม่ใช้)
+
+        ผลวิเคราะห์ถูกเก็บพร้อมอายุจริง จึงถึงจุด refresh ตามเวลาเดิม
+
+        Returns:
+            symbol ที่ได้ผลวิเคราะห์คืนมา
+        """
+        elapsed = time.time() - state.get('saved_at', 0)
+        if elapsed > max_age:
+            logger.info(f"Coin analysis snapshot is {elapsed / 60:.0f} min old - ignoring")
+            return []
+        if self.aggregator.restore(state['aggregator']):
+            self.metrics.restore(state['metrics'])
+        restored = []
+        for symbol, analysis, age in state['analyses']:
+            self.coin_analysis_cache.set(symbol, analysis, age=age + elapsed)
+            restored.append(symbol)
+        return restored
+
+    def update_metrics(self, symbol: str):
+        """ป้อนแท่งที่ปิดใหม่ใน aggregator ให้ rolling metrics (เฉพาะแท่งที่ยังไม่เคยป้อน)"""
+        for tf in self.aggregator.timeframes:
+            self.metrics.update(symbol, tf, self.aggregator.columns(symbol, tf))
+
+    def on_bars_closed(self, symbol: str, columns: Dict[str, np.ndarray], interval: str = BASE_INTERVAL):
+        """
+        แท่ง 1m ที่ปิดแล้วจาก TradingBot: อัปเดต aggregator + metrics แล้วคำนวณหมวดหมู่ใหม่ลง cache
+
+        ไม่มี I/O และต้นทุนคงที่ต่อแท่ง - คำแนะนำจึงตามข้อมูลล่าสุดโดยไม่ต้องดึงข้อมูลใหม่ทุกชั่วโมง
+        แท่ง interval อื่นถูกข้าม (aggregator รับเฉพาะ 1m) - refresh_analysis ดึงจาก REST แทน
+        """
+        if interval != BASE_INTERVAL:
+            return
+        self.aggregator.update(symbol, columns)
+        if not self.aggregator.is_backfilled(symbol):
+            return  # ยังไม่มีประวัติครบ - รอ refresh_analysis
+        self.update_metrics(symbol)
+        current_price = self._current_price(symbol)
+        if current_price:
+            self.coin_analysis_cache.set(
+                symbol, self.build_analysis(symbol, current_price, self.timeframe_metrics(symbol)))
+
+    def timeframe_metrics(self, symbol: str, timeframe_data: Dict[str, pd.DataFrame] = None) -> Dict[str, Dict]:
+        """
+        เมตริกทุก timeframe: จาก rolling metrics ถ้ามี, ไม่มี (timeframe ที่ดึงจาก REST) คำนวณจาก DataFrame
+        """
+        timeframes = list(timeframe_data) if timeframe_data is not None else self.timeframes
+        frames = {tf: df for tf, df in (timeframe_data or {}).items() if self.metrics.get(symbol, tf) is None}
+        result = self.metrics.snapshot(symbol, [tf for tf in timeframes if tf not in frames])
+        result['volatility'].update(self.calculate_volatility_multi_tf(frames))
+        result['volume_profile'].update(self.calculate_volume_profile_multi_tf(frames))
+        result['liquidity_score'].update(self.calculate_liquidity_score_multi_tf(frames))
+        result['trend_strength'].update(self.calculate_trend_strength_multi_tf(frames))
+        return result
+
+    def _current_price(self, symbol: str, timeframe_data: Dict[str, pd.DataFrame] = None) -> float:
+        """ราคาปิดล่าสุด (1h ก่อน, แล้ว 5m, แล้ว timeframe แรกที่มีข้อมูล)"""
+        for tf in ['1h', '5m'] + self.timeframes:
+            metrics = self.metrics.get(symbol, tf)
+            if metrics is not None:
+                return metrics.last_close
+            df = (timeframe_data or {}).get(tf)
+            if df is not None and not df.empty:
+                return float(df['close'].iloc[-1])
+        for df in (timeframe_data or {}).values():
+            if not df.empty:
+                return float(df['close'].iloc[-1])
+        return 0
+
+    def build_analysis(self, symbol: str, current_price: float, metrics: Dict[str, Dict]) -> Dict:
+        """รวมเมตริกหลาย Timeframe เป็นหมวดหมู่และคำแนะนำ"""
+        return self.build_analyses([symbol], [current_price], [metrics])[symbol]
+
+    def build_analyses(self, symbols: List[str], prices: List[float], metrics: List[Dict[str, Dict]],
+                       rank: bool = False) -> Dict[str, Dict]:
+        """
+        ให้คะแนนหลายเหรียญพร้อมกัน (coin_scoring): ค่าเฉลี่ยถ่วงน้ำหนัก, หมวดหมู่ และคำแนะนำในครั้งเดียว
+
+        rank=True เพิ่ม 'ranks' (percentile เทียบกับเหรียญอื่นในชุดเดียวกัน)
+        """
+        scores = coin_scoring.score_coins(coin_scoring.metric_matrices(metrics))
+        ranks = coin_scoring.cross_sectional_ranks(scores) if rank else None
+        now = time.time()
+        analyses = {}
+        for i, symbol in enumerate(symbols):
+            order_size_category = str(scores['order_size'][i])
+            leverage_category = str(scores['leverage'][i])
+            weighted_volatility = float(scores['volatility'][i])
+            weighted_liquidity = float(scores['liquidity_score'][i])
             analysis = {
                 'symbol': symbol,
-                'current_price': current_price,
-                'timeframe_analysis': {
-                    'volatility': volatility_multi,
-                    'volume_profile': volume_multi,
-                    'liquidity_score': liquidity_multi,
-                    'trend_strength': trend_multi
-                },
+                'current_price': prices[i],
+                'timeframe_analysis': metrics[i],
                 'weighted_metrics': {
                     'volatility': weighted_volatility,
-                    'volume_profile': combined_volume_profile,
+                    'volume_profile': {
+                        'avg_volume': float(scores['avg_volume'][i]),
+                        'volume_stability': float(scores['volume_stability'][i])
+                    },
                     'liquidity_score': weighted_liquidity,
-                    'trend_strength': weighted_trend
+                    'trend_strength': float(scores['trend_strength'][i])
                 },
                 'categories': {
                     'order_size': order_size_category,
                     'leverage': leverage_category
                 },
-                'recommendations': recommendations,
-                'timestamp': time.time()
+                'recommendations': self._calculate_recommendations(
+                    order_size_category, leverage_category, weighted_volatility, weighted_liquidity
+                ),
+                'timestamp': now
             }
-            
-            # Cache the result
-            self.coin_analysis_cache[cache_key] = analysis
-            
-            return analysis
-            
-        except Exception as e:
-            logger.error(f"Error analyzing {symbol} with multi-TF: {e}")
-            return self._get_default_analysis(symbol)
-    
+            if ranks is not None:
+                analysis['ranks'] = {name: float(values[i]) for name, values in ranks.items()}
+            analyses[symbol] = analysis
+        return analyses
+
+    def score_symbols(self, symbols: List[str]) -> Dict[str, Dict]:
+        """ให้คะแนนทุกเหรียญที่มี rolling metrics แล้วในครั้งเดียว (ไม่มี I/O) พร้อม ranks"""
+        prices = {symbol: self._current_price(symbol) for symbol in symbols}
+        ready = [symbol for symbol in symbols if prices[symbol]]
+        return self.build_analyses(ready, [prices[symbol] for symbol in ready],
+                                   [self.timeframe_metrics(symbol) for symbol in ready], rank=True)
+
     async def analyze_coin(self, symbol: str) -> Dict:
         """วิเคราะห์เหรียญแบบเดิม (ใช้ 1h timeframe)"""
         return await self.analyze_coin_multi_tf(symbol)
     
     def _determine_order_size_category(self, volatility: float, volume_profile: Dict, 
                                      liquidity_score: float) -> str:
-        """กำหนดหมวดหมู่ขนาด order"""
-        
-        # Scoring system for order size (0-100)
-        score = 0
-        
-        # Volatility factor (lower volatility = larger orders)
-        if volatility < 2:
-            score += 30  # Low volatility
-        elif volatility < 5:
-            score += 20  # Medium volatility
-        elif volatility < 10:
-            score += 10  # High volatility
-        else:
-            score += 5   # Very high volatility
-        
-        # Volume factor (higher volume = larger orders)
-        if volume_profile['avg_volume'] > 1000000:
-            score += 25  # High volume
-        elif volume_profile['avg_volume'] > 500000:
-            score += 20  # Medium-high volume
-        elif volume_profile['avg_volume'] > 100000:
-            score += 15  # Medium volume
-        else:
-            score += 5   # Low volume
-        
-        # Liquidity factor
-        score += liquidity_score * 0.25  # 25% weight
-        
-        # Determine category
-        if score >= 70:
-            return "LARGE"
-        elif score >= 40:
-            return "MEDIUM"
-        else:
-            return "SMALL"
+        """กำหนดหมวดหมู่ขนาด order (เหรียญเดียว - กฎอยู่ใน coin_scoring)"""
+        score = coin_scoring.order_size_score(
+            np.array([volatility], dtype=float), np.array([volume_profile['avg_volume']], dtype=float),
+            np.array([liquidity_score], dtype=float))
+        return str(coin_scoring.ORDER_SIZE_LABELS[coin_scoring.category_index(score)][0])
     
     def _determine_leverage_category(self, volatility: float, volume_profile: Dict, 
                                    trend_strength: float = 0) -> str:
-        """กำหนดหมวดหมู่ leverage"""
-        
-        # Scoring system for leverage (0-100)
-        score = 0
-        
-        # Volatility factor (lower volatility = higher leverage)
-        if volatility < 2:
-            score += 40  # Low volatility = high leverage
-        elif volatility < 5:
-            score += 30  # Medium volatility = medium leverage
-        elif volatility < 10:
-            score += 20  # High volatility = low leverage
-        else:
-            score += 10  # Very high volatility = very low leverage
-        
-        # Volume stability factor (stable volume = higher leverage)
-        score += volume_profile['volume_stability'] * 30
-        
-        # เพิ่มปัจจัยความแข็งแกร่งของเทรนด์
-        if trend_strength > 50:
-            score += 25  # Strong trend
-        elif trend_strength > 0:
-            score += 15  # Weak trend
-        elif trend_strength > -50:
-            score += 5   # Sideways
-        else:
-            score -= 10  # Strong counter-trend
-        
-        # Determine category
-        if score >= 70:
-            return "HIGH"
-        elif score >= 40:
-            return "MEDIUM"
-        else:
-            return "LOW"
+        """กำหนดหมวดหมู่ leverage (เหรียญเดียว - กฎอยู่ใน coin_scoring)"""
+        score = coin_scoring.leverage_score(
+            np.array([volatility], dtype=float), np.array([volume_profile['volume_stability']], dtype=float),
+            np.array([trend_strength], dtype=float))
+        return str(coin_scoring.LEVERAGE_LABELS[coin_scoring.category_index(score)][0])
     
     def _calculate_recommendations(self, order_size_category: str, leverage_category: str,
                                  volatility: float, liquidity_score: float) -> Dict:
         """คำนวณคำแนะนำเฉพาะ"""
         
-        # Position size multipliers
-        size_multipliers = {
-            "LARGE": 1.0,    # 100% of available balance
-            "MEDIUM": 0.6,   # 60% of available balance
-            "SMALL": 0.3     # 30% of available balance
-        }
-        
-        # Leverage recommendations
-        leverage_recommendations = {
-            "HIGH": {"min": 10, "max": 50, "recommended": 20},
-            "MEDIUM": {"min": 5, "max": 20, "recommended": 10},
-            "LOW": {"min": 1, "max": 10, "recommended": 5}
-        }
-        
         # Risk management recommendations
         risk_recommendations = {
             "max_positions": 3 if order_size_category == "LARGE" else 5,
@@ -440,8 +557,8 @@ class CoinAnalyzer:
         }
         
         return {
-            "position_size_multiplier": size_multipliers[order_size_category],
-            "leverage": leverage_recommendations[leverage_category],
+            "position_size_multiplier": coin_scoring.SIZE_MULTIPLIERS[order_size_category],
+            "leverage": dict(coin_scoring.LEVERAGE_RECOMMENDATIONS[leverage_category]),
             "risk_management": risk_recommendations,
             "notes": self._generate_analysis_notes(order_size_category, leverage_category, volatility, liquidity_score)
         }
@@ -526,7 +643,20 @@ class CoinAnalyzer:
                 results[symbol] = analysis
                 logger.info(f"✅ Analyzed {symbol}: {analysis['categories']['order_size']} size, {analysis['categories']['leverage']} leverage")
         
+        self.rank_analyses(results)
         return results
+
+    def rank_analyses(self, analyses: Dict[str, Dict]):
+        """เพิ่ม 'ranks' (percentile เทียบกับเหรียญอื่น) ให้ผลวิเคราะห์ที่มี timeframe_analysis"""
+        ranked = [symbol for symbol, analysis in analyses.items() if analysis.get('timeframe_analysis')]
+        if len(ranked) < 2:
+            return
+        scores = coin_scoring.score_coins(coin_scoring.metric_matrices(
+            [analyses[symbol]['timeframe_analysis'] for symbol in ranked]))
+        ranks = coin_scoring.cross_sectional_ranks(scores)
+        for i, symbol in enumerate(ranked):
+            # สำเนาตื้น: ไม่แก้ dict ที่อยู่ใน cache
+            analyses[symbol] = dict(analyses[symbol], ranks={name: float(values[i]) for name, values in ranks.items()})
     
     def get_summary_report(self, analyses: Dict[str, Dict]) -> str:
         """สร้างรายงานสรุปการวิเคราะห์"""
@@ -577,6 +707,13 @@ class CoinAnalyzer:
         report += "   • คำนวณค่าเฉลี่ยถ่วงน้ำหนัก (ให้น้ำหนักมากกับ Timeframe ที่นานกว่า)\n"
         report += "   • วิเคราะห์ความแข็งแกร่งของเทรนด์จากหลาย Timeframe\n\n"
         
+        # Cross-sectional ranking
+        ranked = [symbol for symbol, analysis in analyses.items() if 'ranks' in analysis]
+        if ranked:
+            overall = np.array([analyses[symbol]['ranks']['overall'] for symbol in ranked])
+            report += "🏆 อันดับรวม (สภาพคล่อง, volume, ความผันผวนต่ำ):\n"
+            report += f"   {', '.join(coin_scoring.top_ranked(ranked, overall, 5))}\n\n"
+        
         # Recommendations
         report += "💡 คำแนะนำ:\n"
         if large_orders:
@@ -2,29 +2,37 @@ from flask import Flask, jsonify, request
 from trading_bot import TradingBot
 import asyncio
 import json
+import threading
 from datetime import datetime
 import config
 
 app = Flask(__name__)
 bot = None
+bot_lock = threading.Lock()
 
 def get_bot():
     global bot
-    if bot is None:
-        bot = TradingBot()
+    with bot_lock:
+        if bot is None:
+            bot = TradingBot()
+        if bot.loop is None:
+            # event loop เดียวของ bot ใน thread เบื้องหลัง: refresh task ของ CoinAnalyzer ไม่ถูกยกเลิก
+            # และ cache / aggregator ถูกแก้จาก thread เดียว
+            bot.loop = asyncio.new_event_loop()
+            threading.Thread(target=bot.loop.run_forever, name='bot-loop', daemon=True).start()
     return bot
 
+def run_on_bot_loop(coro):
+    """รัน coroutine บน event loop ของ bot แล้วรอผลจาก thread ของ Flask (แทน asyncio.run)"""
+    return asyncio.run_coroutine_threadsafe(coro, get_bot().loop).result()
+
 @app.route('/api/coin-analysis', methods=['GET'])
 def get_coin_analysis():
     """ดึงผลการวิเคราะห์เหรียญทั้งหมด"""
     try:
         bot_instance = get_bot()
         
-        # ใช้ asyncio.run เพื่อเรียก async function
-        async def get_analysis():
-            return await bot_instance.analyze_coins()
-        
-        analyses = asyncio.run(get_analysis())
+        analyses = run_on_bot_loop(bot_instance.analyze_coins())
         
         # Format response
         formatted_analyses = {}
@@ -69,10 +77,8 @@ def get_single_coin_analysis(symbol):
     try:
         bot_instance = get_bot()
         
-        async def get_analysis():
-            return await bot_instance.get_coin_recommendations(symbol)
-        
-        analysis = asyncio.run(get_analysis())
+        # endpoint นี้ไม่อยู่บน path ที่เทรด: ยังไม่มีใน cache -> รอวิเคราะห์ symbol นี้
+        analysis = run_on_bot_loop(bot_instance.coin_analyzer.analyze_coin_multi_tf(symbol))
         
         if not analysis:
             return jsonify({
@@ -125,7 +131,7 @@ def get_analysis_summary():
             analyses = await bot_instance.analyze_coins()
             return bot_instance.coin_analyzer.get_summary_report(analyses)
         
-        summary = asyncio.run(get_summary())
+        summary = run_on_bot_loop(get_summary())
         
         return jsonify({
             'status': 'success',
@@ -192,7 +198,7 @@ def get_recommendations():
                 }
             }
         
-        recommendations = asyncio.run(get_recommendations())
+        recommendations = run_on_bot_loop(get_recommendations())
         
         return jsonify({
             'status': 'success',
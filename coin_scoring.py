@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Coin Scoring - ให้คะแนนหมวดหมู่ order size / leverage ของหลายเหรียญพร้อมกันด้วย NumPy
+
+รับเมตริกเป็นเมทริกซ์ (symbols x timeframes) แล้วคำนวณค่าเฉลี่ยถ่วงน้ำหนักตาม timeframe,
+คะแนน, หมวดหมู่ และคำแนะนำของทุกเหรียญในครั้งเดียว (กฎเดียวกับ CoinAnalyzer เดิม)
+พร้อม percentile rank แบบ cross-sectional ซึ่งมีความหมายเมื่อให้คะแนนทุกเหรียญพร้อมกันเท่านั้น
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# น้ำหนักของแต่ละ Timeframe (ให้น้ำหนักมากกับ Timeframe ที่นานกว่า)
+TF_WEIGHTS = {
+    '1m': 0.05, '5m': 0.1, '15m': 0.15,
+    '1h': 0.25, '4h': 0.25, '1d': 0.2
+}
+
+ORDER_SIZE_LABELS = np.array(['SMALL', 'MEDIUM', 'LARGE'])
+LEVERAGE_LABELS = np.array(['LOW', 'MEDIUM', 'HIGH'])
+SIZE_MULTIPLIERS = {'LARGE': 1.0, 'MEDIUM': 0.6, 'SMALL': 0.3}
+LEVERAGE_RECOMMENDATIONS = {
+    'HIGH': {'min': 10, 'max': 50, 'recommended': 20},
+    'MEDIUM': {'min': 5, 'max': 20, 'recommended': 10},
+    'LOW': {'min': 1, 'max': 10, 'recommended': 5},
+}
+# ตาม index ของ labels ด้านบน
+SIZE_MULTIPLIER_VALUES = np.array([SIZE_MULTIPLIERS[label] for label in ORDER_SIZE_LABELS])
+LEVERAGE_RECOMMENDED = np.array([LEVERAGE_RECOMMENDATIONS[label]['recommended'] for label in LEVERAGE_LABELS])
+
+
+def metric_matrices(timeframe_metrics: Sequence[Dict], timeframes: Sequence[str] = tuple(TF_WEIGHTS)) -> Dict[str, np.ndarray]:
+    """
+    เมตริกรูปแบบ CoinAnalyzer.timeframe_metrics ของหลายเหรียญ -> เมทริกซ์ (symbols x timeframes)
+
+    timeframe ที่ไม่มีข้อมูลเป็น 0 (เหมือน dict.get(tf, 0) ของสูตรเดิม)
+    """
+    def matrix(values):
+        return np.array(values, dtype=np.float64).reshape(len(timeframe_metrics), len(timeframes))
+
+    return {
+        'volatility': matrix([[m['volatility'].get(tf, 0) for tf in timeframes] for m in timeframe_metrics]),
+        'avg_volume': matrix([[m['volume_profile'].get(tf, {}).get('avg_volume', 0) for tf in timeframes]
+                              for m in timeframe_metrics]),
+        'volume_stability': matrix([[m['volume_profile'].get(tf, {}).get('volume_stability', 0) for tf in timeframes]
+                                    for m in timeframe_metrics]),
+        'liquidity_score': matrix([[m['liquidity_score'].get(tf, 0) for tf in timeframes] for m in timeframe_metrics]),
+        'trend_strength': matrix([[m['trend_strength'].get(tf, 0) for tf in timeframes] for m in timeframe_metrics]),
+    }
+
+
+def order_size_score(volatility: np.ndarray, avg_volume: np.ndarray, liquidity_score: np.ndarray) -> np.ndarray:
+    """คะแนน order size (0-100): ผันผวนต่ำ, volume สูง, สภาพคล่องดี = order ใหญ่"""
+    volatility_points = np.select([volatility < 2, volatility < 5, volatility < 10], [30, 20, 10], 5)
+    volume_points = np.select([avg_volume > 1000000, avg_volume > 500000, avg_volume > 100000], [25, 20, 15], 5)
+    return volatility_points + volume_points + liquidity_score * 0.25
+
+
+def leverage_score(volatility: np.ndarray, volume_stability: np.ndarray, trend_strength: np.ndarray) -> np.ndarray:
+    """คะแนน leverage (0-100): ผันผวนต่ำ, volume คงที่, เทรนด์แข็ง = leverage สูง"""
+    volatility_points = np.select([volatility < 2, volatility < 5, volatility < 10], [40, 30, 20], 10)
+    trend_points = np.select([trend_strength > 50, trend_strength > 0, trend_strength > -50], [25, 15, 5], -10)
+    return volatility_points + volume_stability * 30 + trend_points
+
+
+def category_index(score: np.ndarray) -> np.ndarray:
+    """>= 70 -> 2 (สูง), >= 40 -> 1 (กลาง), อื่นๆ (รวม NaN) -> 0 (ต่ำ)"""
+    return np.where(score >= 70, 2, np.where(score >= 40, 1, 0))
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """percentile (0-1) ของแต่ละค่าเทียบกับทั้งชุด (ค่าเท่ากันได้ rank เฉลี่ย, NaN คงเป็น NaN)"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    ranks = np.full(values.shape, np.nan)
+    if valid.any():
+        ordered = np.sort(values[valid])
+        below = np.searchsorted(ordered, values[valid], side='left')
+        through = np.searchsorted(ordered, values[valid], side='right')
+        ranks[valid] = (below + through) / 2 / len(ordered)
+    return ranks
+
+
+def score_coins(matrices: Dict[str, np.ndarray], timeframes: Sequence[str] = tuple(TF_WEIGHTS),
+                tf_weights: Dict[str, float] = TF_WEIGHTS) -> Dict[str, np.ndarray]:
+    """ค่าเฉลี่ยถ่วงน้ำหนัก, คะแนน, หมวดหมู่ และคำแนะนำของทุกเหรียญ (arrays ยาวเท่าจำนวนเหรียญ)"""
+    weights = np.array([tf_weights.get(tf, 0) for tf in timeframes], dtype=np.float64)
+    weighted = {name: matrix @ weights for name, matrix in matrices.items()}
+
+    size_score = order_size_score(weighted['volatility'], weighted['avg_volume'], weighted['liquidity_score'])
+    lev_score = leverage_score(weighted['volatility'], weighted['volume_stability'], weighted['trend_strength'])
+    size_index = category_index(size_score)
+    leverage_index = category_index(lev_score)
+    return {
+        'volatility': weighted['volatility'],
+        'avg_volume': weighted['avg_volume'],
+        'volume_stability': weighted['volume_stability'],
+        'liquidity_score': weighted['liquidity_score'],
+        'trend_strength': weighted['trend_strength'],
+        'order_size_score': size_score,
+        'leverage_score': lev_score,
+        'order_size': ORDER_SIZE_LABELS[size_index],
+        'leverage': LEVERAGE_LABELS[leverage_index],
+        'position_size_multiplier': SIZE_MULTIPLIER_VALUES[size_index],
+        'leverage_recommended': LEVERAGE_RECOMMENDED[leverage_index],
+    }
+
+
+def cross_sectional_ranks(scores: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    percentile ของแต่ละเหรียญเทียบกับเหรียญอื่นในรอบเดียวกัน (1 = ดีที่สุด)
+
+    overall = เฉลี่ยของสภาพคล่อง, volume และความผันผวนต่ำ
+    """
+    ranks = {
+        'liquidity': percentile_rank(scores['liquidity_score']),
+        'volume': percentile_rank(scores['avg_volume']),
+        'low_volatility': percentile_rank(-scores['volatility']),
+        'trend': percentile_rank(scores['trend_strength']),
+    }
+    ranks['overall'] = (ranks['liquidity'] + ranks['volume'] + ranks['low_volatility']) / 3
+    return ranks
+
+
+def top_ranked(symbols: List[str], overall: np.ndarray, count: int = 3) -> List[str]:
+    """symbol ที่ overall rank สูงสุด count ตัว"""
+    order = np.argsort(-np.nan_to_num(overall, nan=-1.0), kind='stable')
+    return [symbols[i] for i in order[:count]]
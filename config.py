@@ -35,6 +35,52 @@ CIRCUIT_BREAKER_ENABLED = _config.get('CIRCUIT_BREAKER_ENABLED', True)
 MAX_DAILY_TRADES = _config.get('MAX_DAILY_TRADES', 50)
 RISK_FREE_RATE = _config.get('RISK_FREE_RATE', 0.02)
 
+# Indicator backend: 'pandas_ta' or 'numpy' (indicator_kernels.py, same formulas)
+INDICATOR_BACKEND = _config.get('INDICATOR_BACKEND', 'pandas_ta')
+
+# Where indicator / signal evaluation runs: 'process' (spawned workers), 'thread' or 'inline' (signal_pool.py)
+SIGNAL_EXECUTOR = _config.get('SIGNAL_EXECUTOR', 'thread')
+SIGNAL_WORKERS = _config.get('SIGNAL_WORKERS', 0)  # 0 = os.cpu_count()
+
+# Candle-close scheduling (candle_scheduler.py)
+CANDLE_INTERVAL = _config.get('CANDLE_INTERVAL', '1m')
+CANDLE_CLOSE_OFFSET_MS = _config.get('CANDLE_CLOSE_OFFSET_MS', 1500)  # wait after close before evaluating
+EXIT_CHECK_SECONDS = _config.get('EXIT_CHECK_SECONDS', 0)  # intra-candle TP / trailing stop checks (0 = off)
+
+# Activity-weighted symbol scheduling (activity_scheduler.py)
+ACTIVITY_MAX_INTERVAL = _config.get('ACTIVITY_MAX_INTERVAL', 5)  # quiet symbols: every N candles (1 = every candle)
+SYMBOLS_PER_CANDLE = _config.get('SYMBOLS_PER_CANDLE', 0)  # evaluation budget per candle (0 = unlimited)
+
+# API concurrency / rate limiting (rate_limiter.py)
+API_WEIGHT_PER_MINUTE = _config.get('API_WEIGHT_PER_MINUTE', 1200)  # shared by TradingBot + CoinAnalyzer (Binance cap: 2400)
+API_REQUEST_TIMEOUT = _config.get('API_REQUEST_TIMEOUT', 10)  # seconds per CoinAnalyzer request
+EXCHANGE_INFO_TTL = _config.get('EXCHANGE_INFO_TTL', 3600)  # seconds before cached exchangeInfo is refetched
+ACCOUNT_REFRESH_INTERVAL = _config.get('ACCOUNT_REFRESH_INTERVAL', 15)  # seconds; account model refreshed off the order path
+ORDER_PRICE_MAX_AGE = _config.get('ORDER_PRICE_MAX_AGE', 10)  # seconds; older signal prices fall back to a ticker request
+COIN_ANALYSIS_CONCURRENCY = _config.get('COIN_ANALYSIS_CONCURRENCY', 10)  # CoinAnalyzer requests in flight
+
+# CoinAnalyzer snapshot for warm restarts (checkpoints/coin_analyzer.pkl)
+COIN_SNAPSHOT_INTERVAL = _config.get('COIN_SNAPSHOT_INTERVAL', 300)  # seconds between saves
+COIN_SNAPSHOT_MAX_AGE = _config.get('COIN_SNAPSHOT_MAX_AGE', 6 * 3600)  # older snapshots are ignored at startup
+
+# Universe screener (universe_screener.py) - ปรับ TRADING_PAIRS จาก USDT-M perpetual ทั้งหมด
+UNIVERSE_SCREENER = _config.get('UNIVERSE_SCREENER', False)
+UNIVERSE_SCREEN_INTERVAL = _config.get('UNIVERSE_SCREEN_INTERVAL', 900)  # seconds
+UNIVERSE_MAX_SYMBOLS = _config.get('UNIVERSE_MAX_SYMBOLS', 35)  # promote ranks 1..N
+UNIVERSE_EXIT_RANK = _config.get('UNIVERSE_EXIT_RANK', 50)  # demote only below this rank...
+UNIVERSE_DEMOTE_AFTER = _config.get('UNIVERSE_DEMOTE_AFTER', 3)  # ...for this many screens in a row
+UNIVERSE_MIN_QUOTE_VOLUME = _config.get('UNIVERSE_MIN_QUOTE_VOLUME', 50_000_000)  # 24h USDT volume
+
+# CoinAnalyzer result cache (analysis_cache.py)
+COIN_ANALYSIS_CACHE_SIZE = _config.get('COIN_ANALYSIS_CACHE_SIZE', 512)  # symbols kept (LRU)
+COIN_ANALYSIS_TTL = _config.get('COIN_ANALYSIS_TTL', 3600)  # seconds
+COIN_ANALYSIS_TTL_JITTER = _config.get('COIN_ANALYSIS_TTL_JITTER', 0.2)  # spread expiry over the last 20% of TTL
+COIN_ANALYSIS_REFRESH_AHEAD = _config.get('COIN_ANALYSIS_REFRESH_AHEAD', 0.8)  # refresh in background after 80% of TTL
+
+# Multi-timeframe confirmation from locally aggregated bars (timeframe_aggregator.py)
+MTF_CONFIRM_TIMEFRAMES = _config.get('MTF_CONFIRM_TIMEFRAMES', ['5m', '15m', '1h'])
+MTF_MIN_CONFIRM = _config.get('MTF_MIN_CONFIRM', 0)  # timeframes that must agree (0 = disabled, opt in e.g. 2)
+
 # Notification Settings
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Exit Engine - หาจุดออกของ position จาก array high/low/close แบบ vectorized
+
+สำหรับแต่ละ entry จะหาแท่งแรกที่ take-profit, stop-loss, trailing stop
+หรือ max-hold ทำงาน โดยใช้ NumPy กับหน้าต่างข้อมูลหลัง entry
+แทนการเช็คทีละแท่งใน Python
+
+ข้อตกลงภายในแท่งเทียน (intrabar):
+- trailing stop ของแท่ง j คำนวณจาก peak ถึงแท่ง j-1 (high ของแท่งเดียวกัน
+  ไม่ดัน stop ขึ้นก่อนที่ low ของแท่งนั้นจะชน)
+- ถ้า TP และ stop ชนในแท่งเดียวกัน ถือว่า stop ชนก่อน (conservative)
+- ถ้ามี open และราคาเปิด gap ข้ามระดับ จะ fill ที่ราคาเปิด
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+import config
+
+EXIT_TAKE_PROFIT = 'take_profit'
+EXIT_STOP_LOSS = 'stop_loss'
+EXIT_TRAILING_STOP = 'trailing_stop'
+EXIT_MAX_HOLD = 'max_hold'
+EXIT_END_OF_DATA = 'end_of_data'
+
+
+class ExitEngine:
+    def __init__(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 open_: np.ndarray = None,
+                 take_profit_pct: Optional[float] = None,
+                 trailing_stop_pct: Optional[float] = None,
+                 stop_loss_pct: Optional[float] = None,
+                 max_hold: Optional[int] = 10,
+                 chunk_size: int = 256):
+        """
+        Args:
+            high, low, close: ราคาแต่ละแท่ง (ยาวเท่ากัน)
+            open_: ราคาเปิด (ถ้ามี ใช้สำหรับ fill เมื่อเกิด gap)
+            take_profit_pct: % กำไรที่จะปิด (default: config.TAKE_PROFIT_PERCENTAGE, 0/None = ปิดใช้งาน)
+            trailing_stop_pct: % trailing stop จาก peak (default: config.TRAILING_STOP_PERCENTAGE)
+            stop_loss_pct: % stop-loss คงที่จากราคาเข้า (None = ใช้ trailing stop อย่างเดียว)
+            max_hold: จำนวนแท่งสูงสุดที่ถือ (None = ถือจนกว่าจะชนเงื่อนไขอื่น)
+            chunk_size: ขนาดหน้าต่างต่อรอบเมื่อไม่มี max_hold
+        """
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.open = np.asarray(open_, dtype=np.float64) if open_ is not None else None
+        self.take_profit_pct = config.TAKE_PROFIT_PERCENTAGE if take_profit_pct is None else take_profit_pct
+        self.trailing_stop_pct = config.TRAILING_STOP_PERCENTAGE if trailing_stop_pct is None else trailing_stop_pct
+        self.stop_loss_pct = stop_loss_pct
+        self.max_hold = max_hold
+        self.chunk_size = chunk_size
+
+    def find_exit(self, entry_index: int, side: str, entry_price: float) -> Tuple[int, float, str]:
+        """
+        หาจุดออกแรกหลัง entry
+
+        Returns:
+            (exit_index, exit_price, reason)
+        """
+        is_long = side in ("BUY", "LONG")
+        n = len(self.close)
+        last_index = n - 1
+        if self.max_hold:
+            last_index = min(last_index, entry_index + self.max_hold)
+
+        # peak/trough ที่ผ่านมาแล้ว ส่งต่อระหว่าง chunk
+        extreme = entry_price
+        start = entry_index + 1
+        while start <= last_index:
+            stop = last_index + 1 if self.max_hold else min(last_index + 1, start + self.chunk_size)
+            hit = self._scan_window(start, stop, is_long, entry_price, extreme)
+            if hit is not None:
+                return hit
+            window_extreme = self.high[start:stop].max() if is_long else self.low[start:stop].min()
+            extreme = max(extreme, window_extreme) if is_long else min(extreme, window_extreme)
+            start = stop
+
+        if last_index <= entry_index:
+            return entry_index, float(self.close[entry_index]), EXIT_END_OF_DATA
+        reason = EXIT_MAX_HOLD if self.max_hold and last_index == entry_index + self.max_hold else EXIT_END_OF_DATA
+        return last_index, float(self.close[last_index]), reason
+
+    def find_exits(self, entry_indices, sides, entry_prices) -> Dict[str, np.ndarray]:
+        """หาจุดออกสำหรับหลาย entry พร้อมกัน (เช่น หลาย position ใน portfolio)"""
+        exit_indices = np.empty(len(entry_indices), dtype=np.int64)
+        exit_prices = np.empty(len(entry_indices), dtype=np.float64)
+        reasons = []
+        for k, (index, side, price) in enumerate(zip(entry_indices, sides, entry_prices)):
+            exit_indices[k], exit_prices[k], reason = self.find_exit(int(index), side, float(price))
+            reasons.append(reason)
+        return {
+            'exit_index': exit_indices,
+            'exit_price': exit_prices,
+            'reason': np.array(reasons, dtype=str),
+        }
+
+    def _scan_window(self, start: int, stop: int, is_long: bool, entry_price: float,
+                     prior_extreme: float) -> Optional[Tuple[int, float, str]]:
+        high = self.high[start:stop]
+        low = self.low[start:stop]
+
+        # peak ถึงแท่งก่อนหน้า: [prior, max(high[start]), max(high[start:start+2]), ...]
+        if is_long:
+            running = np.maximum.accumulate(np.concatenate(([prior_extreme], high[:-1])))
+        else:
+            running = np.minimum.accumulate(np.concatenate(([prior_extreme], low[:-1])))
+
+        stop_levels, stop_reasons = self._stop_levels(running, is_long, entry_price)
+        tp_level = None
+        if self.take_profit_pct:
+            tp_level = entry_price * (1 + self.take_profit_pct / 100) if is_long \
+                else entry_price * (1 - self.take_profit_pct / 100)
+
+        if stop_levels is not None:
+            stop_hit = low <= stop_levels if is_long else high >= stop_levels
+        else:
+            stop_hit = np.zeros(len(high), dtype=bool)
+        if tp_level is not None:
+            tp_hit = high >= tp_level if is_long else low <= tp_level
+        else:
+            tp_hit = np.zeros(len(high), dtype=bool)
+
+        any_hit = stop_hit | tp_hit
+        if not any_hit.any():
+            return None
+
+        offset = int(np.argmax(any_hit))
+        index = start + offset
+        if stop_hit[offset]:
+            level = float(stop_levels[offset])
+            return index, self._gap_fill(index, level, is_long, adverse=True), stop_reasons[offset]
+        return index, self._gap_fill(index, tp_level, is_long, adverse=False), EXIT_TAKE_PROFIT
+
+    def _stop_levels(self, running: np.ndarray, is_long: bool, entry_price: float):
+        """ระดับ stop ต่อแท่ง พร้อมเหตุผล (trailing หรือ fixed stop-loss)"""
+        trailing = None
+        if self.trailing_stop_pct:
+            trailing = running * (1 - self.trailing_stop_pct / 100) if is_long \
+                else running * (1 + self.trailing_stop_pct / 100)
+        fixed = None
+        if self.stop_loss_pct:
+            fixed = entry_price * (1 - self.stop_loss_pct / 100) if is_long \
+                else entry_price * (1 + self.stop_loss_pct / 100)
+
+        if trailing is None and fixed is None:
+            return None, None
+        if trailing is None:
+            return np.full(len(running), fixed), np.full(len(running), EXIT_STOP_LOSS, dtype=object)
+        if fixed is None:
+            return trailing, np.full(len(running), EXIT_TRAILING_STOP, dtype=object)
+
+        # ใช้ระดับที่แน่นกว่า
+        levels = np.maximum(trailing, fixed) if is_long else np.minimum(trailing, fixed)
+        fixed_binding = levels == fixed
+        reasons = np.where(fixed_binding, EXIT_STOP_LOSS, EXIT_TRAILING_STOP).astype(object)
+        return levels, reasons
+
+    def _gap_fill(self, index: int, level: float, is_long: bool, adverse: bool) -> float:
+        """ถ้าราคาเปิดกระโดดข้ามระดับ ให้ fill ที่ราคาเปิด"""
+        if self.open is None:
+            return float(level)
+        bar_open = float(self.open[index])
+        if adverse:
+            gapped = bar_open < level if is_long else bar_open > level
+        else:
+            gapped = bar_open > level if is_long else bar_open < level
+        return bar_open if gapped else float(level)
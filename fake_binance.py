@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Fake Binance client และ TradingBot สำหรับ test (ไม่ต่อ network)
+
+FakeBinanceClient: endpoint ที่ TradingBot ใช้ตอนเริ่มต้น / ส่ง order / screen universe
+block ตาม latency เหมือน request จริงและนับจำนวน call ต่อ method
+make_bot: สร้างผ่าน TradingBot(client=...) แล้วปิดเฉพาะส่วนที่ส่งข้อความ / เขียนไฟล์ / วิเคราะห์เหรียญจริง
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+import config
+from rate_limiter import AsyncRateLimiter
+from replay import NullNotifier
+from trading_bot import TradingBot
+
+LATENCY = 0.05  # วินาทีต่อ request (จำลอง network)
+DEFAULT_SYMBOLS = ('BTCUSDT', 'ETHUSDT', 'SOLUSDT')
+LOG_FILE = os.path.join(tempfile.gettempdir(), 'trading_bot_test.log')
+
+
+class FakeBinanceClient:
+    """binance Client จำลอง: ราคาคงที่, leverage ต่อ symbol, นับ call (thread-safe เพราะ call ถูก offload)"""
+
+    def __init__(self, symbols=DEFAULT_SYMBOLS, price=100.0, leverage=5, unavailable=(),
+                 balance=1000.0, market=None, latency=LATENCY):
+        """
+        Args:
+            leverage: ค่าเดียวทุก symbol หรือ dict symbol -> leverage
+            unavailable: symbol ที่ไม่อยู่ใน exchangeInfo (ไม่เปิดเทรด)
+            market: (exchange_info, tickers, premium_index) สำหรับ bulk endpoints ของ universe screener
+        """
+        self.symbols = list(symbols)
+        self.price = price
+        self.leverage = dict(leverage) if isinstance(leverage, dict) else {s: leverage for s in self.symbols}
+        self.unavailable = set(unavailable)
+        self.balance = balance
+        self.market = market
+        self.latency = latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def _call(self, name):
+        with self.lock:
+            self.calls[name] += 1
+        time.sleep(self.latency)
+
+    def get_server_time(self):
+        self._call('get_server_time')
+        return {'serverTime': int(time.time() * 1000)}
+
+    def get_account_api_permissions(self):
+        self._call('get_account_api_permissions')
+        return {'enableReading': True, 'enableFutures': True}
+
+    def futures_account(self):
+        self._call('futures_account')
+        balance = str(self.balance)
+        return {'totalWalletBalance': balance, 'availableBalance': balance, 'totalUnrealizedProfit': '0',
+                'totalMarginBalance': balance, 'canTrade': True,
+                'positions': [{'symbol': s, 'positionAmt': '0', 'leverage': str(leverage)}
+                              for s, leverage in self.leverage.items()]}
+
+    def futures_exchange_info(self):
+        self._call('futures_exchange_info')
+        if self.market:
+            return self.market[0]
+        return {'symbols': [{'symbol': s, 'status': 'TRADING', 'contractType': 'PERPETUAL', 'quoteAsset': 'USDT',
+                             'filters': [{'filterType': 'LOT_SIZE', 'stepSize': '0.001'}]}
+                            for s in self.symbols if s not in self.unavailable]}
+
+    def futures_position_information(self, symbol=None):
+        self._call('futures_position_information')
+        return [{'symbol': s, 'positionAmt': '0', 'leverage': str(leverage)}
+                for s, leverage in self.leverage.items() if symbol in (None, s)]
+
+    def futures_symbol_ticker(self, symbol=None):
+        self._call('futures_symbol_ticker')
+        if symbol is not None:
+            return {'symbol': symbol, 'price': str(self.price)}
+        return [{'symbol': s, 'price': str(self.price)} for s in self.symbols]
+
+    def futures_ticker(self, **params):
+        self._call('futures_ticker')
+        return self.market[1]
+
+    def futures_mark_price(self, **params):
+        self._call('futures_mark_price')
+        return self.market[2]
+
+    def futures_change_leverage(self, symbol, leverage):
+        self._call('futures_change_leverage')
+        self.leverage[symbol] = leverage
+        return {'symbol': symbol, 'leverage': leverage}
+
+    def futures_create_order(self, symbol, side, type, quantity):
+        self._call('futures_create_order')
+        return {'orderId': self.calls['futures_create_order'], 'symbol': symbol, 'avgPrice': str(self.price)}
+
+
+async def no_refresh(symbol):
+    """ไม่วิเคราะห์เหรียญจริง (ไม่มี network) - ใช้ค่า default ของ CoinAnalyzer"""
+    return None
+
+
+def make_bot(client=None, **attributes):
+    """
+    TradingBot จริงบน FakeBinanceClient: เทรด symbol ของ client, ไม่จำกัด rate, ข้อความเก็บใน NullNotifier
+
+    attributes: ค่าที่ทับหลังสร้าง (เช่น available_balance, api_call_delay)
+    """
+    client = client or FakeBinanceClient()
+    with mock.patch.object(config, 'LOG_FILE', LOG_FILE):
+        bot = TradingBot(client=client)
+    bot.trading_pairs = list(client.symbols)
+    bot.screener.active = list(bot.trading_pairs)
+    bot.rate_limiter = AsyncRateLimiter(0)
+    bot.coin_analyzer.rate_limiter = bot.rate_limiter
+    bot.coin_analyzer.refresh_analysis = no_refresh
+    bot.notification = NullNotifier()
+    bot.save_status = lambda: None
+    bot.log_trade_activity = lambda **kwargs: None
+    for name, value in attributes.items():
+        setattr(bot, name, value)
+    return bot
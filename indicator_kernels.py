@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Indicator Kernels - indicators ชุดเดียวกับ TradingBot.calculate_indicators เขียนด้วย NumPy ล้วน
+
+ใช้เมื่อ config.INDICATOR_BACKEND = 'numpy' (ค่าเริ่มต้นยังเป็น 'pandas_ta')
+สูตรเหมือน pandas_ta 0.3.14b0:
+- sma: rolling mean (ค่าแรก ๆ ที่ window ไม่ครบเป็น NaN)
+- ema: seed ด้วย SMA ของ `length` ค่าแรก แล้ว recursive แบบ adjust=False
+- rsi: RMA (ewm alpha=1/length, adjust=True, min_periods=length)
+- bbands: SMA +/- std * rolling std (ddof=0)
+- stoch: raw %K จาก high/low 14 แท่ง แล้ว SMA 3 ชั้น (smooth_k, d)
+- willr: Williams %R
+"""
+
+import sys
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# จำกัด w^-k ในแต่ละ block ไม่ให้เกิน ~1e30 เพื่อไม่ให้เสีย precision
+_MAX_BLOCK_EXPONENT = 69.0
+
+
+def linear_recursion(x: np.ndarray, w: float, initial: float = 0.0) -> np.ndarray:
+    """
+    y[t] = w * y[t-1] + x[t] (y[-1] = initial) แบบ vectorized ทีละ block
+
+    ใน block หนึ่ง y[s+j] = w^j * (w*carry + sum_k x[s+k] * w^-k) จึงใช้ cumsum ได้
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.empty_like(x)
+    if len(x) == 0:
+        return out
+    if w == 0:
+        return x.copy()
+    block = max(1, int(_MAX_BLOCK_EXPONENT / -np.log(w)))
+    powers = w ** -np.arange(min(block, len(x)), dtype=np.float64)
+    carry = initial
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        p = powers[:len(chunk)]
+        out[start:start + len(chunk)] = (w * carry + np.cumsum(chunk * p)) / p
+        carry = out[start + len(chunk) - 1]
+    return out
+
+
+def _first_valid(x: np.ndarray) -> int:
+    valid = np.flatnonzero(~np.isnan(x))
+    return int(valid[0]) if len(valid) else len(x)
+
+
+def _rolling(x: np.ndarray, length: int, reducer) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    if len(x) >= length:
+        out[length - 1:] = reducer(sliding_window_view(x, length), axis=1)
+    return out
+
+
+def sma(x: np.ndarray, length: int) -> np.ndarray:
+    return _rolling(x, length, np.mean)
+
+
+def rolling_std(x: np.ndarray, length: int) -> np.ndarray:
+    return _rolling(x, length, np.std)
+
+
+def rolling_min(x: np.ndarray, length: int) -> np.ndarray:
+    return _rolling(x, length, np.min)
+
+
+def rolling_max(x: np.ndarray, length: int) -> np.ndarray:
+    return _rolling(x, length, np.max)
+
+
+def ema(x: np.ndarray, length: int) -> np.ndarray:
+    """EMA แบบ pandas_ta (SMA seed, adjust=False) เริ่มจากค่า valid ตัวแรก"""
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    start = _first_valid(x)
+    values = x[start:]
+    if len(values) < length:
+        return out
+    alpha = 2.0 / (length + 1)
+    seed = values[:length].mean()
+    tail = linear_recursion(alpha * values[length:], 1 - alpha, seed)
+    out[start + length - 1] = seed
+    out[start + length:] = tail
+    return out
+
+
+def rma(x: np.ndarray, length: int) -> np.ndarray:
+    """Wilder's MA = ewm(alpha=1/length, adjust=True, min_periods=length) เริ่มจากค่า valid ตัวแรก"""
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    start = _first_valid(x)
+    values = x[start:]
+    if len(values) < length:
+        return out
+    w = 1 - 1.0 / length
+    numerator = linear_recursion(values, w)
+    denominator = linear_recursion(np.ones(len(values)), w)
+    smoothed = numerator / denominator
+    smoothed[:length - 1] = np.nan
+    out[start:] = smoothed
+    return out
+
+
+def rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    close = np.asarray(close, dtype=np.float64)
+    change = np.diff(close)
+    positive = np.concatenate(([np.nan], np.where(change > 0, change, 0.0)))
+    negative = np.concatenate(([np.nan], np.where(change < 0, -change, 0.0)))
+    positive_avg = rma(positive, length)
+    negative_avg = rma(negative, length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 * positive_avg / (positive_avg + negative_avg)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {'macd': line, 'signal': signal_line, 'hist': line - signal_line}
+
+
+def bbands(close: np.ndarray, length: int = 20, std: float = 2.0) -> Dict[str, np.ndarray]:
+    middle = sma(close, length)
+    deviation = rolling_std(close, length)
+    return {'upper': middle + std * deviation, 'middle': middle, 'lower': middle - std * deviation}
+
+
+def stoch(high: np.ndarray, low: np.ndarray, close: np.ndarray, k: int = 14, d: int = 3,
+          smooth_k: int = 3) -> Dict[str, np.ndarray]:
+    lowest_low = rolling_min(low, k)
+    highest_high = rolling_max(high, k)
+    value_range = highest_high - lowest_low
+    if np.any(value_range == 0):
+        value_range = value_range + sys.float_info.epsilon
+    raw = 100 * (np.asarray(close, dtype=np.float64) - lowest_low) / value_range
+    stoch_k = _sma_from_first_valid(raw, smooth_k)
+    stoch_d = _sma_from_first_valid(stoch_k, d)
+    return {'k': stoch_k, 'd': stoch_d}
+
+
+def _sma_from_first_valid(x: np.ndarray, length: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    start = _first_valid(x)
+    out[start:] = sma(x[start:], length)
+    return out
+
+
+def willr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14) -> np.ndarray:
+    lowest_low = rolling_min(low, length)
+    highest_high = rolling_max(high, length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 * (np.asarray(close, dtype=np.float64) - highest_high) / (highest_high - lowest_low)
+
+
+def calculate_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                         volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """คอลัมน์ indicator ชุดเดียวกับ TradingBot.calculate_indicators (ก่อนเติม NaN)"""
+    macd_values = macd(close, fast=14, slow=30, signal=12)
+    bands = bbands(close, length=20, std=2)
+    stochastic = stoch(high, low, close, k=14, d=3)
+    return {
+        'sma20': sma(close, 25),
+        'sma50': sma(close, 60),
+        'rsi': rsi(close, 28),
+        'macd': macd_values['macd'],
+        'macd_signal': macd_values['signal'],
+        'macd_hist': macd_values['hist'],
+        'bb_upper': bands['upper'],
+        'bb_middle': bands['middle'],
+        'bb_lower': bands['lower'],
+        'stoch_k': stochastic['k'],
+        'stoch_d': stochastic['d'],
+        'williams_r': willr(high, low, close, 14),
+        'volume_sma20': sma(volume, 35),
+    }
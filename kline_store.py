@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Kline Store - เก็บข้อมูล kline ในเครื่องแบบ columnar (NumPy .npy ต่อคอลัมน์)
+
+Layout:
+    data/klines/<symbol>/<interval>/<column>.npy
+
+ใช้เป็นแหล่งข้อมูลเดียวสำหรับ backtest, replay harness และ benchmark
+เพื่อไม่ต้องดึงข้อมูลจาก Binance ซ้ำ
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# ลำดับคอลัมน์ตรงกับ response ของ Binance klines (ยกเว้น 'ignore')
+KLINE_COLUMNS = [
+    'open_time', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_volume', 'trades', 'taker_buy_base', 'taker_buy_quote'
+]
+INT_COLUMNS = {'open_time', 'close_time', 'trades'}
+
+INTERVAL_MS = {
+    '1m': 60_000,
+    '3m': 3 * 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1h': 60 * 60_000,
+    '2h': 2 * 60 * 60_000,
+    '4h': 4 * 60 * 60_000,
+    '6h': 6 * 60 * 60_000,
+    '8h': 8 * 60 * 60_000,
+    '12h': 12 * 60 * 60_000,
+    '1d': 24 * 60 * 60_000,
+}
+
+
+def interval_to_ms(interval: str) -> int:
+    """แปลง interval ของ Binance เป็นมิลลิวินาที"""
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return INTERVAL_MS[interval]
+
+
+def klines_to_columns(klines: List[List]) -> Dict[str, np.ndarray]:
+    """แปลง klines (list ของ list แบบ Binance) เป็นคอลัมน์ NumPy"""
+    if not klines:
+        return {c: np.empty(0, dtype=np.int64 if c in INT_COLUMNS else np.float64) for c in KLINE_COLUMNS}
+    rows = np.array([k[:len(KLINE_COLUMNS)] for k in klines], dtype=object)
+    return {
+        column: rows[:, i].astype(np.float64).astype(np.int64) if column in INT_COLUMNS
+        else rows[:, i].astype(np.float64)
+        for i, column in enumerate(KLINE_COLUMNS)
+    }
+
+
+def columns_to_klines(columns: Dict[str, np.ndarray], start: int = 0, stop: int = None) -> List[List]:
+    """แปลงคอลัมน์กลับเป็น klines รูปแบบเดียวกับที่ Binance ส่งมา (ราคาเป็น string)"""
+    stop = len(columns['open_time']) if stop is None else stop
+    out = []
+    for i in range(start, stop):
+        out.append([
+            int(columns['open_time'][i]),
+            repr(float(columns['open'][i])),
+            repr(float(columns['high'][i])),
+            repr(float(columns['low'][i])),
+            repr(float(columns['close'][i])),
+            repr(float(columns['volume'][i])),
+            int(columns['close_time'][i]),
+            repr(float(columns['quote_volume'][i])),
+            int(columns['trades'][i]),
+            repr(float(columns['taker_buy_base'][i])),
+            repr(float(columns['taker_buy_quote'][i])),
+            '0',
+        ])
+    return out
+
+
+def aggregate_columns(columns: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """รวมแท่งเล็กเป็นแท่งใหญ่ (เช่น 1m -> 15m) โดยจัดกลุ่มตาม open_time"""
+    open_time = np.asarray(columns['open_time'], dtype=np.int64)
+    if len(open_time) == 0:
+        return {c: np.asarray(columns[c])[:0] for c in KLINE_COLUMNS}
+    step = interval_to_ms(interval)
+    buckets = open_time // step
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(open_time)])) - 1
+
+    return {
+        'open_time': buckets[starts] * step,
+        'open': np.asarray(columns['open'])[starts],
+        'high': np.maximum.reduceat(np.asarray(columns['high']), starts),
+        'low': np.minimum.reduceat(np.asarray(columns['low']), starts),
+        'close': np.asarray(columns['close'])[ends],
+        'volume': np.add.reduceat(np.asarray(columns['volume']), starts),
+        'close_time': buckets[starts] * step + step - 1,
+        'quote_volume': np.add.reduceat(np.asarray(columns['quote_volume']), starts),
+        'trades': np.add.reduceat(np.asarray(columns['trades']), starts),
+        'taker_buy_base': np.add.reduceat(np.asarray(columns['taker_buy_base']), starts),
+        'taker_buy_quote': np.add.reduceat(np.asarray(columns['taker_buy_quote']), starts),
+    }
+
+
+class KlineStore:
+    def __init__(self, base_dir: str = os.path.join('data', 'klines')):
+        self.base_dir = base_dir
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.base_dir, symbol, interval)
+
+    def has(self, symbol: str, interval: str) -> bool:
+        return os.path.exists(os.path.join(self._path(symbol, interval), 'open_time.npy'))
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(d for d in os.listdir(self.base_dir) if os.path.isdir(os.path.join(self.base_dir, d)))
+
+    def intervals(self, symbol: str) -> List[str]:
+        path = os.path.join(self.base_dir, symbol)
+        if not os.path.isdir(path):
+            return []
+        return sorted(d for d in os.listdir(path) if self.has(symbol, d))
+
+    def save(self, symbol: str, interval: str, columns: Dict[str, np.ndarray]):
+        """เขียนข้อมูลทั้งชุดของ (symbol, interval) ทับของเดิม"""
+        path = self._path(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+        order = np.argsort(np.asarray(columns['open_time']), kind='stable')
+        for column in KLINE_COLUMNS:
+            array = np.asarray(columns[column])[order]
+            array = array.astype(np.int64 if column in INT_COLUMNS else np.float64)
+            tmp_file = os.path.join(path, f"{column}.tmp.npy")
+            np.save(tmp_file, array, allow_pickle=False)
+            os.replace(tmp_file, os.path.join(path, f"{column}.npy"))
+        logger.info(f"Saved {len(order)} {interval} klines for {symbol} to {path}")
+
+    def save_klines(self, symbol: str, interval: str, klines: List[List]):
+        """บันทึก klines ที่ได้จาก Binance API"""
+        self.save(symbol, interval, klines_to_columns(klines))
+
+    def merge(self, symbol: str, interval: str, columns: Dict[str, np.ndarray]):
+        """รวมข้อมูลใหม่เข้ากับของเดิม (open_time ซ้ำใช้ค่าใหม่)"""
+        if not self.has(symbol, interval):
+            self.save(symbol, interval, columns)
+            return
+        existing = self.load(symbol, interval, mmap=False)
+        combined = {c: np.concatenate((existing[c], np.asarray(columns[c]))) for c in KLINE_COLUMNS}
+        # เก็บแถวล่าสุดของแต่ละ open_time
+        reversed_times = combined['open_time'][::-1]
+        _, first = np.unique(reversed_times, return_index=True)
+        keep = len(reversed_times) - 1 - first
+        self.save(symbol, interval, {c: combined[c][keep] for c in KLINE_COLUMNS})
+
+    def load(self, symbol: str, interval: str, start_ms: Optional[int] = None,
+             end_ms: Optional[int] = None, columns: Iterable[str] = None,
+             mmap: bool = True) -> Dict[str, np.ndarray]:
+        """
+        โหลดคอลัมน์ของ (symbol, interval) ในช่วงเวลา [start_ms, end_ms]
+
+        ถ้าไม่มี interval นี้แต่มีข้อมูล 1m จะรวมจาก 1m ให้อัตโนมัติ
+        """
+        wanted = list(columns) if columns is not None else list(KLINE_COLUMNS)
+        if not self.has(symbol, interval):
+            if interval != '1m' and self.has(symbol, '1m'):
+                base = self.load(symbol, '1m', start_ms, end_ms, mmap=mmap)
+                aggregated = aggregate_columns(base, interval)
+                return {c: aggregated[c] for c in wanted}
+            raise FileNotFoundError(f"No {interval} klines for {symbol} in {self.base_dir}")
+
+        path = self._path(symbol, interval)
+        open_time = np.load(os.path.join(path, 'open_time.npy'), mmap_mode='r' if mmap else None)
+        lo = 0 if start_ms is None else int(np.searchsorted(open_time, start_ms, side='left'))
+        hi = len(open_time) if end_ms is None else int(np.searchsorted(open_time, end_ms, side='right'))
+        return {
+            column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r' if mmap else None)[lo:hi]
+            for column in wanted
+        }
+
+    def load_frame(self, symbol: str, interval: str, start_ms: Optional[int] = None,
+                   end_ms: Optional[int] = None) -> pd.DataFrame:
+        """โหลดเป็น DataFrame แบบเดียวกับที่ backtest ใช้ (timestamp เป็น datetime)"""
+        columns = self.load(symbol, interval, start_ms, end_ms, mmap=False)
+        df = pd.DataFrame({c: np.asarray(columns[c]) for c in KLINE_COLUMNS})
+        df['timestamp'] = pd.to_datetime(df['open_time'], unit='ms')
+        return df
@@ -8,9 +8,11 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
+from backtest_store import BacktestResultStore
 
 class PerformanceAnalyzer:
     def __init__(self):
+        self.result_store = BacktestResultStore()
         self.performance_thresholds = {
             'win_rate': {
                 'excellent': 60,
@@ -42,19 +44,31 @@ class PerformanceAnalyzer:
             }
         }
     
-    def load_backtest_results(self, file_path='backtest_report.json'):
-        """โหลดผลลัพธ์ backtest"""
+    def load_backtest_results(self, file_path='backtest_report'):
+        """โหลดผลลัพธ์ backtest (summary จาก result store หรือไฟล์ JSON แบบเดิม)"""
         try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
+            if self.result_store.exists(file_path):
+                return self.result_store.load_summary(file_path)
+            
+            legacy_path = file_path if file_path.endswith('.json') else f"{file_path}.json"
+            if os.path.exists(legacy_path):
+                with open(legacy_path, 'r') as f:
                     return json.load(f)
-            else:
-                print(f"❌ ไม่พบไฟล์ {file_path}")
-                return None
+            
+            print(f"❌ ไม่พบผลลัพธ์ {file_path}")
+            return None
         except Exception as e:
             print(f"❌ Error loading results: {e}")
             return None
     
+    def load_trades(self, file_path='backtest_report', columns=None):
+        """โหลดตาราง trades เฉพาะคอลัมน์ที่ต้องการ (memory-mapped)"""
+        try:
+            return self.result_store.load_table(file_path, 'trades', columns)
+        except Exception as e:
+            print(f"❌ Error loading trades: {e}")
+            return None
+    
     def evaluate_metric(self, value, metric_name, reverse=False):
         """ประเมินค่า metric"""
         thresholds = self.performance_thresholds[metric_name]
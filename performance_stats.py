@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Streaming Performance Stats - สถิติผลการเทรดแบบ online (อัปเดต O(1) ต่อ trade / ต่อแท่ง)
+
+ใช้ร่วมกันระหว่าง BacktestEngine และ TradingBot:
+- Welford mean/variance ของ P&L ต่อ trade และผลตอบแทนต่อช่วงเวลา
+- running peak / max drawdown ของ balance
+- ผลตอบแทนแบ่งตามช่วงเวลาจริง (default รายวัน) จาก timestamp ไม่ใช่จำนวนแท่ง
+- ตัวนับ trades / wins ต่อ strategy
+"""
+
+import math
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """Welford's online mean / variance"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Population variance (ตรงกับ np.std ค่า default)"""
+        return self.m2 / self.count if self.count > 0 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_state(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'RunningMoments':
+        moments = cls()
+        moments.count, moments.mean, moments.m2 = state['count'], state['mean'], state['m2']
+        return moments
+
+
+def to_epoch_seconds(timestamp) -> float:
+    """รองรับ epoch seconds, datetime, date, pandas Timestamp และ numpy datetime64"""
+    if isinstance(timestamp, (int, float, np.integer, np.floating)):
+        return float(timestamp)
+    if isinstance(timestamp, date) and not isinstance(timestamp, datetime):
+        timestamp = datetime(timestamp.year, timestamp.month, timestamp.day)
+    return pd.Timestamp(timestamp).value / 1e9
+
+
+class StreamingStats:
+    def __init__(self, initial_balance: Optional[float] = None, bucket_seconds: int = 86400):
+        """
+        Args:
+            initial_balance: balance เริ่มต้น (None = ใช้ค่าแรกที่ส่งเข้า update_balance)
+            bucket_seconds: ความยาวช่วงสำหรับผลตอบแทน (86400 = รายวัน)
+        """
+        self.initial_balance = initial_balance
+        self.bucket_seconds = bucket_seconds
+
+        # Trades
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.total_pnl = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.negative_trades = 0
+        self.trade_pnl = RunningMoments()
+        self.strategy_trades = {}
+        self.strategy_wins = {}
+
+        # Balance / drawdown
+        self.current_balance = initial_balance
+        self.peak_balance = initial_balance
+        self.max_drawdown = 0.0
+
+        # Time-bucketed returns
+        self.bucket_returns = RunningMoments()
+        self.equity_curve = []
+        self._bucket = None
+        self._bucket_open_balance = initial_balance
+
+    def record_trade(self, pnl: float, strategy: Optional[str] = None, timestamp=None,
+                     balance: Optional[float] = None):
+        """บันทึก trade ที่ปิดแล้ว (และ balance หลังปิด ถ้ามี)"""
+        self.total_trades += 1
+        self.total_pnl += pnl
+        self.trade_pnl.update(pnl)
+        if pnl > 0:
+            self.winning_trades += 1
+            self.gross_profit += pnl
+        else:
+            self.losing_trades += 1
+            if pnl < 0:
+                self.negative_trades += 1
+                self.gross_loss += pnl
+
+        if strategy is not None:
+            self.strategy_trades[strategy] = self.strategy_trades.get(strategy, 0) + 1
+            if pnl > 0:
+                self.strategy_wins[strategy] = self.strategy_wins.get(strategy, 0) + 1
+
+        if balance is not None and timestamp is not None:
+            self.update_balance(timestamp, balance)
+
+    def update_balance(self, timestamp, balance: float):
+        """อัปเดต balance ณ เวลาหนึ่ง (ต่อแท่งหรือหลัง trade)"""
+        if self.initial_balance is None:
+            self.initial_balance = balance
+            self._bucket_open_balance = balance
+        if self.peak_balance is None:
+            self.peak_balance = balance
+
+        # ปิดช่วงก่อนหน้าด้วย balance ล่าสุดของช่วงนั้น
+        bucket = int(to_epoch_seconds(timestamp) // self.bucket_seconds)
+        if self._bucket is None:
+            self._bucket = bucket
+        elif bucket != self._bucket:
+            self._close_bucket()
+            self._bucket = bucket
+        self.current_balance = balance
+
+        if balance > self.peak_balance:
+            self.peak_balance = balance
+        elif self.peak_balance > 0:
+            drawdown = (self.peak_balance - balance) / self.peak_balance
+            if drawdown > self.max_drawdown:
+                self.max_drawdown = drawdown
+
+    def _close_bucket(self):
+        """ปิดช่วงเวลาปัจจุบัน: เก็บผลตอบแทนของช่วงเข้า Welford + equity curve"""
+        open_balance = self._bucket_open_balance
+        period_return = (self.current_balance - open_balance) / open_balance if open_balance else 0.0
+        self.bucket_returns.update(period_return)
+        self.equity_curve.append({
+            'date': pd.Timestamp(self._bucket * self.bucket_seconds, unit='s').to_pydatetime(),
+            'balance': self.current_balance,
+            'return': period_return,
+            'cumulative_return': (self.current_balance - self.initial_balance) / self.initial_balance
+            if self.initial_balance else 0.0,
+        })
+        self._bucket_open_balance = self.current_balance
+
+    @property
+    def win_rate(self) -> float:
+        return self.winning_trades / self.total_trades * 100 if self.total_trades > 0 else 0.0
+
+    @property
+    def avg_win(self) -> float:
+        return self.gross_profit / self.winning_trades if self.winning_trades else 0.0
+
+    @property
+    def avg_loss(self) -> float:
+        return self.gross_loss / self.negative_trades if self.negative_trades else 0.0
+
+    @property
+    def sharpe_ratio(self) -> float:
+        """Sharpe ต่อช่วงเวลา (ไม่ annualize) จากผลตอบแทนของช่วงที่ปิดแล้ว"""
+        std = self.bucket_returns.std
+        return self.bucket_returns.mean / std if std > 0 else 0.0
+
+    def strategy_win_rate(self, strategy: str) -> float:
+        trades = self.strategy_trades.get(strategy, 0)
+        return self.strategy_wins.get(strategy, 0) / trades * 100 if trades else 0.0
+
+    def snapshot(self) -> Dict:
+        """metrics ปัจจุบัน (ไม่ต้องวนซ้ำข้อมูล trade)"""
+        avg_loss = self.avg_loss
+        profit_factor = 0.0
+        if self.total_trades:
+            profit_factor = abs(self.avg_win / avg_loss) if avg_loss != 0 else float('inf')
+        total_return = 0.0
+        if self.initial_balance and self.current_balance is not None:
+            total_return = (self.current_balance - self.initial_balance) / self.initial_balance * 100
+        return {
+            'initial_balance': self.initial_balance,
+            'final_balance': self.current_balance,
+            'total_return_pct': total_return,
+            'total_pnl': self.total_pnl,
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades,
+            'losing_trades': self.losing_trades,
+            'win_rate_pct': self.win_rate,
+            'avg_win': self.avg_win,
+            'avg_loss': avg_loss,
+            'profit_factor': profit_factor,
+            'avg_trade_pnl': self.trade_pnl.mean,
+            'trade_pnl_std': self.trade_pnl.std,
+            'max_drawdown_pct': self.max_drawdown * 100,
+            'sharpe_ratio': self.sharpe_ratio,
+            'return_periods': self.bucket_returns.count,
+        }
+
+    def finalize(self) -> List[Dict]:
+        """ปิดช่วงเวลาที่ค้างอยู่ (เรียกตอนจบ backtest) แล้วคืน equity curve"""
+        if self._bucket is not None:
+            self._close_bucket()
+            self._bucket = None
+        return self.equity_curve
+
+    def to_state(self) -> Dict:
+        """state สำหรับ checkpoint / snapshot"""
+        state = {k: v for k, v in self.__dict__.items() if k not in ('trade_pnl', 'bucket_returns')}
+        state['trade_pnl'] = self.trade_pnl.to_state()
+        state['bucket_returns'] = self.bucket_returns.to_state()
+        state['equity_curve'] = [dict(point) for point in self.equity_curve]
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'StreamingStats':
+        stats = cls(state['initial_balance'], state['bucket_seconds'])
+        for key, value in state.items():
+            if key not in ('trade_pnl', 'bucket_returns'):
+                setattr(stats, key, value)
+        stats.strategy_trades = dict(state['strategy_trades'])
+        stats.strategy_wins = dict(state['strategy_wins'])
+        stats.equity_curve = [dict(point) for point in state['equity_curve']]
+        stats.trade_pnl = RunningMoments.from_state(state['trade_pnl'])
+        stats.bucket_returns = RunningMoments.from_state(state['bucket_returns'])
+        return stats
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - token bucket แบบ async สำหรับ request weight ของ Binance
+
+ใช้ร่วมกันระหว่าง TradingBot และ CoinAnalyzer เพื่อให้ทุก request ใน process
+อยู่ใต้งบ weight ต่อนาทีเดียวกัน (Binance Futures: 2400 / นาที ต่อ IP)
+"""
+
+import asyncio
+import time
+
+
+# weight ของ endpoint ที่บอทใช้ (ที่ไม่อยู่ในนี้ = 1)
+REQUEST_WEIGHTS = {
+    'futures_account': 5,
+    'futures_position_information': 5,
+    'futures_exchange_info': 1,
+    'futures_ticker': 1,
+    'futures_mark_price': 1,
+    'futures_leverage_bracket': 1,
+    'get_account_api_permissions': 1,
+}
+
+# weight เมื่อไม่ระบุ symbol (ทุก symbol ใน request เดียว)
+ALL_SYMBOLS_WEIGHTS = {
+    'futures_symbol_ticker': 2,
+    'futures_ticker': 40,
+    'futures_mark_price': 10,  # premiumIndex
+}
+
+# call ที่เปิด / ปิด position - ไม่ต่อคิวหลัง request ของงานเบื้องหลัง (coin analysis)
+PRIORITY_METHODS = {'futures_create_order', 'futures_cancel_order', 'futures_cancel_all_open_orders'}
+
+
+def klines_weight(limit: int) -> int:
+    """request weight ของ futures_klines ตาม limit"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def request_weight(method: str, kwargs: dict) -> int:
+    """request weight โดยประมาณจากชื่อ method ของ binance Client"""
+    if method in ('futures_klines', 'futures_historical_klines'):
+        return klines_weight(int(kwargs.get('limit', 500)))
+    if method in ALL_SYMBOLS_WEIGHTS and kwargs.get('symbol') is None:
+        return ALL_SYMBOLS_WEIGHTS[method]
+    return REQUEST_WEIGHTS.get(method, 1)
+
+
+class AsyncRateLimiter:
+    def __init__(self, weight_per_minute: float = 1200, burst: float = None):
+        """
+        Args:
+            weight_per_minute: weight ที่เติมกลับต่อนาที (0 = ไม่จำกัด เช่น replay)
+            burst: weight สูงสุดที่ใช้ติดกันได้ทันที (default: 1/10 ของต่อนาที)
+        """
+        self.rate = weight_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, weight_per_minute / 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited_seconds = 0.0
+        self._lock = None
+        self._lock_loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, weight: float = 1, priority: bool = False):
+        """
+        รอจนมี weight พอ (ผู้รอได้ตามลำดับที่เข้ามา)
+
+        priority: ไม่ต่อคิว - ใช้ weight ได้ทันทีโดยยืมจากรอบถัดไปได้ถึง 1 burst
+        ผู้รอในคิวจึงรอนานขึ้นแทน อัตราเฉลี่ยยังไม่เกิน weight_per_minute
+        """
+        if self.rate <= 0:
+            return
+        weight = min(weight, self.capacity)
+        if priority:
+            self._refill()
+            self.tokens -= weight
+            if self.tokens < -self.capacity:
+                delay = (-self.capacity - self.tokens) / self.rate
+                self.waited_seconds += delay
+                await asyncio.sleep(delay)
+            return
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            # asyncio.Lock ผูกกับ event loop แรกที่ใช้
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        async with self._lock:
+            self._refill()
+            while self.tokens < weight:  # วนซ้ำ: call priority อาจใช้ weight ไประหว่างรอ
+                delay = (weight - self.tokens) / self.rate
+                self.waited_seconds += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= weight
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Rolling Metrics - เมตริกของ CoinAnalyzer แบบ incremental ต่อ (symbol, timeframe)
+
+CoinAnalyzer.calculate_volatility / calculate_volume_profile / calculate_liquidity_score /
+calculate_trend_strength คำนวณจาก DataFrame 100 แท่งใหม่ทั้งหมดทุกครั้ง ที่นี่เก็บผลรวมแบบ
+sliding window (return variance, volume mean/CV, spread เฉลี่ย, SMA20/50 และความชัน)
+แล้วอัปเดตทีละแท่งที่ปิด - ผลเท่ากับสูตรเดิมบน window เดียวกัน แต่ต้นทุน O(1) ต่อแท่ง
+"""
+
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from kline_store import interval_to_ms
+
+NAN = float('nan')
+
+
+class RollingStats:
+    def __init__(self, size: int):
+        """ค่าเฉลี่ย / std (ddof=1 แบบ pandas) ของ size ค่าล่าสุด"""
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._pushes = 0
+
+    def push(self, value: float):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        self._pushes += 1
+        if self._pushes % (self.size * 10) == 0:
+            # รวมใหม่เป็นระยะ กัน error สะสมจากการบวกลบต่อเนื่อง
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self.values) if self.values else NAN
+
+    @property
+    def std(self) -> float:
+        n = len(self.values)
+        if n < 2:
+            return NAN
+        variance = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class BarMetrics:
+    def __init__(self, window: int = 100):
+        """เมตริกของ window แท่งล่าสุดของหนึ่ง (symbol, timeframe)"""
+        self.window = window
+        self.last_open_time: Optional[int] = None
+        self.last_close: Optional[float] = None
+        self.bars = 0
+        self.returns = RollingStats(window - 1)  # pct_change ของ window แท่ง = window - 1 ค่า
+        self.volume = RollingStats(window)
+        self.recent_volume = RollingStats(5)
+        self.spread = RollingStats(window)
+        self.sma20 = RollingStats(20)
+        self.sma50 = RollingStats(50)
+        self.sma20_history = deque(maxlen=10)
+        self.sma50_history = deque(maxlen=10)
+
+    def push(self, open_time: int, high: float, low: float, close: float, volume: float):
+        """เพิ่มแท่งที่ปิดแล้ว 1 แท่ง"""
+        if self.last_close is not None:
+            self.returns.push(close / self.last_close - 1 if self.last_close else NAN)
+        self.volume.push(volume)
+        self.recent_volume.push(volume)
+        self.spread.push((high - low) / close if close else NAN)
+        self.sma20.push(close)
+        self.sma50.push(close)
+        self.sma20_history.append(self.sma20.mean if self.sma20.count == 20 else NAN)
+        self.sma50_history.append(self.sma50.mean if self.sma50.count == 50 else NAN)
+        self.last_open_time = int(open_time)
+        self.last_close = close
+        self.bars = min(self.bars + 1, self.window)
+
+    def volatility(self) -> float:
+        if self.bars == 0:
+            return 0.0
+        return self.returns.std * np.sqrt(24) * 100
+
+    def volume_profile(self) -> Dict[str, float]:
+        if self.bars == 0:
+            return {'avg_volume': 0, 'volume_stability': 0}
+        mean = self.volume.mean
+        volume_cv = self.volume.std / mean if mean > 0 else 0
+        return {'avg_volume': mean, 'volume_stability': 1 / (1 + volume_cv)}
+
+    def liquidity_score(self) -> float:
+        if self.bars == 0:
+            return 0.0
+        mean = self.volume.mean
+        volume_consistency = 1 - (self.volume.std / mean) if mean > 0 else 0
+        spread_score = 1 / (1 + self.spread.mean)
+        liquidity_score = (
+            min(mean / 1000000, 1) * 40 +
+            volume_consistency * 30 +
+            spread_score * 30
+        )
+        return min(liquidity_score * 100, 100)
+
+    def trend_strength(self) -> float:
+        if self.bars < 20:
+            return 0.0
+        sma20, sma50 = self.sma20_history[-1], self.sma50_history[-1]
+        sma20_past = self.sma20_history[0] if len(self.sma20_history) == 10 else NAN
+        sma50_past = self.sma50_history[0] if len(self.sma50_history) == 10 else NAN
+        # เปรียบเทียบกับ NaN ให้ False เหมือนสูตรเดิมบน DataFrame
+        trend_strength = 25 if sma20 > sma50 else -25
+        trend_strength += 25 if (sma20 - sma20_past) / sma20_past > 0 else -25
+        trend_strength += 25 if (sma50 - sma50_past) / sma50_past > 0 else -25
+        recent_volume, avg_volume = self.recent_volume.mean, self.volume.mean
+        if recent_volume > avg_volume * 1.2:
+            trend_strength += 25
+        elif recent_volume < avg_volume * 0.8:
+            trend_strength -= 25
+        return max(-100, min(100, trend_strength))
+
+
+class RollingMetrics:
+    def __init__(self, window: int = 100):
+        """
+        Args:
+            window: จำนวนแท่งล่าสุดที่ใช้คำนวณ (เท่ากับ history ของ TimeframeAggregator)
+        """
+        self.window = window
+        self._metrics: Dict[tuple, BarMetrics] = {}
+
+    def get(self, symbol: str, interval: str) -> Optional[BarMetrics]:
+        metrics = self._metrics.get((symbol, interval))
+        return metrics if metrics is not None and metrics.bars else None
+
+    def update(self, symbol: str, interval: str, columns: Dict[str, np.ndarray]) -> int:
+        """
+        ป้อนแท่งที่ปิดแล้ว (ซ้อนกับที่เคยป้อนได้ - เพิ่มเฉพาะแท่งใหม่)
+
+        Returns:
+            จำนวนแท่งที่เพิ่ม
+        """
+        if columns is None or len(columns['open_time']) == 0:
+            return 0
+        open_time = columns['open_time']
+        metrics = self._metrics.get((symbol, interval))
+        start = 0
+        if metrics is not None:
+            start = int(np.searchsorted(open_time, metrics.last_open_time, side='right'))
+            if start < len(open_time) and open_time[start] != metrics.last_open_time + interval_to_ms(interval):
+                metrics = None  # แท่งขาดช่วง (เช่น backfill ใหม่) - เริ่มนับใหม่จาก columns
+                start = 0
+        if metrics is None:
+            metrics = self._metrics[(symbol, interval)] = BarMetrics(self.window)
+            start = max(0, len(open_time) - self.window)
+        high, low, close, volume = columns['high'], columns['low'], columns['close'], columns['volume']
+        for i in range(start, len(open_time)):
+            metrics.push(open_time[i], float(high[i]), float(low[i]), float(close[i]), float(volume[i]))
+        return len(open_time) - start
+
+    def state(self) -> Dict:
+        return {'window': self.window, 'metrics': self._metrics}
+
+    def restore(self, state: Dict) -> bool:
+        """โหลด state จาก state() (window ไม่ตรง -> ไม่ใช้)"""
+        if state.get('window') != self.window:
+            return False
+        self._metrics = state['metrics']
+        return True
+
+    def snapshot(self, symbol: str, timeframes: Iterable[str]) -> Dict[str, Dict]:
+        """เมตริกทุก timeframe ในรูปแบบเดียวกับ CoinAnalyzer.calculate_*_multi_tf"""
+        result = {'volatility': {}, 'volume_profile': {}, 'liquidity_score': {}, 'trend_strength': {}}
+        for tf in timeframes:
+            metrics = self.get(symbol, tf) or BarMetrics(self.window)
+            result['volatility'][tf] = metrics.volatility()
+            result['volume_profile'][tf] = metrics.volume_profile()
+            result['liquidity_score'][tf] = metrics.liquidity_score()
+            result['trend_strength'][tf] = metrics.trend_strength()
+        return result
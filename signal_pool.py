@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Signal Pool - ย้ายงาน CPU (calculate_indicators + check_*_signal) ออกจาก asyncio event loop
+
+TradingBot.check_market_conditions ส่ง kline ของ symbol เป็น NumPy arrays ขนาดเล็ก
+(open_time + OHLCV จาก kline_store.klines_to_columns) ไปให้ worker ประกอบ DataFrame และรัน TradingBot.evaluate_signals
+แล้วคืนผลเป็น dict ธรรมดา - loop จึงว่างสำหรับ I/O (WebSocket, notifications, timeouts)
+และการประเมินหลาย symbol กระจายได้หลาย core
+
+Modes:
+    'process' - ProcessPoolExecutor แบบ spawn (ข้าม GIL, ใช้ได้หลาย core; ไม่ fork process ที่มี thread อยู่แล้ว)
+    'thread'  - ThreadPoolExecutor (ไม่มีค่า pickle, pandas/numpy ปล่อย GIL บางส่วน)
+    'inline'  - รันใน loop ตรงๆ (replay / debug ที่ต้องการลำดับคงที่)
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+MODES = ('process', 'thread', 'inline')
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+FRAME_COLUMNS = ('open_time',) + PRICE_COLUMNS  # คอลัมน์ที่ส่งให้ worker
+
+# evaluator ต่อ process: TradingBot ที่ไม่เรียก __init__ (evaluate_signals ไม่ใช้ state ของ bot)
+_evaluator = None
+
+
+def columns_to_frame(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """คอลัมน์จาก kline_store.klines_to_columns -> DataFrame (timestamp = open_time) ที่ evaluate_signals ใช้"""
+    frame = {'timestamp': columns['open_time']}
+    frame.update({name: columns[name] for name in PRICE_COLUMNS})
+    return pd.DataFrame(frame)
+
+
+def evaluate_columns(columns: Dict[str, np.ndarray], current_price: float) -> Dict:
+    """entry point ของ worker: arrays -> DataFrame -> TradingBot.evaluate_signals"""
+    global _evaluator
+    if _evaluator is None:
+        from trading_bot import TradingBot
+        _evaluator = TradingBot.__new__(TradingBot)
+    return _evaluator.evaluate_signals(columns_to_frame(columns), current_price)
+
+
+class SignalPool:
+    def __init__(self, mode: str = 'thread', max_workers: int = 0):
+        """
+        Args:
+            mode: 'process', 'thread' หรือ 'inline'
+            max_workers: จำนวน worker (0 = os.cpu_count())
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown signal pool mode '{mode}' (expected one of {MODES})")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+
+    def _get_executor(self):
+        # สร้างตอนใช้ครั้งแรก: TradingBot ที่ไม่ได้ประเมินสัญญาณ (backtest, scripts) ไม่ต้องมี worker
+        if self._executor is None:
+            if self.mode == 'process':
+                # spawn: fork จาก process ที่มี to_thread workers / HTTP sessions อาจ deadlock บน lock ที่ติดมา
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Signal evaluation pool started: {self.mode} x {self.max_workers}")
+        return self._executor
+
+    async def evaluate(self, columns: Dict[str, np.ndarray], current_price: float) -> Dict:
+        columns = {name: columns[name] for name in FRAME_COLUMNS}  # worker ไม่ต้องการคอลัมน์อื่น
+        if self.mode == 'inline':
+            return evaluate_columns(columns, current_price)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), evaluate_columns, columns, current_price)
+        except BrokenProcessPool as e:
+            # worker ตาย (เช่น OOM) - ประเมินใน loop ต่อไปแทนการหยุดเทรด
+            logger.error(f"Signal pool broken, falling back to inline evaluation: {str(e)}")
+            self.close()
+            self.mode = 'inline'
+            return evaluate_columns(columns, current_price)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Synthetic Market Data - สร้าง OHLCV จำลองในรูปแบบ KlineStore สำหรับ scaling / stress test
+
+โมเดล (ทุกอย่าง vectorized, ทำซ้ำได้ด้วย seed):
+- Geometric Brownian motion ของราคาปิด
+- Volatility regimes (low / normal / high) สลับกันแบบ Markov chain
+- Volume clustering: log-volume แบบ AR(1) + ผูกกับขนาดของ return
+- Gaps: ราคาเปิดกระโดดจากราคาปิดแท่งก่อน
+- Flash crashes: ร่วงแรงในแท่งเดียว (ไส้เทียนยาว) แล้วฟื้นกลับบางส่วนในไม่กี่แท่ง
+
+ชื่อ symbol เริ่มต้นเป็น SYN000USDT ... เพื่อไม่ให้ปนกับข้อมูลจริงใน data/klines
+
+Usage:
+    python synthetic_data.py --symbols 300 --candles 10000
+    python synthetic_data.py --symbols 5 --candles 1051200 --interval 1m --start 2023-01-01 --seed 7
+"""
+
+import argparse
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from indicator_kernels import linear_recursion
+from kline_store import KlineStore, interval_to_ms
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+class SyntheticMarket:
+    def __init__(self, annual_drift: float = 0.0, annual_volatility: float = 0.8,
+                 regime_multipliers=(0.5, 1.0, 2.5), regime_switch_prob: float = 0.002,
+                 volume_base: float = 1000.0, volume_persistence: float = 0.97,
+                 volume_noise: float = 0.15, volume_return_sensitivity: float = 0.6,
+                 gap_prob: float = 0.001, gap_volatility: float = 0.01,
+                 crash_prob: float = 0.00005, crash_depth=(0.05, 0.2),
+                 crash_recovery_bars: int = 30, crash_recovery_fraction: float = 0.6):
+        """
+        Args:
+            annual_drift, annual_volatility: พารามิเตอร์ GBM ต่อปี (ปรับตาม interval อัตโนมัติ)
+            regime_multipliers: ตัวคูณ volatility ของแต่ละ regime
+            regime_switch_prob: โอกาสเปลี่ยน regime ต่อแท่ง
+            volume_persistence: ค่า AR(1) ของ log-volume (ยิ่งใกล้ 1 ยิ่งเกาะกลุ่ม)
+            volume_return_sensitivity: volume เพิ่มตามขนาด |return| / sigma
+            gap_prob, gap_volatility: โอกาสและขนาด (log) ของ gap ที่ราคาเปิด
+            crash_prob, crash_depth: โอกาส flash crash ต่อแท่ง และช่วงความลึก (สัดส่วน)
+            crash_recovery_bars, crash_recovery_fraction: ฟื้นกลับกี่แท่ง และฟื้นกี่ส่วนของที่ร่วง
+        """
+        self.annual_drift = annual_drift
+        self.annual_volatility = annual_volatility
+        self.regime_multipliers = np.asarray(regime_multipliers, dtype=np.float64)
+        self.regime_switch_prob = regime_switch_prob
+        self.volume_base = volume_base
+        self.volume_persistence = volume_persistence
+        self.volume_noise = volume_noise
+        self.volume_return_sensitivity = volume_return_sensitivity
+        self.gap_prob = gap_prob
+        self.gap_volatility = gap_volatility
+        self.crash_prob = crash_prob
+        self.crash_depth = crash_depth
+        self.crash_recovery_bars = crash_recovery_bars
+        self.crash_recovery_fraction = crash_recovery_fraction
+
+    def regimes(self, rng: np.random.Generator, candles: int) -> np.ndarray:
+        """index ของ regime ต่อแท่ง (Markov chain แบบ forward-fill ของจุดที่สลับ)"""
+        switches = rng.random(candles) < self.regime_switch_prob
+        switches[0] = True
+        new_states = rng.integers(0, len(self.regime_multipliers), candles)
+        last_switch = np.maximum.accumulate(np.where(switches, np.arange(candles), 0))
+        return new_states[last_switch]
+
+    def generate(self, candles: int, interval: str = '1m', start: str = '2024-01-01',
+                 seed: int = 0, initial_price: float = 100.0) -> Dict[str, np.ndarray]:
+        """สร้างคอลัมน์ kline ครบชุด (KLINE_COLUMNS) จำนวน `candles` แท่ง"""
+        rng = np.random.default_rng(seed)
+        step = interval_to_ms(interval)
+        dt = step / 60_000 / MINUTES_PER_YEAR
+
+        regime = self.regimes(rng, candles)
+        sigma = self.annual_volatility * np.sqrt(dt) * self.regime_multipliers[regime]
+        drift = (self.annual_drift - 0.5 * self.annual_volatility ** 2) * dt
+        returns = drift + sigma * rng.standard_normal(candles)
+
+        # Flash crashes: ร่วงในแท่งเดียว ฟื้นกลับบางส่วนกระจายในแท่งถัดไป
+        crash_bars = np.flatnonzero(rng.random(candles) < self.crash_prob)
+        depths = rng.uniform(*self.crash_depth, len(crash_bars))
+        crash_wick = np.zeros(candles)
+        recovery = np.zeros(candles + self.crash_recovery_bars + 1)
+        for bar, depth in zip(crash_bars, depths):
+            returns[bar] += np.log1p(-depth)
+            crash_wick[bar] = depth * rng.uniform(0.2, 0.5)
+            recovery[bar + 1:bar + 1 + self.crash_recovery_bars] += (
+                -np.log1p(-depth) * self.crash_recovery_fraction / self.crash_recovery_bars
+            )
+        returns += recovery[:candles]
+
+        # Gaps: ส่วนหนึ่งของ return เกิดระหว่างแท่ง (open != close ก่อนหน้า)
+        gaps = np.where(rng.random(candles) < self.gap_prob,
+                        rng.normal(0, self.gap_volatility, candles), 0.0)
+        gaps[0] = 0.0
+
+        log_close = np.log(initial_price) + np.cumsum(returns + gaps)
+        close = np.exp(log_close)
+        open_ = np.exp(np.concatenate(([np.log(initial_price)], log_close[:-1])) + gaps)
+
+        # ไส้เทียน: ขยายจาก body ตาม sigma ของ regime
+        body_high = np.maximum(open_, close)
+        body_low = np.minimum(open_, close)
+        high = body_high * np.exp(np.abs(rng.normal(0, 0.5, candles)) * sigma)
+        low = body_low * np.exp(-np.abs(rng.normal(0, 0.5, candles)) * sigma) * (1 - crash_wick)
+
+        # Volume clustering: AR(1) ใน log-space + ตอบสนองต่อ |return|
+        shocks = rng.normal(0, self.volume_noise, candles)
+        log_volume = linear_recursion(shocks, self.volume_persistence)
+        intensity = 1 + self.volume_return_sensitivity * np.abs(returns + gaps) / sigma
+        volume = self.volume_base * np.exp(log_volume) * intensity * self.regime_multipliers[regime]
+
+        buy_share = np.clip(0.5 + 0.25 * np.tanh((returns + gaps) / sigma) + rng.normal(0, 0.05, candles), 0.05, 0.95)
+        typical = (high + low + close) / 3
+        open_time = pd.Timestamp(start).value // 1_000_000 + np.arange(candles, dtype=np.int64) * step
+
+        return {
+            'open_time': open_time,
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+            'close_time': open_time + step - 1,
+            'quote_volume': volume * typical,
+            'trades': np.maximum(1, (volume / 5 * rng.uniform(0.8, 1.2, candles)).astype(np.int64)),
+            'taker_buy_base': volume * buy_share,
+            'taker_buy_quote': volume * buy_share * typical,
+        }
+
+
+def synthetic_symbols(count: int, prefix: str = 'SYN') -> List[str]:
+    width = max(3, len(str(count - 1)))
+    return [f"{prefix}{i:0{width}d}USDT" for i in range(count)]
+
+
+def write_universe(store: KlineStore, symbols: int = 10, candles: int = 10_000, interval: str = '1m',
+                   start: str = '2024-01-01', seed: int = 0, market: SyntheticMarket = None,
+                   prefix: str = 'SYN') -> List[str]:
+    """สร้างข้อมูลหลาย symbol ลง KlineStore (seed ของแต่ละ symbol = seed + index)"""
+    market = market or SyntheticMarket()
+    names = synthetic_symbols(symbols, prefix)
+    price_rng = np.random.default_rng(seed)
+    for i, symbol in enumerate(names):
+        initial_price = float(np.exp(price_rng.uniform(np.log(0.01), np.log(50_000))))
+        store.save(symbol, interval, market.generate(candles, interval, start, seed + i, initial_price))
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic OHLCV data into the kline store")
+    parser.add_argument('--symbols', type=int, default=10)
+    parser.add_argument('--candles', type=int, default=10_000)
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--start', default='2024-01-01', help="YYYY-MM-DD")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prefix', default='SYN')
+    parser.add_argument('--volatility', type=float, default=0.8, help="annualized volatility")
+    parser.add_argument('--crash-prob', type=float, default=0.00005, help="flash crash probability per bar")
+    parser.add_argument('--data-dir', default=os.path.join('data', 'klines'))
+    args = parser.parse_args()
+
+    market = SyntheticMarket(annual_volatility=args.volatility, crash_prob=args.crash_prob)
+    names = write_universe(KlineStore(args.data_dir), args.symbols, args.candles, args.interval,
+                           args.start, args.seed, market, args.prefix)
+    logger.info(f"Generated {len(names)} symbols x {args.candles} {args.interval} candles in {args.data_dir}")
+
+
+if __name__ == "__main__":
+    main()
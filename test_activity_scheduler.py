@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ ActivityScheduler: symbol ที่เคลื่อนไหวถูกประเมินถี่กว่า, position ทุกแท่ง, budget ต่อแท่ง
+"""
+
+import sys
+
+import numpy as np
+
+from activity_scheduler import ActivityScheduler, activity_score
+
+
+def candles(n=100, seed=0, spike=False):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.05, n))
+    high, low = close + 0.1, close - 0.1
+    volume = np.full(n, 1000.0)
+    if spike:
+        # 5 แท่งสุดท้าย: volume x4, ช่วงราคากว้าง, ปิดทะลุ high เดิม
+        volume[-5:] *= 4
+        high[-5:] += 1.0
+        low[-5:] -= 1.0
+        close[-1] = high[:-1].max() + 0.5
+        high[-1] = close[-1] + 0.1
+    return {'high': high, 'low': low, 'close': close, 'volume': volume}
+
+
+def test_activity_score():
+    quiet = candles()
+    hot = candles(spike=True)
+    quiet_score = activity_score(quiet['high'], quiet['low'], quiet['close'], quiet['volume'])
+    hot_score = activity_score(hot['high'], hot['low'], hot['close'], hot['volume'])
+    assert hot_score > 2.0 > quiet_score, (hot_score, quiet_score)
+    print(f"✅ activity score OK (quiet={quiet_score:.2f}, hot={hot_score:.2f})")
+
+
+def test_cadence_follows_activity():
+    scheduler = ActivityScheduler(max_interval=5, quiet_score=1.8)
+    scheduler.update('QUIETUSDT', candles())
+    scheduler.update('HOTUSDT', candles(spike=True))
+    counts = {'QUIETUSDT': 0, 'HOTUSDT': 0, 'POSUSDT': 0, 'NEWUSDT': 0}
+    scheduler.update('POSUSDT', candles(seed=2))
+    for tick in range(20):
+        for symbol in scheduler.select(counts, tick, open_positions=['POSUSDT']):
+            counts[symbol] += 1
+    assert counts['HOTUSDT'] == 20 and counts['POSUSDT'] == 20 and counts['NEWUSDT'] == 20, counts
+    assert counts['QUIETUSDT'] == 4, counts
+    print(f"✅ cadence follows activity OK ({counts})")
+
+
+def test_budget_prefers_positions_then_activity():
+    scheduler = ActivityScheduler(max_interval=1, budget=2)
+    scheduler.update('QUIETUSDT', candles())
+    scheduler.update('HOTUSDT', candles(spike=True))
+    scheduler.update('POSUSDT', candles(seed=2))
+    selected = scheduler.select(['QUIETUSDT', 'HOTUSDT', 'POSUSDT'], 0, open_positions=['POSUSDT'])
+    assert selected == ['POSUSDT', 'HOTUSDT'], selected
+    # รอบถัดไป symbol ที่ถูกข้ามเลยกำหนดนานขึ้น จึงไม่อดตลอด
+    assert 'QUIETUSDT' in scheduler.select(['QUIETUSDT', 'HOTUSDT', 'POSUSDT'], 3, open_positions=['POSUSDT'])
+    print("✅ budget priority OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_activity_score()
+        test_cadence_follows_activity()
+        test_budget_prefers_positions_then_activity()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ AnalysisCache: จำกัดขนาด (LRU), TTL แบบ jitter, refresh-ahead ใน background ของ CoinAnalyzer,
+get_coin_recommendations ไม่รอการวิเคราะห์
+"""
+
+import asyncio
+import sys
+
+from analysis_cache import AnalysisCache
+from coin_analysis import CoinAnalyzer
+from fake_binance import make_bot
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_bound_and_metrics():
+    cache = AnalysisCache(max_entries=3, ttl=100, clock=FakeClock())
+    for symbol in ('A', 'B', 'C'):
+        cache.set(symbol, symbol.lower())
+    assert cache.get('A') == 'a'  # A ใช้ล่าสุด -> B เก่าสุด
+    cache.set('D', 'd')
+    assert len(cache) == 3 and 'B' not in cache and 'A' in cache
+    assert cache.get('B') is None
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['evictions'] == 1
+    print("✅ cache is bounded (LRU) with hit/miss metrics OK")
+
+
+def test_jittered_expiry_spreads_refreshes():
+    clock = FakeClock()
+    cache = AnalysisCache(max_entries=1000, ttl=3600, jitter=0.2, refresh_ahead=0.8, clock=clock)
+    for i in range(200):
+        cache.set(i, i)
+
+    clock.now = 3600 * 0.8 * 0.8 - 1  # ก่อนจุด refresh ที่เร็วที่สุด
+    assert not any(cache.needs_refresh(i) for i in range(200))
+    due = []
+    for minute in range(39, 50):
+        clock.now = minute * 60
+        due.append(sum(cache.needs_refresh(i) for i in range(200)))
+    assert due[-1] == 200
+    assert max(b - a for a, b in zip([0] + due, due)) < 60, f"refreshes bunched: {due}"
+
+    clock.now = 3600 * 0.8 - 1
+    assert all(cache.get(i) == i for i in range(200))  # ยังไม่มี entry ไหนหมดอายุ
+    clock.now = 3600
+    assert cache.get(0) is None and cache.get(0, allow_stale=True) == 0
+    print("✅ jittered TTL spreads refreshes across the hour OK")
+
+
+def test_analyzer_serves_stale_and_refreshes_in_background():
+    analyzer = CoinAnalyzer(client=None)
+    clock = FakeClock()
+    analyzer.coin_analysis_cache.clock = clock
+    analyzer.coin_analysis_cache.jitter = 0
+    calls = []
+
+    async def analyze(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.01)
+        analysis = {'symbol': symbol, 'version': len(calls)}
+        analyzer.coin_analysis_cache.set(symbol, analysis)
+        return analysis
+
+    analyzer.refresh_analysis = analyze
+
+    async def scenario():
+        first = await analyzer.analyze_coin_multi_tf('BTCUSDT')  # miss -> วิเคราะห์ตอนนี้
+        assert first['version'] == 1
+        clock.now = analyzer.cache_duration * 0.9  # เลยจุด refresh-ahead
+        results = [await analyzer.analyze_coin_multi_tf('BTCUSDT') for _ in range(5)]
+        assert all(r['version'] == 1 for r in results)  # ได้ค่าเดิมทันที
+        assert len(analyzer.refresh_tasks) == 1  # refresh เดียวแม้ถูกถามหลายครั้ง
+        await asyncio.gather(*analyzer.refresh_tasks.values())
+        return await analyzer.analyze_coin_multi_tf('BTCUSDT')
+
+    latest = asyncio.run(scenario())
+    assert latest['version'] == 2 and calls == ['BTCUSDT', 'BTCUSDT']
+    stats = analyzer.cache_stats()
+    assert stats['background_refreshes'] == 1 and stats['refreshing'] == 0
+    print("✅ analyzer serves cached analysis while refreshing in background OK")
+
+
+def test_recommendations_never_wait_for_analysis():
+    bot = make_bot()
+    analyzed = []
+
+    async def analyze(symbol):
+        await asyncio.sleep(0.05)
+        analyzed.append(symbol)
+        analysis = {'symbol': symbol, 'recommendations': {'position_size_multiplier': 1.0}}
+        bot.coin_analyzer.coin_analysis_cache.set(symbol, analysis)
+        return analysis
+
+    bot.coin_analyzer.refresh_analysis = analyze
+
+    async def scenario():
+        first = bot.get_coin_recommendations('SOLUSDT')  # ไม่ใช่ coroutine: ไม่มี I/O บน path ที่เทรด
+        again = bot.get_coin_recommendations('SOLUSDT')
+        assert analyzed == [] and len(bot.coin_analyzer.refresh_tasks) == 1
+        await asyncio.gather(*bot.coin_analyzer.refresh_tasks.values())
+        return first, again, bot.get_coin_recommendations('SOLUSDT')
+
+    first, again, latest = asyncio.run(scenario())
+    assert first['categories']['leverage'] == 'LOW' and again['recommendations']['position_size_multiplier'] == 0.3
+    assert latest['recommendations']['position_size_multiplier'] == 1.0
+    assert analyzed == ['SOLUSDT']
+    print("✅ missing symbol gets defaults now and is analyzed in background OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_lru_bound_and_metrics()
+        test_jittered_expiry_spreads_refreshes()
+        test_analyzer_serves_stale_and_refreshes_in_background()
+        test_recommendations_never_wait_for_analysis()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
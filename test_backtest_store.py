@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ BacktestResultStore (columnar result format) แบบ offline
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backtest_plots import ReportRenderer
+from backtest_store import BacktestResultStore
+
+
+def make_results():
+    start = datetime(2024, 1, 1)
+    trades = []
+    for i in range(5):
+        trades.append({
+            'timestamp': start + timedelta(hours=i),
+            'signal': 'BUY' if i % 2 == 0 else 'SELL',
+            'entry_price': 100.0 + i,
+            'position_size': 1.5,
+            'strategy': 'emergency',
+            'balance_before': 1000.0,
+            'exit_price': 101.0 + i,
+            'exit_timestamp': start + timedelta(hours=i, minutes=30),
+            'pnl': 1.5 if i % 2 == 0 else -1.5,
+            'balance_after': 1001.5,
+        })
+    return {
+        'symbol': 'BTCUSDT',
+        'initial_balance': 1000,
+        'final_balance': 1001.5,
+        'win_rate_pct': 60.0,
+        'profit_factor': float('inf'),
+        'strategy_performance': {'emergency': {'signals': 5, 'wins': 3, 'win_rate': 60.0}},
+        'strategy_signals': {'emergency': 5},
+        'trades': trades,
+        'daily_returns': [{'date': start.date(), 'balance': 1001.5, 'return': 0.0015}],
+    }
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BacktestResultStore(tmp)
+        store.save(make_results(), 'report')
+
+        summary = store.load_summary('report')
+        assert summary['win_rate_pct'] == 60.0
+        assert summary['tables']['trades']['rows'] == 5
+        assert 'trades' not in summary
+
+        columns = store.load_table('report', 'trades', ['timestamp', 'pnl'])
+        assert set(columns) == {'timestamp', 'pnl'}
+        assert isinstance(columns['pnl'], np.memmap)
+        assert columns['timestamp'].dtype == np.dtype('datetime64[ms]')
+        assert columns['timestamp'][1] == np.datetime64('2024-01-01T01:00:00.000')
+
+        strategies = store.load_frame('report', 'strategies')
+        assert list(strategies['strategy']) == ['emergency']
+
+        results = store.load_results('report')
+        assert len(results['trades']) == 5
+        assert results['trades'][0]['signal'] == 'BUY'
+        print("✅ round trip OK")
+
+
+def test_empty_trades():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BacktestResultStore(tmp)
+        results = make_results()
+        results['trades'] = []
+        store.save(results, 'empty')
+        assert store.load_summary('empty')['tables']['trades']['rows'] == 0
+        assert store.load_table('empty', 'trades') == {}
+        print("✅ empty trades OK")
+
+
+def test_render_from_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BacktestResultStore(tmp)
+        store.save(make_results(), 'report')
+        with ReportRenderer(tmp) as renderer:
+            future = renderer.submit('report')
+        assert future.result() == os.path.join(tmp, 'report', 'charts.png')
+        assert os.path.getsize(future.result()) > 0
+        assert ReportRenderer(tmp, enabled=False).submit('report') is None
+        print("✅ headless render OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_round_trip()
+        test_empty_trades()
+        test_render_from_store()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+ทดสอบการเทียบผล benchmark กับ baseline (ไม่ได้รัน benchmark จริง)
+"""
+
+import sys
+
+from benchmark_macro import compare
+
+
+def result(candles_per_second, p95_ms):
+    return {'metrics': {
+        'backtest.default.candles_per_second': {'value': candles_per_second, 'unit': 'candles/s',
+                                                'higher_is_better': True},
+        'scan_cycle.5_symbols.p95_ms': {'value': p95_ms, 'unit': 'ms', 'higher_is_better': False},
+    }}
+
+
+def test_compare_flags_slowdowns_only():
+    rows = {row['name']: row for row in compare(result(100, 50), result(85, 52), threshold_pct=10)}
+    assert rows['backtest.default.candles_per_second']['regression']
+    assert not rows['scan_cycle.5_symbols.p95_ms']['regression']
+
+    rows = {row['name']: row for row in compare(result(100, 50), result(150, 20), threshold_pct=10)}
+    assert not any(row['regression'] for row in rows.values())
+    assert abs(rows['scan_cycle.5_symbols.p95_ms']['change_pct'] + 60) < 1e-9
+    print("✅ benchmark compare OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_compare_flags_slowdowns_only()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ RecordingClient / FixtureClient (record แล้ว replay แบบ offline)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from binance_fixtures import FixtureClient, RecordingClient
+from rate_limiter import request_weight
+
+
+class CountingSource:
+    """แหล่งข้อมูลแทน Binance: ราคาเพิ่มขึ้นทุกครั้งที่ถูกเรียก"""
+    KLINE_INTERVAL_1MINUTE = '1m'
+
+    def __init__(self):
+        self.price = 100.0
+
+    def futures_symbol_ticker(self, symbol=None):
+        self.price += 1
+        return {'symbol': symbol, 'price': str(self.price)}
+
+    def futures_klines(self, symbol, interval, limit=500):
+        return [[i, '1', '2', '0.5', '1.5', '10'] for i in range(limit)]
+
+
+def test_record_then_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'fixture.json')
+        recording = RecordingClient(CountingSource(), path)
+        assert recording.KLINE_INTERVAL_1MINUTE == '1m'
+        first = recording.futures_symbol_ticker(symbol='BTCUSDT')
+        second = recording.futures_symbol_ticker(symbol='BTCUSDT')
+        klines = recording.futures_klines(interval='1m', symbol='BTCUSDT', limit=3)
+        recording.save()
+
+        replay = FixtureClient(path)
+        assert replay.futures_symbol_ticker(symbol='BTCUSDT') == first
+        assert replay.futures_symbol_ticker(symbol='BTCUSDT') == second
+        assert replay.futures_symbol_ticker(symbol='BTCUSDT') == second  # last response repeats
+        assert replay.futures_klines(symbol='BTCUSDT', limit=3, interval='1m') == klines
+        assert replay.call_counts['futures_symbol_ticker'] == 3
+        # wrapper คงชื่อ method ไว้ -> rate limiter นับ weight ได้ถูก
+        assert recording.futures_symbol_ticker.__name__ == replay.futures_symbol_ticker.__name__ == 'futures_symbol_ticker'
+        assert request_weight(replay.futures_symbol_ticker.__name__, {}) == 2
+
+        try:
+            replay.futures_symbol_ticker(symbol='ETHUSDT')
+            assert False, "unrecorded call should fail in strict mode"
+        except KeyError:
+            pass
+        assert FixtureClient(path, strict=False).futures_symbol_ticker(symbol='ETHUSDT') == first
+        print("✅ record / replay OK")
+
+
+def test_simulated_latency():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'fixture.json')
+        recording = RecordingClient(CountingSource(), path)
+        recording.futures_symbol_ticker(symbol='BTCUSDT')
+        recording.save()
+
+        replay = FixtureClient(path, latency_ms=20)
+        started = time.perf_counter()
+        replay.futures_symbol_ticker(symbol='BTCUSDT')
+        assert time.perf_counter() - started >= 0.02
+        print("✅ simulated latency OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_record_then_replay()
+        test_simulated_latency()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
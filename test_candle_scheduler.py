@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ CandleScheduler: ปลุกครั้งเดียวต่อแท่งหลังเวลาปิด, exit check ระหว่างแท่ง, server time offset
+"""
+
+import asyncio
+import sys
+import types
+from unittest import mock
+
+import candle_scheduler
+from candle_scheduler import EVENT_CANDLE_CLOSE, EVENT_EXIT_CHECK, CandleScheduler
+
+MINUTE_MS = 60_000
+
+
+class FakeClock:
+    """เวลาเครื่องจำลอง: asyncio.sleep เลื่อนนาฬิกาแทนการรอจริง"""
+
+    def __init__(self, start_ms):
+        self.now_ms = start_ms
+
+    def time(self):
+        return self.now_ms / 1000
+
+    async def sleep(self, seconds):
+        self.now_ms += seconds * 1000
+
+
+def run_events(scheduler, clock, count, fetch=None):
+    async def collect():
+        return [(await scheduler.wait(fetch), clock.now_ms) for _ in range(count)]
+
+    with mock.patch.object(candle_scheduler, 'time', clock), \
+            mock.patch.object(candle_scheduler, 'asyncio', types.SimpleNamespace(sleep=clock.sleep)):
+        return asyncio.run(collect())
+
+
+def test_fires_once_per_closed_candle():
+    clock = FakeClock(100 * MINUTE_MS + 20_000)  # 20s เข้าไปในแท่ง
+    scheduler = CandleScheduler('1m', close_offset_ms=1500)
+    events = run_events(scheduler, clock, 3)
+    closes = [close_ms for (event, close_ms), _ in events]
+    assert all(event == EVENT_CANDLE_CLOSE for (event, _), _ in events)
+    assert closes == [101 * MINUTE_MS, 102 * MINUTE_MS, 103 * MINUTE_MS], closes
+    assert [fired for _, fired in events] == [c + 1500 for c in closes]
+    print("✅ one evaluation per closed candle OK")
+
+
+def test_exit_checks_between_closes():
+    clock = FakeClock(100 * MINUTE_MS + 2_000)
+    scheduler = CandleScheduler('1m', close_offset_ms=1000, exit_check_seconds=10)
+    events = [event for (event, _), _ in run_events(scheduler, clock, 14)]
+    assert events.count(EVENT_CANDLE_CLOSE) == 2, events
+    assert events[:5] == [EVENT_EXIT_CHECK] * 5 and events[5] == EVENT_CANDLE_CLOSE, events
+    print("✅ intra-candle exit checks OK")
+
+
+def test_server_time_offset():
+    clock = FakeClock(100 * MINUTE_MS + 59_000)
+
+    async def fetch_server_time():
+        return {'serverTime': clock.now_ms + 5_000}  # server เร็วกว่าเครื่อง 5 วินาที
+
+    scheduler = CandleScheduler('1m', close_offset_ms=1500)
+    ((event, close_ms), fired), = run_events(scheduler, clock, 1, fetch_server_time)
+    assert scheduler.offset_ms == 5_000
+    assert close_ms == 102 * MINUTE_MS and fired + 5_000 == close_ms + 1500, (close_ms, fired)
+    print("✅ server time offset OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_fires_once_per_closed_candle()
+        test_exit_checks_between_closes()
+        test_server_time_offset()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
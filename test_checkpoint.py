@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ CheckpointStore (atomic save / load / remove)
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from checkpoint import CheckpointStore
+from performance_stats import StreamingStats
+
+
+def test_round_trip_and_remove():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CheckpointStore(tmp)
+        assert store.load('job') is None
+
+        stats = StreamingStats(1000)
+        stats.record_trade(25.0, 'breakout', datetime(2024, 1, 1), 1025.0)
+        trades = [{'timestamp': pd.Timestamp('2024-01-01 05:00'), 'signal': 'BUY', 'pnl': 25.0}]
+        store.save('job', {'next_index': 600, 'trades': trades, 'stats': stats.to_state()})
+        store.save('job', {'next_index': 1100, 'trades': trades, 'stats': stats.to_state()})
+
+        state = store.load('job')
+        assert state['next_index'] == 1100
+        assert state['trades'][0]['timestamp'] == trades[0]['timestamp']
+        assert StreamingStats.from_state(state['stats']).snapshot() == stats.snapshot()
+        assert not os.path.exists(store.path('job') + '.tmp')
+
+        store.remove('job')
+        assert not store.exists('job')
+        print("✅ checkpoint round trip OK")
+
+
+def test_corrupt_checkpoint_is_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CheckpointStore(tmp)
+        with open(store.path('job'), 'wb') as f:
+            f.write(b'not a pickle')
+        assert store.load('job') is None
+        print("✅ corrupt checkpoint ignored OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_round_trip_and_remove()
+        test_corrupt_checkpoint_is_ignored()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -7,7 +7,7 @@ import asyncio
 import json
 from trading_bot import TradingBot
 from coin_analysis import CoinAnalyzer
-from binance.client import Client
+from binance_fixtures import create_client
 import config
 
 async def test_coin_analysis():
@@ -50,7 +50,7 @@ async def test_coin_analysis():
         print("\n🎯 ทดสอบการวิเคราะห์เหรียญเฉพาะ...")
         test_symbol = "BTCUSDT"
         if test_symbol in config.TRADING_PAIRS:
-            recommendation = await bot.get_coin_recommendations(test_symbol)
+            recommendation = bot.get_coin_recommendations(test_symbol)
             if recommendation:
                 print(f"✅ วิเคราะห์ {test_symbol} สำเร็จ")
                 print(f"   ขนาด Order: {recommendation['categories']['order_size']}")
@@ -96,7 +96,7 @@ async def test_individual_metrics():
     print("\n🔬 ทดสอบการคำนวณเมตริกแต่ละตัว...")
     
     try:
-        client = Client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+        client = create_client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
         analyzer = CoinAnalyzer(client)
         
         test_symbol = "BTCUSDT"
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ CoinAnalyzer.safe_api_call: request แบบ blocking รันพร้อมกันจริง, จำกัดจำนวน, timeout และ rate limit
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+from coin_analysis import CoinAnalyzer
+from rate_limiter import AsyncRateLimiter, klines_weight, request_weight
+
+
+class BlockingClient:
+    """client แบบ sync ที่ block thread ตาม delay เหมือน HTTP request จริง"""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.running = 0
+        self.peak_running = 0
+        self._lock = threading.Lock()
+
+    def futures_klines(self, symbol, interval, limit=500):
+        with self._lock:
+            self.running += 1
+            self.peak_running = max(self.peak_running, self.running)
+        try:
+            time.sleep(self.delay)
+            return [[0, '1', '1', '1', '1', '1', 59999, '1', 1, '1', '1', '0']]
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def test_requests_overlap_up_to_limit():
+    client = BlockingClient(delay=0.1)
+    analyzer = CoinAnalyzer(client, rate_limiter=AsyncRateLimiter(0), max_concurrency=4)
+
+    async def fetch_all():
+        return await asyncio.gather(*(
+            analyzer.safe_api_call(client.futures_klines, symbol=f"S{i}USDT", interval='1m', limit=10)
+            for i in range(8)))
+
+    started = time.perf_counter()
+    results = asyncio.run(fetch_all())
+    elapsed = time.perf_counter() - started
+    assert len(results) == 8
+    assert client.peak_running == 4, f"peak in flight: {client.peak_running}"
+    assert elapsed < 0.5, f"8 requests took {elapsed:.2f}s (sequential would be 0.8s)"
+    print("✅ blocking requests run concurrently, bounded by max_concurrency OK")
+
+
+def test_request_timeout():
+    client = BlockingClient(delay=0.3)
+    analyzer = CoinAnalyzer(client, rate_limiter=AsyncRateLimiter(0), request_timeout=0.05)
+
+    async def fetch():
+        return await analyzer.safe_api_call(client.futures_klines, symbol='BTCUSDT', interval='1m')
+
+    try:
+        asyncio.run(fetch())
+    except asyncio.TimeoutError:
+        print("✅ slow request times out OK")
+        return
+    raise AssertionError("slow request did not time out")
+
+
+def test_shared_rate_limit():
+    assert klines_weight(99) == 1 and klines_weight(100) == 2 and klines_weight(1500) == 10
+    assert request_weight('futures_klines', {'limit': 1000}) == 5
+    assert request_weight('futures_account', {}) == 5
+    assert request_weight('futures_mark_price', {}) == 10 and request_weight('futures_mark_price', {'symbol': 'X'}) == 1
+    assert request_weight('futures_ticker', {}) == 40 and request_weight('futures_ticker', {'symbol': 'X'}) == 1
+
+    limiter = AsyncRateLimiter(weight_per_minute=600, burst=10)  # 10 weight / วินาที
+    client = BlockingClient(delay=0)
+    first = CoinAnalyzer(client, rate_limiter=limiter)
+    second = CoinAnalyzer(client, rate_limiter=limiter)
+
+    async def fetch_all():
+        calls = [analyzer.safe_api_call(client.futures_klines, symbol='BTCUSDT', interval='1m', limit=100)
+                 for analyzer in (first, second) for _ in range(6)]
+        await asyncio.gather(*calls)
+
+    started = time.perf_counter()
+    asyncio.run(fetch_all())
+    elapsed = time.perf_counter() - started
+    # 12 requests x weight 2 = 24 -> burst 10 แล้วรอเติมอีก 14 (~1.4s)
+    assert 1.2 < elapsed < 2.5, f"rate limited fetch took {elapsed:.2f}s"
+    assert limiter.waited_seconds > 1.0
+    print("✅ analyzers sharing a limiter stay under the weight budget OK")
+
+
+def test_order_skips_background_queue():
+    limiter = AsyncRateLimiter(weight_per_minute=600, burst=10)  # 10 weight / วินาที
+
+    async def run():
+        order_wait = []
+
+        async def background():
+            for _ in range(10):
+                await limiter.acquire(5)  # coin analysis ใช้งบเต็ม ~5s
+
+        async def order():
+            await asyncio.sleep(0.2)  # ส่งระหว่างที่คิวเบื้องหลังรออยู่
+            started = time.perf_counter()
+            await limiter.acquire(1, priority=True)
+            order_wait.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(background(), order())
+        return order_wait[0], time.perf_counter() - started
+
+    order_wait, total = asyncio.run(run())
+    assert order_wait < 0.05, f"order waited {order_wait:.2f}s behind background requests"
+    # weight รวม 51 -> burst 10 แล้วรอเติม 41 (~4.1s): งานเบื้องหลังรอแทน ไม่เกินงบ
+    assert 3.9 < total < 5.0, f"total {total:.2f}s"
+    print("✅ order requests skip the background queue within the budget OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_requests_overlap_up_to_limit()
+        test_request_timeout()
+        test_shared_rate_limit()
+        test_order_skips_background_queue()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ coin_scoring: กฎหมวดหมู่เดิม, batch เท่ากับทีละเหรียญ, percentile rank และขนาดทั้ง universe
+"""
+
+import math
+import sys
+import time
+
+import numpy as np
+
+import coin_scoring
+from coin_analysis import CoinAnalyzer
+
+TIMEFRAMES = list(coin_scoring.TF_WEIGHTS)
+
+
+def uniform_metrics(volatility, avg_volume, volume_stability, liquidity, trend):
+    """เมตริกที่เท่ากันทุก timeframe (ค่าเฉลี่ยถ่วงน้ำหนัก = ค่าเดิม)"""
+    return {
+        'volatility': {tf: volatility for tf in TIMEFRAMES},
+        'volume_profile': {tf: {'avg_volume': avg_volume, 'volume_stability': volume_stability} for tf in TIMEFRAMES},
+        'liquidity_score': {tf: liquidity for tf in TIMEFRAMES},
+        'trend_strength': {tf: trend for tf in TIMEFRAMES},
+    }
+
+
+def random_metrics(rng, count):
+    return [{
+        'volatility': {tf: float(rng.uniform(0, 15)) for tf in TIMEFRAMES},
+        'volume_profile': {tf: {'avg_volume': float(rng.lognormal(12, 2)),
+                                'volume_stability': float(rng.uniform(0, 1))} for tf in TIMEFRAMES},
+        'liquidity_score': {tf: float(rng.uniform(0, 100)) for tf in TIMEFRAMES},
+        'trend_strength': {tf: float(rng.choice([-100, -50, -25, 0, 25, 50, 100])) for tf in TIMEFRAMES},
+    } for _ in range(count)]
+
+
+def test_category_rules():
+    analyzer = CoinAnalyzer(client=None)
+    cases = [
+        # (volatility, avg_volume, stability, liquidity, trend) -> (order size, leverage)
+        ((1.0, 2_000_000, 0.9, 80, 75), ('LARGE', 'HIGH')),    # 30+25+20=75 / 40+27+25=92
+        ((3.0, 600_000, 0.5, 40, 25), ('MEDIUM', 'MEDIUM')),   # 20+20+10=50 / 30+15+15=60
+        ((12.0, 50_000, 0.1, 10, -75), ('SMALL', 'LOW')),      # 5+5+2.5=12.5 / 10+3-10=3
+        ((7.0, 200_000, 0.2, 0, -25), ('SMALL', 'LOW')),       # 10+15=25 / 20+6+5=31
+        ((float('nan'), 2_000_000, 0.9, 80, 75), ('MEDIUM', 'MEDIUM')),  # NaN ตกไปกิ่งสุดท้ายเหมือน if/elif
+    ]
+    analyses = analyzer.build_analyses([f"C{i}" for i in range(len(cases))], [1.0] * len(cases),
+                                       [uniform_metrics(*metrics) for metrics, _ in cases])
+    for i, (metrics, expected) in enumerate(cases):
+        categories = analyses[f"C{i}"]['categories']
+        assert (categories['order_size'], categories['leverage']) == expected, f"{metrics}: {categories}"
+        volume_profile = {'avg_volume': metrics[1], 'volume_stability': metrics[2]}
+        assert analyzer._determine_order_size_category(metrics[0], volume_profile, metrics[3]) == expected[0]
+        assert analyzer._determine_leverage_category(metrics[0], volume_profile, metrics[4]) == expected[1]
+    large = analyses['C0']['recommendations']
+    assert large['position_size_multiplier'] == 1.0 and large['leverage']['recommended'] == 20
+    print("✅ vectorized scoring follows the category rules OK")
+
+
+def test_batch_matches_single_symbol():
+    analyzer = CoinAnalyzer(client=None)
+    metrics = random_metrics(np.random.default_rng(3), 200)
+    symbols = [f"S{i}USDT" for i in range(len(metrics))]
+    batch = analyzer.build_analyses(symbols, [1.0] * len(symbols), metrics, rank=True)
+    for symbol, symbol_metrics in zip(symbols, metrics):
+        single = analyzer.build_analysis(symbol, 1.0, symbol_metrics)
+        assert batch[symbol]['categories'] == single['categories']
+        assert batch[symbol]['recommendations'] == single['recommendations']
+        expected_volatility = sum(symbol_metrics['volatility'][tf] * w for tf, w in coin_scoring.TF_WEIGHTS.items())
+        assert math.isclose(batch[symbol]['weighted_metrics']['volatility'], expected_volatility, rel_tol=1e-12)
+        assert 'ranks' in batch[symbol] and 'ranks' not in single
+    print("✅ batch scoring matches per-symbol scoring OK")
+
+
+def test_percentile_ranks():
+    ranks = coin_scoring.percentile_rank(np.array([3.0, 1.0, 2.0, 2.0, np.nan]))
+    assert np.allclose(ranks[:4], [0.875, 0.125, 0.5, 0.5]) and math.isnan(ranks[4])
+
+    analyzer = CoinAnalyzer(client=None)
+    metrics = [uniform_metrics(1.0, 5_000_000, 0.9, 90, 50),   # ดีทุกด้าน
+               uniform_metrics(5.0, 500_000, 0.5, 50, 0),
+               uniform_metrics(12.0, 10_000, 0.1, 5, -50)]     # แย่ทุกด้าน
+    analyses = analyzer.build_analyses(['GOOD', 'MID', 'BAD'], [1.0] * 3, metrics)
+    analyzer.rank_analyses(analyses)
+    overall = {symbol: analysis['ranks']['overall'] for symbol, analysis in analyses.items()}
+    assert overall['GOOD'] > overall['MID'] > overall['BAD'], overall
+    assert analyzer.get_summary_report(analyses).split("🏆")[1].split("\n")[1].strip().startswith('GOOD')
+    print("✅ cross-sectional percentile ranks OK")
+
+
+def test_scales_to_futures_universe():
+    matrices = coin_scoring.metric_matrices(random_metrics(np.random.default_rng(5), 500))
+    big = {name: np.tile(matrix, (20, 1)) for name, matrix in matrices.items()}  # 10,000 symbols
+    started = time.perf_counter()
+    scores = coin_scoring.score_coins(big)
+    ranks = coin_scoring.cross_sectional_ranks(scores)
+    elapsed = time.perf_counter() - started
+    assert len(scores['order_size']) == 10_000 and len(ranks['overall']) == 10_000
+    assert elapsed < 0.5, f"scoring 10,000 symbols took {elapsed:.3f}s"
+    print(f"✅ scored 10,000 symbols in {elapsed * 1000:.1f} ms OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_category_rules()
+        test_batch_matches_single_symbol()
+        test_percentile_ranks()
+        test_scales_to_futures_universe()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
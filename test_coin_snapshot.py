@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ snapshot ของ CoinAnalyzer: บันทึก / โหลดแล้วผลเหมือนไม่เคยหยุด, snapshot เก่าถูกข้าม,
+TradingBot warm start ไม่วิเคราะห์ใหม่ทั้งชุดก่อนเริ่ม
+"""
+
+import asyncio
+import sys
+import tempfile
+
+import numpy as np
+
+from checkpoint import CheckpointStore
+from coin_analysis import CoinAnalyzer
+from fake_binance import FakeBinanceClient, make_bot
+from kline_store import aggregate_columns
+from synthetic_data import SyntheticMarket
+from timeframe_aggregator import TimeframeAggregator
+
+TIMEFRAMES = ['1m', '5m', '15m', '1h']
+SPLIT = 1500
+
+
+def warm_analyzer(bars, end):
+    """CoinAnalyzer ที่ backfill แล้วและป้อนแท่ง 1m ถึง end"""
+    analyzer = CoinAnalyzer(client=None)
+    analyzer.timeframes = TIMEFRAMES
+    analyzer.aggregator = TimeframeAggregator(TIMEFRAMES)
+    split_ms = int(bars['open_time'][SPLIT])
+    for tf in TIMEFRAMES[1:]:
+        aggregated = aggregate_columns(bars, tf)
+        keep = aggregated['close_time'] < split_ms
+        analyzer.aggregator.backfill('SYN', tf, {c: v[keep] for c, v in aggregated.items()})
+    analyzer.aggregator.backfill('SYN', '1m', {c: v[SPLIT - 200:SPLIT] for c, v in bars.items()})
+    analyzer.aggregator.align('SYN')
+    feed(analyzer, bars, SPLIT, end)
+    return analyzer
+
+
+def feed(analyzer, bars, start, end):
+    for position in range(start, end, 5):
+        analyzer.on_bars_closed('SYN', {c: v[position:min(position + 5, end)] for c, v in bars.items()})
+
+
+def test_snapshot_round_trip_continues_seamlessly():
+    bars = SyntheticMarket().generate(3000, '1m', '2024-01-01', seed=11)
+    live = warm_analyzer(bars, 2200)
+    with tempfile.TemporaryDirectory() as directory:
+        store = CheckpointStore(directory)
+        store.save('coin_analyzer', live.snapshot_state())
+        restarted = CoinAnalyzer(client=None)
+        restarted.timeframes = TIMEFRAMES
+        restarted.aggregator = TimeframeAggregator(TIMEFRAMES)
+        assert restarted.restore_state(store.load('coin_analyzer'), max_age=3600) == ['SYN']
+
+    before = restarted.coin_analysis_cache.get('SYN')
+    assert before['categories'] == live.coin_analysis_cache.get('SYN')['categories']
+    assert not restarted.coin_analysis_cache.needs_refresh('SYN')  # อายุจริงยังไม่ถึงจุด refresh
+
+    # หลัง restart แท่งใหม่ต่อจาก state เดิมได้เลย ผลเท่ากับ process ที่ไม่เคยหยุด
+    feed(live, bars, 2200, 3000)
+    feed(restarted, bars, 2200, 3000)
+    for tf in TIMEFRAMES:
+        assert np.array_equal(live.aggregator.columns('SYN', tf)['close'],
+                              restarted.aggregator.columns('SYN', tf)['close'])
+    expected = live.coin_analysis_cache.get('SYN')
+    actual = restarted.coin_analysis_cache.get('SYN')
+    assert actual['weighted_metrics'] == expected['weighted_metrics']
+    assert actual['categories'] == expected['categories']
+    print("✅ restored analyzer continues exactly where it stopped OK")
+
+
+def test_stale_snapshot_is_ignored():
+    bars = SyntheticMarket().generate(2000, '1m', '2024-01-01', seed=12)
+    state = warm_analyzer(bars, 1800).snapshot_state()
+    state['saved_at'] -= 7 * 3600
+    analyzer = CoinAnalyzer(client=None)
+    assert analyzer.restore_state(state, max_age=6 * 3600) == []
+    assert len(analyzer.coin_analysis_cache) == 0 and not analyzer.aggregator.has('SYN', '1m')
+    print("✅ snapshot older than max age is ignored OK")
+
+
+def test_warm_start_revalidates_in_background():
+    bars = SyntheticMarket().generate(2000, '1m', '2024-01-01', seed=13)
+    state = warm_analyzer(bars, 1800).snapshot_state()
+    with tempfile.TemporaryDirectory() as directory:
+        bot = make_bot(FakeBinanceClient(['SYN', 'NEWUSDT'], latency=0), api_call_delay=0,
+                       snapshot_store=CheckpointStore(directory))
+        bot.snapshot_store.save('coin_analyzer', state)
+        bot.coin_analyzer.timeframes = TIMEFRAMES
+        bot.coin_analyzer.aggregator = TimeframeAggregator(TIMEFRAMES)
+        refreshed = []
+
+        async def refresh_analysis(symbol):
+            refreshed.append(symbol)
+            return {}
+
+        async def analyze_coins():
+            raise AssertionError("warm start must not analyze every coin before trading")
+
+        bot.coin_analyzer.refresh_analysis = refresh_analysis
+        bot.analyze_coins = analyze_coins
+
+        async def start():
+            await bot.setup_bot()
+            recommendation = bot.get_coin_recommendations('SYN')
+            await asyncio.gather(*bot.coin_analyzer.refresh_tasks.values())
+            return recommendation
+
+        recommendation = asyncio.run(start())
+    assert recommendation['categories'] == state['analyses'][0][1]['categories']
+    assert set(refreshed) == {'NEWUSDT', 'SYN'}  # ทุก symbol ถูก revalidate ใน background
+    assert bot.setup_complete and 'Trading Bot Started' in bot.notification.messages[-1]
+    print("✅ warm start serves the snapshot and revalidates in background OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_snapshot_round_trip_continues_seamlessly()
+        test_stale_snapshot_is_ignored()
+        test_warm_start_revalidates_in_background()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ TradingBot.evaluate_symbols: รันพร้อมกันแบบจำกัดจำนวน, timeout ต่อ symbol, เปิด position ไม่ซ้ำ
+"""
+
+import asyncio
+import sys
+import time
+
+from fake_binance import make_bot
+
+
+def scan_bot(delays, max_concurrent=8, timeout=1.0):
+    """TradingBot ที่ไม่ต่อ network: check_market_conditions แค่รอตาม delays"""
+    bot = make_bot(max_concurrent_symbols=max_concurrent, symbol_timeout=timeout)
+    bot.running = 0
+    bot.peak_running = 0
+    bot.finished = []
+
+    async def check_market_conditions(symbol):
+        bot.running += 1
+        bot.peak_running = max(bot.peak_running, bot.running)
+        try:
+            await asyncio.sleep(delays[symbol])
+            bot.finished.append(symbol)
+        finally:
+            bot.running -= 1
+
+    bot.check_market_conditions = check_market_conditions
+    return bot
+
+
+def test_cycle_time_follows_slowest_symbol():
+    delays = {f"S{i}USDT": 0.05 for i in range(20)}
+    delays['SLOWUSDT'] = 0.2
+    bot = scan_bot(delays, max_concurrent=32)
+    started = time.perf_counter()
+    asyncio.run(bot.evaluate_symbols(list(delays)))
+    elapsed = time.perf_counter() - started
+    assert len(bot.finished) == len(delays)
+    assert elapsed < 0.4, f"cycle took {elapsed:.2f}s (sequential would be {sum(delays.values()):.2f}s)"
+    print("✅ cycle time follows slowest symbol OK")
+
+
+def test_bounded_fan_out_and_timeout():
+    delays = {f"S{i}USDT": 0.02 for i in range(12)}
+    delays['STUCKUSDT'] = 10
+    bot = scan_bot(delays, max_concurrent=3, timeout=0.1)
+    started = time.perf_counter()
+    asyncio.run(bot.evaluate_symbols(list(delays)))
+    assert bot.peak_running <= 3, f"{bot.peak_running} symbols ran at once"
+    assert 'STUCKUSDT' not in bot.finished and len(bot.finished) == 12
+    assert time.perf_counter() - started < 1.0
+    print("✅ semaphore / timeout OK")
+
+
+def test_open_position_once():
+    bot = scan_bot({})
+    orders = []
+
+    async def place_order(symbol, side, quantity, signal_time=None):
+        await asyncio.sleep(0.01)  # order in flight
+        orders.append(symbol)
+        bot.active_trades[symbol] = {'position_side': 'LONG'}
+
+    bot.place_order = place_order
+
+    async def race():
+        await asyncio.gather(*(bot.open_position('BTCUSDT', 'BUY') for _ in range(5)))
+
+    asyncio.run(race())
+    assert orders == ['BTCUSDT'], f"orders placed: {orders}"
+    print("✅ active_trades check-then-open is atomic OK")
+
+
+def test_orders_for_different_symbols_overlap():
+    bot = scan_bot({})
+    closed = []
+
+    async def place_order(symbol, side, quantity, signal_time=None):
+        await asyncio.sleep(0.1)  # order in flight - trades_lock ต้องไม่ถูกถือไว้
+        bot.active_trades[symbol] = {'position_side': 'LONG'}
+
+    async def _close_position(symbol):
+        await asyncio.sleep(0.1)
+        closed.append(symbol)
+        del bot.active_trades[symbol]
+
+    bot.place_order = place_order
+    bot._close_position = _close_position
+    symbols = [f"S{i}USDT" for i in range(10)]
+
+    async def burst():
+        started = time.perf_counter()
+        await asyncio.gather(*(bot.open_position(s, 'BUY') for s in symbols))
+        opened = time.perf_counter() - started
+        await asyncio.gather(*(bot.close_position(s) for s in symbols + symbols))  # ปิดซ้ำ -> ข้าม
+        return opened, time.perf_counter() - started - opened
+
+    opened, closing = asyncio.run(burst())
+    assert opened < 0.3 and closing < 0.3, f"open {opened:.2f}s / close {closing:.2f}s (serialized would be 1s each)"
+    assert sorted(closed) == sorted(symbols) and not bot.active_trades and not bot.pending_orders
+    print("✅ orders for different symbols are not serialized OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_cycle_time_follows_slowest_symbol()
+        test_bounded_fan_out_and_timeout()
+        test_open_position_once()
+        test_orders_for_different_symbols_overlap()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
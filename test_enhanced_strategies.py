@@ -6,7 +6,7 @@ Test script for enhanced trading strategies
 import asyncio
 import json
 import logging
-from binance.client import Client
+from binance_fixtures import create_client
 import pandas as pd
 import pandas_ta as ta
 
@@ -16,7 +16,7 @@ logger = logging.getLogger(__name__)
 
 class StrategyTester:
     def __init__(self):
-        self.client = Client("", "")  # No API keys needed for public data
+        self.client = create_client("", "")  # No API keys needed for public data
         
     def calculate_indicators(self, df):
         """Calculate technical indicators"""
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ ExitEngine (TP / trailing stop / stop-loss / max-hold) แบบ offline
+"""
+
+import sys
+
+import numpy as np
+
+from exit_engine import ExitEngine
+
+
+def bars(highs, lows, closes):
+    return np.array(highs, float), np.array(lows, float), np.array(closes, float)
+
+
+def test_take_profit_long():
+    high, low, close = bars([100, 100.5, 101.2, 102], [100, 99.9, 100.8, 101], [100, 100.2, 101, 101.5])
+    engine = ExitEngine(high, low, close, take_profit_pct=1.0, trailing_stop_pct=0.5, max_hold=10)
+    index, price, reason = engine.find_exit(0, "BUY", 100.0)
+    assert (index, reason) == (2, 'take_profit'), (index, reason)
+    assert abs(price - 101.0) < 1e-9
+    print("✅ take profit OK")
+
+
+def test_trailing_stop_uses_previous_peak():
+    # peak 102 on bar 2, trailing 1% -> stop 100.98 hit on bar 3
+    high, low, close = bars([100, 101, 102, 101.5], [100, 100.5, 101.5, 100.9], [100, 100.8, 101.8, 101])
+    engine = ExitEngine(high, low, close, take_profit_pct=5.0, trailing_stop_pct=1.0, max_hold=10)
+    index, price, reason = engine.find_exit(0, "BUY", 100.0)
+    assert (index, reason) == (3, 'trailing_stop'), (index, reason)
+    assert abs(price - 100.98) < 1e-9
+    print("✅ trailing stop OK")
+
+
+def test_short_and_gap_fill():
+    open_ = np.array([100, 100, 97.5])
+    high, low, close = bars([100, 100.2, 97.8], [100, 99.5, 97.0], [100, 99.8, 97.2])
+    engine = ExitEngine(high, low, close, open_, take_profit_pct=2.0, trailing_stop_pct=3.0, max_hold=10)
+    index, price, reason = engine.find_exit(0, "SELL", 100.0)
+    assert (index, reason) == (2, 'take_profit'), (index, reason)
+    assert price == 97.5  # gapped through the 98.0 target
+    print("✅ short + gap fill OK")
+
+
+def test_max_hold_and_chunks():
+    n = 1000
+    close = np.full(n, 100.0)
+    engine = ExitEngine(close + 0.1, close - 0.1, close, take_profit_pct=1.0, trailing_stop_pct=1.0, max_hold=10)
+    assert engine.find_exit(5, "BUY", 100.0) == (15, 100.0, 'max_hold')
+
+    unbounded = ExitEngine(close + 0.1, close - 0.1, close, take_profit_pct=1.0,
+                           trailing_stop_pct=1.0, max_hold=None, chunk_size=64)
+    high = close + 0.1
+    high[700] = 102.0
+    unbounded.high = high
+    index, _, reason = unbounded.find_exit(5, "BUY", 100.0)
+    assert (index, reason) == (700, 'take_profit'), (index, reason)
+    assert unbounded.find_exit(990, "SELL", 100.0)[2] == 'end_of_data'
+    print("✅ max hold + chunked scan OK")
+
+
+def test_find_exits_batch():
+    n = 50
+    close = np.linspace(100, 110, n)
+    engine = ExitEngine(close + 0.05, close - 0.05, close, take_profit_pct=1.0, trailing_stop_pct=0.5, max_hold=20)
+    result = engine.find_exits([0, 10, 20], ["BUY", "BUY", "SELL"], close[[0, 10, 20]])
+    assert list(result['reason'][:2]) == ['take_profit', 'take_profit']
+    assert result['reason'][2] == 'trailing_stop'
+    assert (result['exit_index'] > np.array([0, 10, 20])).all()
+    print("✅ batch exits OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_take_profit_long()
+        test_trailing_stop_uses_previous_peak()
+        test_short_and_gap_fill()
+        test_max_hold_and_chunks()
+        test_find_exits_batch()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
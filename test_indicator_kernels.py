@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ indicator_kernels เทียบกับสูตร pandas_ta (เขียนด้วย pandas rolling / ewm)
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as kernels
+
+N = 3000
+rng = np.random.default_rng(0)
+CLOSE = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, N)))
+HIGH = CLOSE * (1 + np.abs(rng.normal(0, 0.003, N)))
+LOW = CLOSE * (1 - np.abs(rng.normal(0, 0.003, N)))
+
+
+def assert_close(actual, expected, name):
+    actual, expected = np.asarray(actual), np.asarray(expected, dtype=float)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected)), f"{name}: NaN warm-up differs"
+    valid = ~np.isnan(expected)
+    assert np.allclose(actual[valid], expected[valid], rtol=1e-9, atol=1e-9), f"{name}: values differ"
+
+
+def pandas_ta_ema(series, length):
+    """ema ของ pandas_ta: seed ด้วย SMA แล้ว ewm(adjust=False)"""
+    values = series.loc[series.first_valid_index():].copy()
+    values.iloc[:length - 1] = np.nan
+    values.iloc[length - 1] = series.loc[series.first_valid_index():].iloc[:length].mean()
+    return values.ewm(span=length, adjust=False).mean().reindex(series.index)
+
+
+def test_linear_recursion_matches_loop():
+    x = rng.normal(0, 1, 5000)
+    expected = np.empty_like(x)
+    previous = 3.0
+    for i, value in enumerate(x):
+        previous = 0.9 * previous + value
+        expected[i] = previous
+    assert np.allclose(kernels.linear_recursion(x, 0.9, 3.0), expected, rtol=1e-10)
+    print("✅ linear recursion OK")
+
+
+def test_trend_indicators():
+    close = pd.Series(CLOSE)
+    assert_close(kernels.sma(CLOSE, 25), close.rolling(25).mean(), 'sma')
+    assert_close(kernels.ema(CLOSE, 14), pandas_ta_ema(close, 14), 'ema')
+
+    line = pandas_ta_ema(close, 14) - pandas_ta_ema(close, 30)
+    result = kernels.macd(CLOSE, 14, 30, 12)
+    assert_close(result['macd'], line, 'macd')
+    assert_close(result['signal'], pandas_ta_ema(line, 12), 'macd signal')
+
+    bands = kernels.bbands(CLOSE, 20, 2)
+    assert_close(bands['upper'], close.rolling(20).mean() + 2 * close.rolling(20).std(ddof=0), 'bbands')
+    print("✅ sma / ema / macd / bbands OK")
+
+
+def test_oscillators():
+    close, high, low = pd.Series(CLOSE), pd.Series(HIGH), pd.Series(LOW)
+    change = close.diff()
+    positive, negative = change.clip(lower=0), change.clip(upper=0).abs()
+    positive_avg = positive.ewm(alpha=1 / 28, min_periods=28).mean()
+    negative_avg = negative.ewm(alpha=1 / 28, min_periods=28).mean()
+    assert_close(kernels.rsi(CLOSE, 28), 100 * positive_avg / (positive_avg + negative_avg), 'rsi')
+
+    lowest, highest = low.rolling(14).min(), high.rolling(14).max()
+    stoch_k = (100 * (close - lowest) / (highest - lowest)).rolling(3).mean()
+    result = kernels.stoch(HIGH, LOW, CLOSE, 14, 3)
+    assert_close(result['k'], stoch_k, 'stoch k')
+    assert_close(result['d'], stoch_k.rolling(3).mean(), 'stoch d')
+    assert_close(kernels.willr(HIGH, LOW, CLOSE, 14), 100 * (close - highest) / (highest - lowest), 'willr')
+    print("✅ rsi / stoch / willr OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_linear_recursion_matches_loop()
+        test_trend_indicators()
+        test_oscillators()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
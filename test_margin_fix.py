@@ -47,7 +47,7 @@ async def test_aggressive_leverage():
                 print(f"Available balance: {available_balance:.2f} USDT")
                 
                 # Get coin recommendations
-                coin_recommendations = await bot.get_coin_recommendations(symbol)
+                coin_recommendations = bot.get_coin_recommendations(symbol)
                 position_size_multiplier = coin_recommendations.get('recommendations', {}).get('position_size_multiplier', 0.6)
                 leverage_recommendation = coin_recommendations.get('recommendations', {}).get('leverage', {}).get('recommended', config.LEVERAGE)
                 
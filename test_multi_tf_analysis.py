@@ -8,7 +8,7 @@ import json
 import time
 from trading_bot import TradingBot
 from coin_analysis import CoinAnalyzer
-from binance.client import Client
+from binance_fixtures import create_client
 import config
 
 async def test_multi_timeframe_analysis():
@@ -110,7 +110,7 @@ async def test_timeframe_comparison():
     print("\n🔬 ทดสอบการเปรียบเทียบ Timeframe...")
     
     try:
-        client = Client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+        client = create_client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
         analyzer = CoinAnalyzer(client)
         
         test_symbol = "ETHUSDT"
@@ -162,7 +162,7 @@ async def test_parallel_performance():
     print("\n⚡ ทดสอบประสิทธิภาพการทำงานแบบขนาน...")
     
     try:
-        client = Client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+        client = create_client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
         analyzer = CoinAnalyzer(client)
         
         test_symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT"]
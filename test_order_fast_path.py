@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ fast path ของการส่ง order: ขนาด / leverage / margin จาก state ใน cache,
+request เดียวก่อนเข้า position คือ order เอง และวัด signal-to-order latency
+"""
+
+import asyncio
+import sys
+import time
+from collections import Counter
+
+import config
+from fake_binance import LATENCY, FakeBinanceClient, make_bot
+
+
+def order_bot(client, available_balance=1000.0):
+    """TradingBot ที่มี account model และ exchangeInfo อยู่ใน cache แล้ว"""
+    bot = make_bot(client, account_balance=available_balance, available_balance=available_balance,
+                   account_time=time.time())
+    asyncio.run(bot.get_exchange_info())
+    client.calls.clear()
+    return bot
+
+
+def test_order_is_the_only_request():
+    client = FakeBinanceClient()
+    bot = order_bot(client)
+    bot.symbol_leverage['BTCUSDT'] = 5
+    bot.last_prices['BTCUSDT'] = (100.0, time.time())  # ราคาตอนตัดสินสัญญาณ
+
+    order = asyncio.run(bot.open_position('BTCUSDT', 'BUY', signal_time=time.perf_counter()))
+    assert order is not None and 'BTCUSDT' in bot.active_trades
+    assert client.calls == Counter({'futures_create_order': 1}), dict(client.calls)
+
+    quantity = bot.active_trades['BTCUSDT']['quantity']
+    notional = quantity * 100.0
+    assert config.MIN_NOTIONAL <= notional <= 1000.0 * config.MAX_POSITION_SIZE
+    assert abs(bot.available_balance - (1000.0 - notional / 5)) < 1e-6  # margin ถูกกันไว้ใน account model
+    assert bot.account_time == 0  # refresh จาก exchange รอบถัดไป
+
+    stats = bot.order_latency_stats()
+    # path เดิม: ~8 requests x (latency + 0.5 s) ก่อน order
+    assert stats['count'] == 1 and stats['p50_ms'] < LATENCY * 1000 + 150, stats
+    assert 'Signal → Order' in bot.notification.messages[-1]
+    print(f"✅ order sent with 1 request, signal-to-order {stats['p50_ms']:.0f} ms OK")
+
+
+def test_failed_order_releases_reservation():
+    client = FakeBinanceClient()
+    bot = order_bot(client)
+    bot.symbol_leverage['BTCUSDT'] = 5
+    bot.last_prices['BTCUSDT'] = (100.0, time.time())
+
+    def rejected(**kwargs):
+        raise ValueError("order rejected")
+
+    client.futures_create_order = rejected
+    assert asyncio.run(bot.open_position('BTCUSDT', 'BUY')) is None
+    assert bot.available_balance == 1000.0 and not bot.pending_orders and not bot.active_trades
+    print("✅ failed order rolls back the margin reservation OK")
+
+
+def test_cold_cache_falls_back_to_requests():
+    client = FakeBinanceClient(price=50.0, leverage='5.0')  # Binance อาจส่ง leverage แบบทศนิยม
+    bot = order_bot(client)
+    bot.last_prices['ETHUSDT'] = (49.0, time.time() - config.ORDER_PRICE_MAX_AGE - 1)  # เก่าเกินไป
+
+    order = asyncio.run(bot.place_order('ETHUSDT', 'SELL', 0))
+    assert order is not None
+    assert client.calls == Counter({'futures_symbol_ticker': 1, 'futures_position_information': 1,
+                                    'futures_create_order': 1}), dict(client.calls)
+    assert bot.symbol_leverage['ETHUSDT'] == 5 and bot.order_latency_stats() == {'count': 0}
+    print("✅ missing price / leverage fall back to one request each OK")
+
+
+def test_align_leverage_off_the_order_path():
+    client = FakeBinanceClient()
+    bot = order_bot(client)
+    bot.symbol_leverage = {'BTCUSDT': 5, 'ETHUSDT': 3, 'SOLUSDT': 3}
+    bot.active_trades = {'SOLUSDT': {}}
+    for symbol, recommended in (('BTCUSDT', 5), ('ETHUSDT', 10), ('SOLUSDT', 20)):
+        bot.coin_analyses[symbol] = {'recommendations': {'leverage': {'recommended': recommended}}}
+
+    asyncio.run(bot.align_leverage())
+    # BTC ตรงอยู่แล้ว, SOL มี position -> ไม่แตะ, ETH ตั้งใหม่ (ไม่เกิน MAX_LEVERAGE)
+    assert client.calls == Counter({'futures_change_leverage': 1}), dict(client.calls)
+    assert bot.symbol_leverage == {'BTCUSDT': 5, 'ETHUSDT': min(10, config.MAX_LEVERAGE), 'SOLUSDT': 3}
+    print("✅ leverage aligned to recommendations outside the order path OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_order_is_the_only_request()
+        test_failed_order_releases_reservation()
+        test_cold_cache_falls_back_to_requests()
+        test_align_leverage_off_the_order_path()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
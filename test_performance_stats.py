@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ StreamingStats เทียบกับการคำนวณแบบ batch เดิม
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from performance_stats import RunningMoments, StreamingStats
+
+
+def test_running_moments_matches_numpy():
+    values = np.random.default_rng(7).normal(0.5, 2.0, 500)
+    moments = RunningMoments()
+    for value in values:
+        moments.update(value)
+    assert abs(moments.mean - values.mean()) < 1e-9
+    assert abs(moments.std - values.std()) < 1e-9
+    print("✅ running moments OK")
+
+
+def test_trade_metrics_and_drawdown():
+    stats = StreamingStats(1000)
+    start = datetime(2024, 1, 1)
+    balance = 1000.0
+    for i, pnl in enumerate([50, -20, 0, -80, 30]):
+        balance += pnl
+        stats.record_trade(pnl, 'breakout', start + timedelta(hours=i), balance)
+
+    snapshot = stats.snapshot()
+    assert snapshot['total_trades'] == 5
+    assert (snapshot['winning_trades'], snapshot['losing_trades']) == (2, 3)
+    assert abs(snapshot['avg_win'] - 40) < 1e-9
+    assert abs(snapshot['avg_loss'] + 50) < 1e-9  # zero P&L is not averaged as a loss
+    assert abs(snapshot['max_drawdown_pct'] - 100 / 1050 * 100) < 1e-9
+    assert stats.strategy_win_rate('breakout') == 40
+    print("✅ trade metrics OK")
+
+
+def test_daily_buckets_follow_timestamps():
+    stats = StreamingStats(1000)
+    start = datetime(2024, 1, 1)
+    # 1h bars for three days: one bucket per calendar day, not per N bars
+    for i in range(72):
+        stats.update_balance(start + timedelta(hours=i), 1000 + (i // 24) * 10)
+    curve = stats.finalize()
+    assert [point['date'].day for point in curve] == [1, 2, 3]
+    assert curve[-1]['balance'] == 1020
+    assert abs(curve[1]['return'] - 0.01) < 1e-9
+
+    restored = StreamingStats.from_state(stats.to_state())
+    assert restored.snapshot() == stats.snapshot()
+    print("✅ daily buckets + state OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_running_moments_matches_numpy()
+        test_trade_metrics_and_drawdown()
+        test_daily_buckets_follow_timestamps()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ KlineStore + ReplayClient แบบ offline (ไม่เรียก Binance API)
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+
+from kline_store import KlineStore
+from replay import ReplayClient, SimulatedClock, divergence_report
+
+START_MS = 1704067200000  # 2024-01-01 00:00 UTC
+
+
+def make_store(tmp, n=120):
+    store = KlineStore(tmp)
+    open_time = START_MS + np.arange(n) * 60_000
+    close = 100 + np.arange(n) * 0.1
+    store.save('BTCUSDT', '1m', {
+        'open_time': open_time, 'open': close - 0.05, 'high': close + 0.1, 'low': close - 0.1,
+        'close': close, 'volume': np.ones(n), 'close_time': open_time + 59_999,
+        'quote_volume': close, 'trades': np.ones(n), 'taker_buy_base': np.ones(n) / 2,
+        'taker_buy_quote': close / 2,
+    })
+    return store
+
+
+def test_store_aggregation():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        bars = store.load('BTCUSDT', '15m')
+        assert len(bars['open_time']) == 8
+        assert bars['volume'][0] == 15
+        assert abs(bars['close'][0] - 101.4) < 1e-9
+        window = store.load('BTCUSDT', '1m', START_MS + 60_000, START_MS + 5 * 60_000)
+        assert len(window['open_time']) == 5
+        print("✅ kline store OK")
+
+
+def test_client_has_no_lookahead():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        clock = SimulatedClock(START_MS + 10 * 60_000 - 1)  # close of bar 9
+        client = ReplayClient(store, ['BTCUSDT'], clock)
+        klines = client.futures_klines(symbol='BTCUSDT', interval='1m', limit=100)
+        assert len(klines) == 10
+        assert float(klines[-1][4]) == float(client.futures_symbol_ticker(symbol='BTCUSDT')['price'])
+        assert client.futures_klines(symbol='BTCUSDT', interval='15m', limit=100) == []
+        print("✅ no lookahead OK")
+
+
+def test_client_fills_and_account():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(tmp)
+        clock = SimulatedClock(START_MS + 60 * 60_000 - 1)
+        client = ReplayClient(store, ['BTCUSDT'], clock, initial_balance=1000, fee_rate=0)
+        order = client.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=1)
+        entry = float(order['avgPrice'])
+
+        clock.set(START_MS + 70 * 60_000 - 1)
+        account = client.futures_account()
+        assert abs(float(account['totalUnrealizedProfit']) - 1.0) < 1e-6
+
+        client.futures_create_order(symbol='BTCUSDT', side='SELL', type='MARKET', quantity=1)
+        assert client.positions['BTCUSDT']['amount'] == 0
+        assert abs(client.wallet_balance - 1001.0) < 1e-6
+        assert client.orders[0]['opening'] and not client.orders[1]['opening']
+
+        report = divergence_report(client.orders, [{'timestamp': client.orders[0]['bar_open_time'] * 1_000_000,
+                                                    'signal': 'BUY'}])
+        assert report['matched'] == 1, report
+        assert entry > 0
+        print("✅ fills + account OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_store_aggregation()
+        test_client_has_no_lookahead()
+        test_client_fills_and_account()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
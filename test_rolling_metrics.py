@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ RollingMetrics: ผลแบบ incremental เท่ากับ CoinAnalyzer.calculate_* บน DataFrame ชุดเดียวกัน
+และ CoinAnalyzer.on_bars_closed อัปเดตหมวดหมู่ใน cache โดยไม่ต้องดึงข้อมูลใหม่
+"""
+
+import math
+import sys
+
+import numpy as np
+import pandas as pd
+
+from coin_analysis import CoinAnalyzer
+from kline_store import aggregate_columns
+from rolling_metrics import RollingMetrics
+from synthetic_data import SyntheticMarket
+from timeframe_aggregator import TimeframeAggregator
+
+TIMEFRAMES = ['1m', '5m', '15m', '1h']
+
+
+def minute_bars(candles=3000):
+    return SyntheticMarket().generate(candles, '1m', '2024-01-01', seed=7)
+
+
+def frame(columns, end, window=100):
+    return pd.DataFrame({c: columns[c][max(0, end - window):end] for c in ('open', 'high', 'low', 'close', 'volume')})
+
+
+def assert_close(actual, expected, label):
+    if isinstance(expected, dict):
+        for key in expected:
+            assert_close(actual[key], expected[key], f"{label}.{key}")
+        return
+    both_nan = isinstance(expected, float) and math.isnan(expected) and math.isnan(actual)
+    assert both_nan or math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9), \
+        f"{label}: {actual} != {expected}"
+
+
+def test_incremental_matches_dataframe_formulas():
+    bars = minute_bars()
+    analyzer = CoinAnalyzer(client=None)
+    metrics = RollingMetrics(window=100)
+    rng = np.random.default_rng(1)
+    position = 0
+    checked = 0
+    while position < len(bars['open_time']):
+        size = int(rng.integers(1, 40))
+        metrics.update('SYN', '1m', {c: v[:position + size] for c, v in bars.items()})  # ซ้อนกับของเดิม
+        position += size
+        end = min(position, len(bars['open_time']))
+        df = frame(bars, end)
+        snapshot = metrics.snapshot('SYN', ['1m'])
+        assert_close(snapshot['volatility']['1m'], analyzer.calculate_volatility(df), f"volatility@{end}")
+        assert_close(snapshot['volume_profile']['1m'], analyzer.calculate_volume_profile(df), f"volume@{end}")
+        assert_close(snapshot['liquidity_score']['1m'], analyzer.calculate_liquidity_score(df), f"liquidity@{end}")
+        assert snapshot['trend_strength']['1m'] == analyzer.calculate_trend_strength(df), f"trend@{end}"
+        assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']  # ไม่เพิ่ม returns / sma
+        checked += 1
+    assert checked > 100
+    print(f"✅ rolling metrics match DataFrame formulas at {checked} checkpoints OK")
+
+
+def test_gap_restarts_window():
+    bars = minute_bars(400)
+    metrics = RollingMetrics(window=100)
+    metrics.update('SYN', '1m', {c: v[:150] for c, v in bars.items()})
+    metrics.update('SYN', '1m', {c: v[250:] for c, v in bars.items()})  # ขาด 100 แท่ง
+    expected = RollingMetrics(window=100)
+    expected.update('SYN', '1m', {c: v[250:] for c, v in bars.items()})
+    assert_close(metrics.snapshot('SYN', ['1m']), expected.snapshot('SYN', ['1m']), 'after gap')
+    print("✅ gap in bars restarts the rolling window OK")
+
+
+def test_bar_close_refreshes_cached_categories():
+    bars = minute_bars()
+    analyzer = CoinAnalyzer(client=None)
+    analyzer.timeframes = TIMEFRAMES
+    analyzer.aggregator = TimeframeAggregator(TIMEFRAMES)
+    split = 1500
+    split_ms = int(bars['open_time'][split])
+    for tf in TIMEFRAMES[1:]:
+        aggregated = aggregate_columns(bars, tf)
+        keep = aggregated['close_time'] < split_ms
+        analyzer.aggregator.backfill('SYN', tf, {c: v[keep] for c, v in aggregated.items()})
+    analyzer.aggregator.backfill('SYN', '1m', {c: v[split - 200:split] for c, v in bars.items()})
+    analyzer.aggregator.align('SYN')
+
+    for position in range(split, len(bars['open_time']), 7):
+        analyzer.on_bars_closed('SYN', {c: v[position:position + 7] for c, v in bars.items()})
+
+    cached = analyzer.coin_analysis_cache.get('SYN')
+    frames = {tf: analyzer.aggregator.frame('SYN', tf) for tf in TIMEFRAMES}
+    expected = analyzer.build_analysis('SYN', float(frames['1h']['close'].iloc[-1]), {
+        'volatility': analyzer.calculate_volatility_multi_tf(frames),
+        'volume_profile': analyzer.calculate_volume_profile_multi_tf(frames),
+        'liquidity_score': analyzer.calculate_liquidity_score_multi_tf(frames),
+        'trend_strength': analyzer.calculate_trend_strength_multi_tf(frames),
+    })
+    assert cached is not None
+    assert cached['current_price'] == expected['current_price']
+    assert cached['categories'] == expected['categories']
+    assert_close(cached['weighted_metrics'], expected['weighted_metrics'], 'weighted_metrics')
+    print("✅ closed bars keep cached categories current without refetching OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_incremental_matches_dataframe_formulas()
+        test_gap_restarts_window()
+        test_bar_close_refreshes_cached_categories()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
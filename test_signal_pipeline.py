@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ pipeline ของ TradingBot.evaluate_signals: gate ราคาถูกตัดสินเหมือน check_market_conditions_filter
+"""
+
+import sys
+from collections import Counter
+
+import config
+from signal_pool import columns_to_frame
+from fake_binance import make_bot
+from synthetic_data import SyntheticMarket
+
+GATE_STAGES = {'price_action', 'trend_strength', 'momentum'}
+
+
+def windows(count_per_seed=60, size=100):
+    for seed, volatility in enumerate((0.3, 0.8, 2.0)):
+        c = SyntheticMarket(annual_volatility=volatility).generate(count_per_seed * 5 + size, '1m', seed=seed)
+        columns = {k: c[k] for k in ('open_time', 'open', 'high', 'low', 'close', 'volume')}
+        for end in range(size, len(c['close']), 5):
+            yield columns_to_frame({k: v[end - size:end] for k, v in columns.items()})
+
+
+def test_gates_match_market_filter():
+    bot = make_bot()
+    stages = Counter()
+    previous_backend = config.INDICATOR_BACKEND
+    config.INDICATOR_BACKEND = 'numpy'
+    try:
+        for df in windows():
+            price = float(df['close'].iloc[-1])
+            result = bot.evaluate_signals(df.copy(), price)
+            stages[result['rejected_stage']] += 1
+
+            full = bot.calculate_adx(bot.calculate_indicators(df.copy()))
+            is_favorable, _ = bot.check_market_conditions_filter(full)
+            assert is_favorable == (result['rejected_stage'] not in GATE_STAGES), \
+                f"gate {result['rejected_stage']} disagrees with filter ({is_favorable})"
+            if result['rejected_stage'] in GATE_STAGES:
+                assert result['trade_direction'] is None and result['signals_dict'] == {}
+    finally:
+        config.INDICATOR_BACKEND = previous_backend
+    assert stages['price_action'] > 0
+    print(f"✅ pipeline gates match market filter OK ({dict(stages)})")
+
+
+if __name__ == "__main__":
+    try:
+        test_gates_match_market_filter()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ SignalPool: ผลเท่ากันทุก mode และ event loop ไม่ถูก block ระหว่างประเมิน
+"""
+
+import asyncio
+import sys
+
+from benchmark_macro import synthetic_columns
+from kline_store import columns_to_klines, klines_to_columns
+from signal_pool import SignalPool, evaluate_columns
+
+
+def sample_klines(size=100, seed=0):
+    """รูปแบบเดียวกับ futures_klines: ราคาเป็น string"""
+    return columns_to_klines(synthetic_columns(size, '1m', seed))
+
+
+def test_klines_to_columns():
+    klines = sample_klines(50)
+    columns = klines_to_columns(klines)
+    assert columns['close'].dtype.kind == 'f' and columns['open_time'].dtype.kind == 'i'
+    assert columns['close'][-1] == float(klines[-1][4])
+    print("✅ klines -> columns OK")
+
+
+def test_modes_agree():
+    columns = klines_to_columns(sample_klines(300, seed=3))
+    price = float(columns['close'][-1])
+    expected = evaluate_columns(columns, price)
+
+    async def run(mode):
+        pool = SignalPool(mode, max_workers=2)
+        try:
+            return await pool.evaluate(columns, price)
+        finally:
+            pool.close()
+
+    for mode in ('inline', 'thread', 'process'):
+        result = asyncio.run(run(mode))
+        assert result == expected, f"{mode} result differs"
+    print("✅ inline / thread / process agree OK")
+
+
+def test_process_workers_are_spawned():
+    assert SignalPool().mode == 'thread'
+    pool = SignalPool('process', max_workers=1)
+    try:
+        assert pool._get_executor()._mp_context.get_start_method() == 'spawn'
+    finally:
+        pool.close()
+    print("✅ default thread mode, process workers use spawn OK")
+
+
+def test_loop_stays_responsive():
+    columns = klines_to_columns(sample_klines(3000, seed=1))
+    price = float(columns['close'][-1])
+
+    async def run():
+        pool = SignalPool('process', max_workers=2)
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            await asyncio.gather(*(pool.evaluate(columns, price) for _ in range(4)))
+        finally:
+            beat.cancel()
+            pool.close()
+        return ticks
+
+    ticks = asyncio.run(run())
+    assert ticks > 0, "event loop was blocked during evaluation"
+    print(f"✅ event loop responsive during evaluation ({ticks} heartbeats)")
+
+
+if __name__ == "__main__":
+    try:
+        test_klines_to_columns()
+        test_modes_agree()
+        test_process_workers_are_spawned()
+        test_loop_stays_responsive()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
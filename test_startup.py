@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+ทดสอบการเริ่มต้น TradingBot: ดึง exchangeInfo / position / ราคาครั้งเดียว, ตั้ง leverage เฉพาะที่ไม่ตรง,
+ทำพร้อมกันทุก symbol และแจ้งเตือนรวมข้อความเดียว
+"""
+
+import asyncio
+import sys
+import time
+
+import config
+from fake_binance import FakeBinanceClient, make_bot
+
+SYMBOLS = [f"C{i:02d}USDT" for i in range(35)]
+
+
+def test_initialize_batches_and_skips_unchanged_leverage():
+    # ครึ่งหนึ่งตั้ง leverage ถูกอยู่แล้ว, หนึ่ง symbol ไม่เปิดเทรด
+    leverage = {s: config.LEVERAGE if i % 2 == 0 else config.LEVERAGE + 1 for i, s in enumerate(SYMBOLS)}
+    client = FakeBinanceClient(SYMBOLS, price=1.5, leverage=leverage, unavailable=['C34USDT'])
+    bot = make_bot(client)
+
+    started = time.perf_counter()
+    summary = asyncio.run(bot.initialize())
+    elapsed = time.perf_counter() - started
+
+    assert client.calls['futures_exchange_info'] == 1
+    assert client.calls['futures_position_information'] == 1
+    assert client.calls['futures_symbol_ticker'] == 1
+    assert client.calls['futures_change_leverage'] == 17  # ค่าคี่ C01..C33 (C34 ไม่เปิดเทรด)
+    assert all(v == config.LEVERAGE for s, v in client.leverage.items() if s != 'C34USDT')
+    assert summary.startswith("✅ Initialized 34/35") and 'C34USDT' in summary.split("⚠️")[1]
+    assert bot.notification.messages == []  # ผู้เรียกเป็นคนส่งข้อความรวม
+    # แบบเดิมทีละ symbol: 3 calls x (latency + 0.5 s) x 35 ~ 58 s
+    assert elapsed < 3, f"initialize took {elapsed:.2f}s"
+
+    # รอบถัดไป (เช่น universe screener) ใช้ exchangeInfo จาก cache และไม่ตั้ง leverage ซ้ำ
+    asyncio.run(bot.initialize(['C01USDT', 'C02USDT']))
+    assert client.calls['futures_exchange_info'] == 1 and client.calls['futures_change_leverage'] == 17
+    print(f"✅ initialized 35 symbols in {elapsed:.2f}s with {sum(client.calls.values())} requests OK")
+
+
+def test_setup_sends_one_startup_notification():
+    client = FakeBinanceClient(SYMBOLS, price=1.5, leverage=config.LEVERAGE)
+    bot = make_bot(client)
+    balances = []
+
+    async def update_account_balance(account=None):
+        balances.append(account)
+
+    async def prepare_coin_analyses():
+        await asyncio.sleep(0.5)
+
+    bot.update_account_balance = update_account_balance
+    bot.prepare_coin_analyses = prepare_coin_analyses
+
+    started = time.perf_counter()
+    asyncio.run(bot.setup_bot())
+    elapsed = time.perf_counter() - started
+
+    assert client.calls['futures_account'] == 1 and balances[0]['canTrade']  # ใช้ account จาก verify ซ้ำ
+    default = bot.coin_analyzer._get_default_analysis('C00USDT')['recommendations']['leverage']['recommended']
+    assert set(client.leverage.values()) == {min(default, config.MAX_LEVERAGE)}  # ตามคำแนะนำของ coin analysis
+    assert bot.setup_complete
+    assert len(bot.notification.messages) == 1
+    assert "Trading Bot Started" in bot.notification.messages[0] and "35/35" in bot.notification.messages[0]
+    assert elapsed < 3, f"setup took {elapsed:.2f}s"
+    print(f"✅ setup finished in {elapsed:.2f}s with one notification OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_initialize_batches_and_skips_unchanged_leverage()
+        test_setup_sends_one_startup_notification()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -6,7 +6,7 @@ Test script to verify which trading pairs from bot_config.json are available for
 import asyncio
 import json
 import logging
-from binance.client import Client
+from binance_fixtures import create_client
 from binance.exceptions import BinanceAPIException
 
 # Setup logging
@@ -24,7 +24,7 @@ async def test_symbol_availability():
     logger.info(f"Testing {len(trading_pairs)} trading pairs for futures availability")
     
     # Initialize client (no API keys needed for public endpoints)
-    client = Client("", "")
+    client = create_client("", "")
     
     try:
         # Get all available futures symbols
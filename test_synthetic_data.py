@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ SyntheticMarket (ทำซ้ำได้ด้วย seed, OHLC ถูกต้อง, crash/gap/regime)
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+
+from kline_store import KLINE_COLUMNS, KlineStore
+from synthetic_data import SyntheticMarket, write_universe
+
+
+def test_reproducible_and_consistent():
+    market = SyntheticMarket()
+    a = market.generate(5000, '1m', seed=3)
+    b = market.generate(5000, '1m', seed=3)
+    assert all(np.array_equal(a[c], b[c]) for c in KLINE_COLUMNS)
+    assert not np.array_equal(a['close'], market.generate(5000, '1m', seed=4)['close'])
+
+    assert (a['high'] >= np.maximum(a['open'], a['close'])).all()
+    assert (a['low'] <= np.minimum(a['open'], a['close'])).all()
+    assert (a['volume'] > 0).all() and (a['taker_buy_base'] <= a['volume']).all()
+    assert (np.diff(a['open_time']) == 60_000).all()
+    print("✅ reproducible OHLCV OK")
+
+
+def test_stress_events():
+    market = SyntheticMarket(crash_prob=0.001, crash_depth=(0.2, 0.3), gap_prob=0.01,
+                             regime_multipliers=(0.2, 5.0), regime_switch_prob=0.01)
+    columns = market.generate(20_000, '1m', seed=1)
+    bar_returns = columns['close'] / columns['open'] - 1
+    assert bar_returns.min() < -0.15  # at least one flash crash
+    gaps = columns['open'][1:] != columns['close'][:-1]
+    assert 50 < gaps.sum() < 400
+
+    # volume clusters: strong autocorrelation of log-volume
+    log_volume = np.log(columns['volume'])
+    assert np.corrcoef(log_volume[:-1], log_volume[1:])[0, 1] > 0.5
+    print("✅ crashes / gaps / volume clustering OK")
+
+
+def test_write_universe_feeds_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = KlineStore(tmp)
+        names = write_universe(store, symbols=3, candles=600, seed=9)
+        assert names == ['SYN000USDT', 'SYN001USDT', 'SYN002USDT']
+        assert store.symbols() == names
+        hourly = store.load('SYN001USDT', '1h')
+        assert len(hourly['open_time']) == 10
+        print("✅ universe written to kline store OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_reproducible_and_consistent()
+        test_stress_events()
+        test_write_universe_feeds_store()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ TimeframeAggregator: แท่งที่รวมแบบ incremental เท่ากับการรวมทั้งชุด และ CoinAnalyzer ใช้ REST น้อยลง
+"""
+
+import asyncio
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+import coin_analysis
+from coin_analysis import CoinAnalyzer
+from kline_store import KLINE_COLUMNS, KlineStore, aggregate_columns
+from replay import ReplayClient, SimulatedClock, _ClockTimeModule
+from synthetic_data import SyntheticMarket
+from timeframe_aggregator import TimeframeAggregator
+
+START = '2024-01-01'
+TIMEFRAMES = ['1m', '5m', '15m', '1h', '4h']
+
+
+def minute_bars(candles=3000):
+    return SyntheticMarket().generate(candles, '1m', START, seed=4)
+
+
+def closed_before(columns, interval, end_ms):
+    """แท่ง interval ที่ปิดก่อน end_ms จาก 1m ทั้งชุด"""
+    bars = aggregate_columns(columns, interval)
+    keep = bars['close_time'] < end_ms
+    return {c: v[keep] for c, v in bars.items()}
+
+
+def test_incremental_matches_full_aggregation():
+    bars = minute_bars()
+    split = 1337  # backfill ถึงกลางแท่ง 4h
+    split_ms = int(bars['open_time'][split])
+    aggregator = TimeframeAggregator(TIMEFRAMES, history=50)
+    for tf in TIMEFRAMES[1:]:
+        aggregator.backfill('SYN', tf, closed_before(bars, tf, split_ms))
+    aggregator.backfill('SYN', '1m', {c: v[split - 300:split] for c, v in bars.items()})
+    aggregator.align('SYN')
+
+    # ป้อน 1m เป็นก้อนขนาดต่างๆ ซ้อนกับของเดิมได้
+    position = split - 10
+    rng = np.random.default_rng(0)
+    while position < len(bars['open_time']):
+        size = int(rng.integers(1, 200))
+        aggregator.update('SYN', {c: v[position:position + size] for c, v in bars.items()})
+        position += size - int(rng.integers(0, 5))
+
+    end_ms = int(bars['close_time'][-1]) + 1
+    for tf in TIMEFRAMES:
+        expected = closed_before(bars, tf, end_ms)
+        actual = aggregator.columns('SYN', tf)
+        for c in KLINE_COLUMNS:
+            assert np.allclose(actual[c], expected[c][-50:]), f"{tf} {c} differs"
+    assert aggregator.frame('SYN', '1h')['close'].iloc[-1] == closed_before(bars, '1h', end_ms)['close'][-1]
+    print("✅ incremental aggregation matches full aggregation OK")
+
+
+def test_analyzer_fetches_only_1m_after_backfill():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = KlineStore(tmp)
+        bars = minute_bars(4000)
+        store.save('SYNUSDT', '1m', bars)
+        clock = SimulatedClock(int(bars['close_time'][2000]))
+        client = ReplayClient(store, ['SYNUSDT'], clock)
+        analyzer = CoinAnalyzer(client)
+        analyzer.aggregator = TimeframeAggregator(TIMEFRAMES)
+        analyzer.timeframes = TIMEFRAMES
+
+        async def fetch():
+            return await analyzer.get_market_data_parallel('SYNUSDT')
+
+        with mock.patch.object(coin_analysis, 'time', _ClockTimeModule(clock)):
+            asyncio.run(fetch())
+            assert client.call_counts['futures_klines'] == len(TIMEFRAMES)
+            clock.set(int(bars['close_time'][2090]))
+            data = asyncio.run(fetch())
+        assert client.call_counts['futures_klines'] == len(TIMEFRAMES) + 1
+        live = client.futures_klines(symbol='SYNUSDT', interval='15m', limit=100)
+        assert np.allclose(data['15m']['close'].to_numpy(), [float(k[4]) for k in live])
+        print("✅ CoinAnalyzer refreshes with a single 1m request OK")
+
+
+def test_analyzer_ignores_non_1m_bars():
+    bars = minute_bars(600)
+    analyzer = CoinAnalyzer(client=None)
+    analyzer.timeframes = TIMEFRAMES
+    analyzer.aggregator = TimeframeAggregator(TIMEFRAMES)
+    analyzer.aggregator.backfill('SYN', '1m', {c: v[:300] for c, v in bars.items()})
+    last = analyzer.aggregator.last_open_time('SYN')
+
+    # CANDLE_INTERVAL = '5m': แท่ง 5m ต้องไม่ถูกต่อเป็นแท่ง 1m
+    analyzer.on_bars_closed('SYN', aggregate_columns({c: v[300:] for c, v in bars.items()}, '5m'), '5m')
+    assert analyzer.aggregator.last_open_time('SYN') == last
+    assert len(analyzer.coin_analysis_cache) == 0
+
+    analyzer.on_bars_closed('SYN', {c: v[300:] for c, v in bars.items()}, '1m')
+    assert analyzer.aggregator.last_open_time('SYN') == int(bars['open_time'][-1])
+    print("✅ CoinAnalyzer only aggregates 1m bars OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_incremental_matches_full_aggregation()
+        test_analyzer_fetches_only_1m_after_backfill()
+        test_analyzer_ignores_non_1m_bars()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
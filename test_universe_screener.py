@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+ทดสอบ UniverseScreener: คัด USDT-M perpetual จาก bulk endpoints, จัดอันดับ, promote / demote แบบ hysteresis
+"""
+
+import asyncio
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from fake_binance import FakeBinanceClient, make_bot
+from universe_screener import UniverseScreener, eligible_symbols
+
+
+def market(count=400, seed=0):
+    """exchangeInfo, 24h tickers และ premium index ของ symbol สมมติ"""
+    rng = np.random.default_rng(seed)
+    symbols = [f"C{i:03d}USDT" for i in range(count)]
+    exchange_info = {'symbols': [
+        {'symbol': s, 'contractType': 'PERPETUAL', 'quoteAsset': 'USDT', 'status': 'TRADING'} for s in symbols]}
+    exchange_info['symbols'] += [
+        {'symbol': 'BTCUSDT_250926', 'contractType': 'CURRENT_QUARTER', 'quoteAsset': 'USDT', 'status': 'TRADING'},
+        {'symbol': 'ETHBUSD', 'contractType': 'PERPETUAL', 'quoteAsset': 'BUSD', 'status': 'TRADING'},
+        {'symbol': 'OLDUSDT', 'contractType': 'PERPETUAL', 'quoteAsset': 'USDT', 'status': 'SETTLING'},
+    ]
+    tickers = []
+    for i, s in enumerate(symbols):
+        last = float(rng.uniform(0.1, 100))
+        tickers.append({
+            'symbol': s,
+            'quoteVolume': str(10 ** (10 - i / 50)),  # C000 สภาพคล่องสูงสุด
+            'highPrice': str(last * 1.03), 'lowPrice': str(last * 0.97), 'lastPrice': str(last),
+            'priceChangePercent': str(rng.uniform(-5, 5)),
+        })
+    for s in ('BTCUSDT_250926', 'ETHBUSD', 'OLDUSDT'):
+        tickers.append({'symbol': s, 'quoteVolume': '1e12', 'highPrice': '2', 'lowPrice': '1',
+                        'lastPrice': '1.5', 'priceChangePercent': '10'})
+    premium_index = [{'symbol': s, 'lastFundingRate': '0.0001'} for s in symbols]
+    return exchange_info, tickers, premium_index
+
+
+def ranked_rows(order):
+    return [{'symbol': s, 'score': 1.0} for s in order]
+
+
+def test_rank_uses_eligible_liquid_symbols():
+    exchange_info, tickers, premium_index = market()
+    premium_index[1]['lastFundingRate'] = '0.005'  # funding สุดโต่ง -> ตัดออก
+    assert set(eligible_symbols(exchange_info)) == {t['symbol'] for t in tickers if t['symbol'].startswith('C')}
+
+    screener = UniverseScreener(max_symbols=10, min_quote_volume=1e6)
+    started = time.perf_counter()
+    ranked = screener.rank(exchange_info, tickers, premium_index)
+    elapsed = time.perf_counter() - started
+    symbols = [row['symbol'] for row in ranked]
+    assert not {'BTCUSDT_250926', 'ETHBUSD', 'OLDUSDT', 'C001USDT'} & set(symbols)
+    assert all(row['quote_volume'] >= 1e6 for row in ranked) and len(ranked) == 200
+    assert symbols.index('C000USDT') < symbols.index('C150USDT')  # volatility เท่ากัน -> สภาพคล่องนำ
+    assert elapsed < 0.1, f"ranking took {elapsed:.3f}s"
+    print(f"✅ ranked {len(ranked)} eligible symbols in {elapsed * 1000:.1f} ms OK")
+
+
+def test_hysteresis():
+    screener = UniverseScreener(max_symbols=3, exit_rank=5, demote_after=2)
+    active, promoted, demoted = screener.update(ranked_rows(['A', 'B', 'C', 'D', 'E', 'F', 'G']))
+    assert active == ['A', 'B', 'C'] and promoted == active and demoted == []
+
+    # C หล่นไปอันดับ 5 (ยังไม่เกิน exit_rank) -> คงไว้ แม้ D จะดีกว่าแล้ว
+    active, promoted, demoted = screener.update(ranked_rows(['A', 'B', 'D', 'E', 'C', 'F', 'G']))
+    assert active == ['A', 'B', 'C'] and promoted == [] and demoted == []
+
+    # C หลุดเกิน exit_rank ต้องครบ demote_after รอบติดกันจึงออก
+    order = ['A', 'B', 'D', 'E', 'F', 'G', 'C']
+    active, promoted, demoted = screener.update(ranked_rows(order))
+    assert active == ['A', 'B', 'C'] and demoted == []
+    active, promoted, demoted = screener.update(ranked_rows(order))
+    assert demoted == ['C'] and promoted == ['D'] and active == ['A', 'B', 'D']
+
+    # symbol ที่มี position ไม่ถูก demote, ข้อมูลว่างไม่เปลี่ยนชุด
+    for _ in range(3):
+        active, _, demoted = screener.update(ranked_rows(['E', 'F', 'G', 'X', 'Y', 'Z', 'A', 'B', 'D']), pinned=['A'])
+    assert 'A' in active and set(demoted) <= {'B', 'D'}
+    assert screener.update([])[0] == active
+    print("✅ promote / demote with hysteresis OK")
+
+
+def test_bot_screens_with_three_requests():
+    client = FakeBinanceClient(['ZZZUSDT', 'C000USDT'], market=market())
+    bot = make_bot(client, api_call_delay=0, active_trades={'ZZZUSDT': {}},
+                   screener=UniverseScreener(max_symbols=5, min_quote_volume=1e6))
+    bot.screener.active = list(bot.trading_pairs)
+    initialized = []
+
+    async def initialize(symbols=None):
+        initialized.extend(symbols)
+
+    bot.initialize = initialize
+
+    asyncio.run(bot.screen_universe())
+    assert client.calls == Counter({'futures_exchange_info': 1, 'futures_ticker': 1, 'futures_mark_price': 1})
+    assert 'ZZZUSDT' in bot.trading_pairs and len(bot.trading_pairs) == 5  # มี position -> ไม่ถูก demote
+    assert initialized == [s for s in bot.trading_pairs if s not in ('ZZZUSDT', 'C000USDT')]
+    assert len(bot.notification.messages) == 1 and '➕' in bot.notification.messages[0]
+
+    # รอบถัดไปใช้ exchangeInfo จาก cache (ร่วมกับ initialize)
+    asyncio.run(bot.screen_universe())
+    assert client.calls == Counter({'futures_exchange_info': 1, 'futures_ticker': 2, 'futures_mark_price': 2})
+    print("✅ TradingBot screens the universe with 3 bulk requests OK")
+
+
+if __name__ == "__main__":
+    try:
+        test_rank_uses_eligible_liquid_symbols()
+        test_hysteresis()
+        test_bot_screens_with_three_requests()
+    except AssertionError as e:
+        print(f"❌ Test failed: {e}")
+        sys.exit(1)
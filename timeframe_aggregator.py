@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Timeframe Aggregator - สร้างแท่ง 5m / 15m / 1h / 4h / 1d จากแท่ง 1m ในเครื่อง
+
+แทนการดึง klines 6 timeframe ต่อเหรียญจาก REST ทุกครั้งที่วิเคราะห์:
+- backfill ประวัติยาวของแต่ละ timeframe จาก REST ครั้งเดียว
+- หลังจากนั้นป้อนเฉพาะแท่ง 1m ที่ปิดแล้ว (update) แท่งใหญ่ถูกต่อท้ายแบบ incremental
+  เมื่อครบช่วงเวลา ทุก timeframe จึงตัดที่ขอบ 1m เดียวกันเสมอ
+
+แท่งที่ยังไม่ครบช่วง (forming) ไม่ถูกรวมใน columns() / frame()
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from kline_store import KLINE_COLUMNS, aggregate_columns, interval_to_ms
+
+BASE_INTERVAL = '1m'
+DEFAULT_TIMEFRAMES = ('1m', '5m', '15m', '1h', '4h', '1d')
+
+
+def _concat(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {c: np.concatenate((a[c], b[c])) for c in KLINE_COLUMNS}
+
+
+def _tail(columns: Dict[str, np.ndarray], count: int) -> Dict[str, np.ndarray]:
+    return {c: v[-count:] for c, v in columns.items()}
+
+
+def _after(columns: Dict[str, np.ndarray], open_time: int) -> Dict[str, np.ndarray]:
+    keep = columns['open_time'] > open_time
+    return {c: v[keep] for c, v in columns.items()}
+
+
+class TimeframeAggregator:
+    def __init__(self, timeframes: Iterable[str] = DEFAULT_TIMEFRAMES, history: int = 100):
+        """
+        Args:
+            timeframes: timeframe ที่ต้องการ (ต้องเป็นพหุคูณของ 1m)
+            history: จำนวนแท่งที่ปิดแล้วที่เก็บต่อ timeframe
+        """
+        self.timeframes = list(timeframes)
+        self.history = history
+        self._bars: Dict[str, Dict[str, Dict[str, np.ndarray]]] = {}  # symbol -> interval -> columns
+        # แท่ง 1m ที่ยังไม่ถูกรวมเป็นแท่งใหญ่ที่ปิดแล้ว (อย่างมาก 1 แท่งใหญ่ต่อ timeframe)
+        self._pending: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def has(self, symbol: str, interval: str) -> bool:
+        bars = self._bars.get(symbol, {}).get(interval)
+        return bars is not None and len(bars['open_time']) > 0
+
+    def is_backfilled(self, symbol: str) -> bool:
+        return all(self.has(symbol, tf) for tf in self.timeframes)
+
+    def last_open_time(self, symbol: str) -> Optional[int]:
+        """open_time ของแท่ง 1m ล่าสุดที่รับมา"""
+        pending = self._pending.get(symbol)
+        if pending is not None and len(pending['open_time']):
+            return int(pending['open_time'][-1])
+        if self.has(symbol, BASE_INTERVAL):
+            return int(self._bars[symbol][BASE_INTERVAL]['open_time'][-1])
+        return None
+
+    def backfill(self, symbol: str, interval: str, columns: Dict[str, np.ndarray]):
+        """
+        แท่งที่ปิดแล้วจาก REST ของ timeframe หนึ่ง (แทนของเดิม)
+
+        1m ควรครอบคลุมตั้งแต่ต้นแท่งที่ยังไม่ปิดของ timeframe ใหญ่สุด (เช่น 1d -> ถึง 1440 แท่ง)
+        """
+        columns = {c: np.asarray(columns[c]) for c in KLINE_COLUMNS}
+        self._bars.setdefault(symbol, {})[interval] = _tail(columns, self.history)
+        if interval == BASE_INTERVAL:
+            self._pending[symbol] = columns
+
+    def update(self, symbol: str, columns: Dict[str, np.ndarray]):
+        """
+        รับแท่ง 1m ที่ปิดแล้ว (ซ้อนกับของเดิมได้ แท่งที่เคยรับแล้วถูกข้าม)
+        แล้วต่อท้ายแท่งใหญ่ที่ครบช่วงเวลาในทุก timeframe
+        """
+        last = self.last_open_time(symbol)
+        columns = {c: np.asarray(columns[c]) for c in KLINE_COLUMNS}
+        if last is not None:
+            columns = _after(columns, last)
+        if len(columns['open_time']) == 0:
+            return
+        pending = self._pending.get(symbol)
+        self._pending[symbol] = columns if pending is None else _concat(pending, columns)
+        self.align(symbol)
+
+    def align(self, symbol: str):
+        """รวมแท่ง 1m ที่ค้างอยู่เป็นแท่งที่ปิดแล้วของทุก timeframe (เรียกหลัง backfill ครบ)"""
+        pending = self._pending.get(symbol)
+        if pending is None or len(pending['open_time']) == 0:
+            return
+        bars = self._bars.setdefault(symbol, {})
+        next_open = int(pending['close_time'][-1]) + 1  # เวลาเปิดของแท่ง 1m ถัดไป
+
+        oldest_needed = next_open
+        for tf in self.timeframes:
+            step = interval_to_ms(tf)
+            existing = bars.get(tf)
+            tf_close = int(existing['close_time'][-1]) if existing is not None and len(existing['open_time']) else -1
+            source = _after(pending, tf_close)
+            new = source if tf == BASE_INTERVAL else aggregate_columns(source, tf)
+            if len(new['open_time']):
+                if new['close_time'][-1] >= next_open:
+                    new = {c: v[:-1] for c, v in new.items()}  # แท่งสุดท้ายยังไม่ครบช่วง
+                if existing is None and len(new['open_time']) and new['open_time'][0] < source['open_time'][0]:
+                    new = {c: v[1:] for c, v in new.items()}  # แท่งแรกขาด 1m ช่วงต้น (ยังไม่ backfill)
+            if len(new['open_time']):
+                bars[tf] = _tail(new if existing is None else _concat(existing, new), self.history)
+            # แท่ง 1m ที่ต้องเก็บไว้: ตั้งแต่ต้นแท่งที่ยังไม่ปิดของ timeframe นี้
+            oldest_needed = min(oldest_needed, next_open // step * step)
+
+        keep = pending['open_time'] >= oldest_needed
+        self._pending[symbol] = {c: v[keep] for c, v in pending.items()}
+
+    def state(self) -> Dict:
+        """state ทั้งหมดสำหรับบันทึกลงดิสก์ (arrays ไม่ถูกแก้ในที่ จึงไม่ต้อง copy)"""
+        return {'timeframes': self.timeframes, 'history': self.history,
+                'bars': self._bars, 'pending': self._pending}
+
+    def restore(self, state: Dict) -> bool:
+        """โหลด state จาก state() (timeframes / history ไม่ตรง -> ไม่ใช้)"""
+        if state.get('timeframes') != self.timeframes or state.get('history') != self.history:
+            return False
+        self._bars = state['bars']
+        self._pending = state['pending']
+        return True
+
+    def columns(self, symbol: str, interval: str, limit: int = None) -> Optional[Dict[str, np.ndarray]]:
+        bars = self._bars.get(symbol, {}).get(interval)
+        if bars is None:
+            return None
+        return _tail(bars, limit) if limit else bars
+
+    def frame(self, symbol: str, interval: str, limit: int = None) -> pd.DataFrame:
+        """DataFrame รูปแบบเดียวกับ CoinAnalyzer.get_market_data (ว่างถ้าไม่มีข้อมูล)"""
+        columns = self.columns(symbol, interval, limit)
+        if columns is None:
+            return pd.DataFrame()
+        df = pd.DataFrame({
+            'timestamp': pd.to_datetime(columns['open_time'], unit='ms'),
+            'open': columns['open'],
+            'high': columns['high'],
+            'low': columns['low'],
+            'close': columns['close'],
+            'volume': columns['volume'],
+            'close_time': columns['close_time'],
+            'quote_volume': columns['quote_volume'],
+            'trades': columns['trades'],
+            'taker_buy_base': columns['taker_buy_base'],
+            'taker_buy_quote': columns['taker_buy_quote'],
+        })
+        return df
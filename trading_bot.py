@@ -12,23 +12,69 @@ from binance.exceptions import BinanceAPIException, BinanceOrderException
 import json
 import os
 from coin_analysis import CoinAnalyzer
+import indicator_kernels
+from performance_stats import StreamingStats
+from kline_store import klines_to_columns
+from rate_limiter import PRIORITY_METHODS, AsyncRateLimiter, request_weight
+from universe_screener import UniverseScreener
+from checkpoint import CheckpointStore
+import signal_pool
+from candle_scheduler import CandleScheduler, EVENT_CANDLE_CLOSE
+from activity_scheduler import ActivityScheduler
+from binance_fixtures import create_client
 from typing import Dict
+from collections import Counter, deque
 from binance.enums import SIDE_BUY, SIDE_SELL, FUTURE_ORDER_TYPE_MARKET
 import sys
 from datetime import datetime
 
+
+def parse_leverage(value) -> int:
+    """leverage จาก Binance (string เช่น '20' หรือ '20.0')"""
+    return int(float(value))
+
+
 class TradingBot:
-    def __init__(self):
-        self.client = Client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+    def __init__(self, client: Client = None):
+        # client can be injected (e.g. replay.ReplayClient) to run against recorded data
+        self.client = client or create_client(config.BINANCE_API_KEY, config.BINANCE_API_SECRET)
+        self.api_call_delay = 0.5  # pause after each API call (rate limiting)
+        self.offload_api_calls = True  # run blocking client calls in a worker thread
+        self.max_concurrent_symbols = 8  # symbols evaluated at the same time in run()
+        self.symbol_timeout = 30  # seconds per check_market_conditions before it is cancelled
+        self.trades_lock = asyncio.Lock()  # guards check + reservation on active_trades / margin (not the order request)
+        self.pending_orders = set()  # symbols with an open / close order in flight
+        self.signal_pool = signal_pool.SignalPool(config.SIGNAL_EXECUTOR, config.SIGNAL_WORKERS)
+        self.scheduler = CandleScheduler(config.CANDLE_INTERVAL, config.CANDLE_CLOSE_OFFSET_MS,
+                                         config.EXIT_CHECK_SECONDS)
+        self.activity = ActivityScheduler(config.ACTIVITY_MAX_INTERVAL, budget=config.SYMBOLS_PER_CANDLE)
+        self.trading_pairs = list(config.TRADING_PAIRS)  # ชุดที่เทรด (universe screener ปรับได้)
+        self.screener = UniverseScreener(config.UNIVERSE_MAX_SYMBOLS, config.UNIVERSE_EXIT_RANK,
+                                         config.UNIVERSE_DEMOTE_AFTER, config.UNIVERSE_MIN_QUOTE_VOLUME)
+        self.screener.active = list(self.trading_pairs)
+        self.last_screen_time = 0
+        self.exchange_info = None  # cache ของ futures_exchange_info (ดู get_exchange_info)
+        self.exchange_info_time = 0
+        self.symbols_info = {}  # symbol -> entry ของ exchangeInfo (LOT_SIZE ฯลฯ)
+        self.symbol_leverage = {}  # leverage ปัจจุบันบน exchange ต่อ symbol
+        self.available_balance = None  # account model: availableBalance จาก futures_account ล่าสุด
+        self.account_time = 0  # เวลาที่ account model ถูก refresh (0 = ต้อง refresh รอบถัดไป)
+        self.last_prices = {}  # symbol -> (ราคาที่ใช้ตัดสินสัญญาณล่าสุด, เวลา)
+        self.order_latency = deque(maxlen=500)  # signal -> order ack (วินาที)
+        self.setup_complete = False
+        self.loop = None  # event loop ที่ bot ทำงานอยู่ (thread อื่นส่ง coroutine เข้ามาด้วย run_coroutine_threadsafe)
         self.notification = NotificationSystem()
         self.active_trades = {}
         self.setup_logging()
         self.last_heartbeat = time.time()
         self.account_balance = None
         self.last_rsi = {}
-        self.coin_analyzer = CoinAnalyzer(self.client)
+        self.rate_limiter = AsyncRateLimiter(config.API_WEIGHT_PER_MINUTE)  # shared with CoinAnalyzer
+        self.coin_analyzer = CoinAnalyzer(self.client, self.rate_limiter)
         self.coin_analyses = {}
         self.last_analysis_time = 0
+        self.snapshot_store = CheckpointStore()
+        self.last_snapshot_time = time.time()
         self.analysis_interval = 3600  # 1 hour
         
         # Risk Management Variables
@@ -37,6 +83,8 @@ class TradingBot:
         self.last_trade_date = None
         self.circuit_breaker_triggered = False
         self.initial_balance = None
+        self.performance_stats = StreamingStats()
+        self.stage_rejections = Counter()  # evaluate_signals stage ที่ reject (price_action, trend_strength, ...)
         
         # Notification Rate Limiting
         self.last_notification_time = {}  # เก็บเวลาแจ้งเตือนล่าสุดสำหรับแต่ละเหรียญ
@@ -68,11 +116,23 @@ class TradingBot:
             level=config.LOG_LEVEL,
         )
 
-    async def safe_api_call(self, api_func, *args, max_retries=5, delay=0.5, **kwargs):
+    async def safe_api_call(self, api_func, *args, max_retries=5, delay=None, pause=None, **kwargs):
+        """เรียก client แบบ retry / rate limit (pause = หน่วงหลัง call สำเร็จ, default api_call_delay)"""
+        if delay is None:
+            delay = self.api_call_delay
+        if pause is None:
+            pause = delay
+        method = getattr(api_func, '__name__', '')
+        weight = request_weight(method, kwargs)
+        priority = method in PRIORITY_METHODS  # order ไม่รอหลัง coin analysis
         for attempt in range(max_retries):
             try:
-                result = api_func(*args, **kwargs)
-                await asyncio.sleep(delay)
+                await self.rate_limiter.acquire(weight, priority=priority)
+                if self.offload_api_calls:
+                    result = await asyncio.to_thread(api_func, *args, **kwargs)
+                else:
+                    result = api_func(*args, **kwargs)
+                await asyncio.sleep(pause)
                 return result
             except BinanceAPIException as e:
                 if e.code in [-1003, -1015]:  # Rate limit
@@ -109,59 +169,94 @@ class TradingBot:
         await self.notification.notify("Max retries reached for API call.")
         raise Exception("Max retries reached for API call.")
 
-    async def initialize(self):
-        for symbol in config.TRADING_PAIRS:
-            try:
-                # First check if the symbol exists and is available for futures trading
-                try:
-                    exchange_info = await self.safe_api_call(self.client.futures_exchange_info)
-                    symbol_info = None
-                    for s in exchange_info['symbols']:
-                        if s['symbol'] == symbol and s['status'] == 'TRADING':
-                            symbol_info = s
-                            break
-                    
-                    if not symbol_info:
-                        logger.warning(f"Symbol {symbol} is not available for futures trading or not in TRADING status")
-                        await self.notification.notify(f"⚠️ Symbol {symbol} not available for futures trading")
-                        continue
-                        
-                except Exception as e:
-                    logger.warning(f"Could not verify symbol {symbol} availability: {e}")
-                    # Continue with leverage setting attempt
-                
-                # Set leverage
-                await self.safe_api_call(self.client.futures_change_leverage, symbol=symbol, leverage=config.LEVERAGE)
-                logger.info(f"Set leverage for {symbol} to {config.LEVERAGE}x")
-                
-                # Get current price
-                try:
-                    ticker = await self.safe_api_call(self.client.futures_symbol_ticker, symbol=symbol)
-                    current_price = ticker['price']
-                    logger.info(f"Current price for {symbol}: {current_price}")
-                    
-                    # ส่งแจ้งเตือนการ initialize แค่เมื่อ bot เริ่มครั้งแรก
-                    if symbol not in self.last_notification_time:
-                        await self.notification.notify(
-                            f"✅ Initialized {symbol}\n"
-                            f"Leverage: {config.LEVERAGE}x\n"
-                            f"Current Price: {current_price}"
-                        )
-                except Exception as price_error:
-                    logger.error(f"Failed to get price for {symbol}: {str(price_error)}")
-                    await self.notification.notify(
-                        f"⚠️ Initialized {symbol} with leverage {config.LEVERAGE}x\n"
-                        f"⚠️ Could not get current price: {str(price_error)}"
-                    )
-                    
-            except Exception as e:
-                error_msg = str(e)
-                if "does not exist" in error_msg or "symbol" in error_msg.lower():
-                    logger.warning(f"Symbol {symbol} may not be available for futures trading: {error_msg}")
-                    await self.notification.notify(f"⚠️ Symbol {symbol} not available: {error_msg}")
-                else:
-                    logger.error(f"Failed to set leverage for {symbol}: {error_msg}")
-                    await self.notification.notify(f"❌ Failed to initialize {symbol}: {error_msg}")
+    async def get_exchange_info(self, max_age=None):
+        """exchangeInfo จาก cache (ดึงใหม่เมื่อเก่ากว่า EXCHANGE_INFO_TTL วินาที)"""
+        max_age = config.EXCHANGE_INFO_TTL if max_age is None else max_age
+        if self.exchange_info is None or time.time() - self.exchange_info_time >= max_age:
+            self.exchange_info = await self.safe_api_call(self.client.futures_exchange_info)
+            self.exchange_info_time = time.time()
+            self.symbols_info = {s['symbol']: s for s in self.exchange_info['symbols']}
+        return self.exchange_info
+
+    async def initialize(self, symbols=None):
+        """
+        เตรียม symbol สำหรับเทรด: exchangeInfo, position ทั้งหมด (leverage ปัจจุบัน) และราคาดึงครั้งเดียวทั้งชุด
+
+        ตั้ง leverage เฉพาะ symbol ที่ค่าปัจจุบันไม่ตรงกับ config.LEVERAGE โดยทำพร้อมกันทุก symbol
+
+        Returns:
+            ข้อความสรุปรวมสำหรับแจ้งเตือนครั้งเดียว (ผู้เรียกเป็นคนส่ง)
+        """
+        symbols = list(symbols if symbols is not None else self.trading_pairs)
+        if not symbols:
+            return ""
+        exchange_info, positions, tickers = await asyncio.gather(
+            self.get_exchange_info(),
+            self.safe_api_call(self.client.futures_position_information),
+            self.safe_api_call(self.client.futures_symbol_ticker),
+            return_exceptions=True)
+
+        unavailable = []
+        if isinstance(exchange_info, Exception):
+            logger.warning(f"Could not verify symbol availability: {exchange_info}")
+        else:
+            trading = {s['symbol'] for s in exchange_info['symbols'] if s['status'] == 'TRADING'}
+            unavailable = [symbol for symbol in symbols if symbol not in trading]
+            for symbol in unavailable:
+                logger.warning(f"Symbol {symbol} is not available for futures trading or not in TRADING status")
+        if isinstance(positions, Exception):
+            logger.warning(f"Could not read current leverage: {positions}")
+        else:
+            self.symbol_leverage.update({p['symbol']: parse_leverage(p['leverage']) for p in positions if 'leverage' in p})
+        prices = {} if isinstance(tickers, Exception) else {t['symbol']: t['price'] for t in tickers}
+
+        ready = [symbol for symbol in symbols if symbol not in unavailable]
+        errors = await asyncio.gather(*(self.ensure_leverage(symbol, config.LEVERAGE) for symbol in ready))
+        initialized = [symbol for symbol, error in zip(ready, errors) if error is None]
+        failed = [(symbol, error) for symbol, error in zip(ready, errors) if error is not None]
+
+        lines = [f"✅ Initialized {len(initialized)}/{len(symbols)} symbols (Leverage: {config.LEVERAGE}x)"]
+        lines += [f"{symbol}: {prices.get(symbol, 'n/a')}" for symbol in initialized]
+        if unavailable:
+            lines.append(f"⚠️ Not available for futures trading: {', '.join(unavailable)}")
+        lines += [f"❌ Failed to initialize {symbol}: {error}" for symbol, error in failed]
+        logger.info(f"Initialized {len(initialized)}/{len(symbols)} symbols, "
+                    f"{len(unavailable)} unavailable, {len(failed)} failed")
+        return "\n".join(lines)
+
+    async def ensure_leverage(self, symbol, leverage):
+        """ตั้ง leverage เฉพาะเมื่อค่าปัจจุบัน (จาก position information) ไม่ตรง - คืนข้อความ error หรือ None"""
+        if self.symbol_leverage.get(symbol) == leverage:
+            return None
+        try:
+            await self.safe_api_call(self.client.futures_change_leverage, symbol=symbol, leverage=leverage)
+            self.symbol_leverage[symbol] = leverage
+            logger.info(f"Set leverage for {symbol} to {leverage}x")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to set leverage for {symbol}: {str(e)}")
+            return str(e)
+
+    def target_leverage(self, symbol):
+        """leverage ที่ coin analysis แนะนำ (ไม่เกิน MAX_LEVERAGE)"""
+        recommendations = self.get_coin_recommendations(symbol).get('recommendations', {})
+        return int(min(recommendations.get('leverage', {}).get('recommended', config.LEVERAGE), config.MAX_LEVERAGE))
+
+    async def align_leverage(self):
+        """
+        ตั้ง leverage ตามคำแนะนำล่วงหน้า (นอก path ของ order) - symbol ที่มี position อยู่ไม่ถูกแตะ
+
+        place_order ใช้ leverage ที่ตั้งอยู่จริงจาก cache จึงไม่ต้องเรียก futures_change_leverage ก่อนส่ง order
+        """
+        symbols = [symbol for symbol in self.trading_pairs if symbol not in self.active_trades]
+        await asyncio.gather(*(self.ensure_leverage(symbol, self.target_leverage(symbol)) for symbol in symbols))
+
+    async def current_leverage(self, symbol):
+        """leverage ปัจจุบันจาก cache (ไม่มีใน cache -> ถาม position information ครั้งเดียว)"""
+        if symbol not in self.symbol_leverage:
+            position_info = await self.safe_api_call(self.client.futures_position_information, symbol=symbol)
+            self.symbol_leverage[symbol] = parse_leverage(position_info[0]['leverage']) if position_info else config.LEVERAGE
+        return self.symbol_leverage[symbol]
 
     def send_heartbeat(self):
         current_time = time.time()
@@ -203,39 +298,48 @@ class TradingBot:
             self.last_notification_time[symbol] = current_time
 
     def calculate_indicators(self, df):
-        # Calculate SMA with longer periods for smoother signals
-        df['sma20'] = df.ta.sma(length=25)  # Changed from 20 to 25
-        df['sma50'] = df.ta.sma(length=60)  # Changed from 50 to 60
+        if config.INDICATOR_BACKEND == 'numpy':
+            # Same indicators computed by the NumPy kernels (no pandas_ta accessor overhead)
+            kernels = indicator_kernels.calculate_indicators(
+                df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float),
+                df['close'].to_numpy(dtype=float), df['volume'].to_numpy(dtype=float)
+            )
+            for col, values in kernels.items():
+                df[col] = values
+        else:
+            # Calculate SMA with longer periods for smoother signals
+            df['sma20'] = df.ta.sma(length=25)  # Changed from 20 to 25
+            df['sma50'] = df.ta.sma(length=60)  # Changed from 50 to 60
         
-        # Calculate RSI with longer period for smoother signals
-        df['rsi'] = df.ta.rsi(length=28)
+            # Calculate RSI with longer period for smoother signals
+            df['rsi'] = df.ta.rsi(length=28)
         
-        # Calculate MACD with more relaxed parameters
-        macd = df.ta.macd(
-            fast=14,  # Changed from 12 to 14
-            slow=30,  # Changed from 26 to 30
-            signal=12  # Changed from 9 to 12
-        )
-        df['macd'] = macd['MACD_14_30_12']
-        df['macd_signal'] = macd['MACDs_14_30_12']
-        df['macd_hist'] = macd['MACDh_14_30_12']
+            # Calculate MACD with more relaxed parameters
+            macd = df.ta.macd(
+                fast=14,  # Changed from 12 to 14
+                slow=30,  # Changed from 26 to 30
+                signal=12  # Changed from 9 to 12
+            )
+            df['macd'] = macd['MACD_14_30_12']
+            df['macd_signal'] = macd['MACDs_14_30_12']
+            df['macd_hist'] = macd['MACDh_14_30_12']
         
-        # Calculate Bollinger Bands
-        bb = df.ta.bbands(length=20, std=2)
-        df['bb_upper'] = bb['BBU_20_2.0']
-        df['bb_middle'] = bb['BBM_20_2.0']
-        df['bb_lower'] = bb['BBL_20_2.0']
+            # Calculate Bollinger Bands
+            bb = df.ta.bbands(length=20, std=2)
+            df['bb_upper'] = bb['BBU_20_2.0']
+            df['bb_middle'] = bb['BBM_20_2.0']
+            df['bb_lower'] = bb['BBL_20_2.0']
         
-        # Calculate Stochastic Oscillator
-        stoch = df.ta.stoch(high='high', low='low', close='close', k=14, d=3)
-        df['stoch_k'] = stoch['STOCHk_14_3_3']
-        df['stoch_d'] = stoch['STOCHd_14_3_3']
+            # Calculate Stochastic Oscillator
+            stoch = df.ta.stoch(high='high', low='low', close='close', k=14, d=3)
+            df['stoch_k'] = stoch['STOCHk_14_3_3']
+            df['stoch_d'] = stoch['STOCHd_14_3_3']
         
-        # Calculate Williams %R
-        df['williams_r'] = df.ta.willr(high='high', low='low', close='close', length=14)
+            # Calculate Williams %R
+            df['williams_r'] = df.ta.willr(high='high', low='low', close='close', length=14)
         
-        # Calculate Volume SMA with longer period
-        df['volume_sma20'] = df.ta.sma(length=35, close='volume')  # Changed from 30 to 35
+            # Calculate Volume SMA with longer period
+            df['volume_sma20'] = df.ta.sma(length=35, close='volume')  # Changed from 30 to 35
         
         # Ensure all indicator columns are numeric and handle NaN values
         indicator_columns = ['sma20', 'sma50', 'rsi', 'macd', 'macd_signal', 'macd_hist', 
@@ -381,6 +485,15 @@ class TradingBot:
             logger.warning(f"Error in Fibonacci RSI signal calculation: {e}")
             return None
 
+    def calculate_adx(self, df):
+        """เพิ่มคอลัมน์ adx / plus_di / minus_di (ADX 14)"""
+        adx = ta.adx(high=df['high'].astype(float), low=df['low'].astype(float),
+                     close=df['close'].astype(float), length=14)
+        df['adx'] = adx['ADX_14']
+        df['plus_di'] = adx['DMP_14']
+        df['minus_di'] = adx['DMN_14']
+        return df
+
     def check_parabolic_sar_adx_signal(self, df):
         """Check Parabolic SAR + ADX signal"""
         try:
@@ -430,10 +543,7 @@ class TradingBot:
             df['sar'] = sar
             
             # Calculate ADX
-            adx = ta.adx(high=high, low=low, close=close, length=14)
-            df['adx'] = adx['ADX_14']
-            df['plus_di'] = adx['DMP_14']
-            df['minus_di'] = adx['DMN_14']
+            self.calculate_adx(df)
             
             current_price = float(close.iloc[-1])
             current_sar = float(sar[-1])
@@ -1099,16 +1209,191 @@ class TradingBot:
             logger.warning(f"Error in Momentum Acceleration signal calculation: {e}")
             return None
 
+    def evaluate_signals(self, df, current_price):
+        """
+        ส่วน CPU ของ check_market_conditions เป็น pipeline ที่ทำส่วนถูกก่อน และหยุดทันทีที่ stage ใด reject:
+
+        1. price_action   - sideways / RSI สุดขั้ว / volume / volatility จาก array ดิบ
+        2. trend_strength - ADX
+        3. momentum       - MACD-price alignment (หลัง calculate_indicators)
+        4. signal         - strategies + weighted / consensus
+
+        gate 1-3 เป็นเงื่อนไขเดียวกับ check_market_conditions_filter และไม่ขึ้นกับทิศทาง
+        การตัดสินใจจึงเหมือนเดิม (filter เคยรันหลัง strategies) แต่ candle ส่วนใหญ่จบที่ stage 1
+
+        ไม่แตะ state ของ bot และไม่ log ผลลัพธ์ (ผู้เรียก log เอง) จึงรันใน worker process ได้
+        """
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
+        rsi = indicator_kernels.rsi(close, 28)[-1] if len(close) else np.nan
+        current_rsi = 50.0 if np.isnan(rsi) else float(rsi)  # เหมือน fillna(50) ใน calculate_indicators
+        result = {
+            'current_rsi': current_rsi,
+            'signals': [],
+            'signals_dict': {},
+            'weighted_signal': None,
+            'confidence_score': 0.0,
+            'signal_strength': 0,
+            'consensus': None,
+            'trade_direction': None,
+            'filter_reason': None,
+            'rejected_stage': None,
+        }
+
+        def _reject(stage, reason):
+            result['rejected_stage'] = stage
+            result['filter_reason'] = reason
+            return result
+
+        try:
+            # Stage 1: อ่าน array ดิบอย่างเดียว (SMA / volume SMA ใช้แค่ค่าล่าสุด)
+            if len(close) < 60:
+                return _reject('price_action', f"Not enough candles ({len(close)})")
+            reason = (
+                self.gate_sideways(close[-1], close[-25:].mean(), close[-60:].mean())
+                or self.gate_extreme_rsi(current_rsi)
+                or self.gate_volume(volume[-1], volume[-35:].mean())
+                or self.gate_volatility(high[-5:], low[-5:], close[-1])
+            )
+            if reason:
+                return _reject('price_action', reason)
+
+            # Stage 2: ADX
+            df = self.calculate_adx(df)
+            current_adx = float(df['adx'].iloc[-1])
+            reason = self.gate_trend_strength(current_adx)
+            if reason:
+                return _reject('trend_strength', reason)
+
+            # Stage 3: indicators + MACD-price alignment
+            df = self.calculate_indicators(df)
+            result['current_rsi'] = float(df['rsi'].iloc[-1])
+            reason = self.gate_momentum(float(df['macd'].iloc[-1]), float(df['macd'].iloc[-2]),
+                                        close[-1], close[-2])
+            if reason:
+                return _reject('momentum', reason)
+        except Exception as e:
+            logger.warning(f"Error in market conditions filter: {e}")
+            return _reject('error', "Error in market analysis")
+
+        # Stage 4: strategies
+        signals_dict = {}
+        signals = []
+        directions = []
+        # Helper to append
+        def _add_signal(res, name):
+            signals_dict[name] = res  # Store raw result for weighted analysis
+            if res == "BUY":
+                signals.append(f"{name} (BUY)")
+                directions.append("BUY")
+            elif res == "SELL":
+                signals.append(f"{name} (SELL)")
+                directions.append("SELL")
+
+        # Evaluate indicators
+        # HIGH WIN RATE SIGNALS ONLY (เฉพาะสัญญาณที่แม่นสูง)
+        
+        # Core Technical Analysis (ความแม่นสูง)
+        _add_signal(self.check_macd_trend_signal(df), "MACD Trend")
+        _add_signal(self.check_bollinger_rsi_signal(df, current_price), "Bollinger RSI")
+        _add_signal(self.check_parabolic_sar_adx_signal(df), "Parabolic SAR ADX")
+        
+        # Volume & Momentum (แม่นในการยืนยัน)
+        _add_signal(self.check_volume_profile_signal(df), "Volume Profile")
+        _add_signal(self.check_obv_price_action_signal(df), "OBV Price Action")
+        _add_signal(self.check_strong_trend_signal(df), "Strong Trend")
+        
+        # Breakout & Emergency (สำหรับ high-probability entries)
+        _add_signal(self.check_breakout_signal(df), "Breakout")
+        _add_signal(self.check_emergency_signal(df), "Emergency")
+        
+        # Market Structure (Support/Resistance)
+        _add_signal(self.check_market_structure_signal(df), "Market Structure")
+        
+        # REMOVED LOW WIN RATE SIGNALS:
+        # - Stochastic Williams (เปลี่ยนแปลงบอย, false signals)
+        # - Momentum (ไม่มี confirmation, whipsaws)
+        # - Fibonacci RSI (ซับซ้อนเกินไป, unreliable)
+        # - Keltner CCI (false signals มาก)
+        # - Pivot Points RSI (ไม่แม่นในตลาด sideways)
+        # - Money Flow Volume (noise มาก)
+        # - ATR Moving Average (ช้าเกินไป, lagging)
+        # - RVI Stochastic (ไม่มี volume confirmation)
+        # - CCI Bollinger (oversensitive, too many signals)
+        # - Chaikin Money Flow MACD (ซับซ้อน, mixed results)
+        # - ROC MA Crossover (false crossovers, unreliable)
+        # - Momentum Acceleration (เปลี่ยนทิศทางเร็ว)
+        # - Order Flow (ใช้ข้อมูลไม่เพียงพอ)
+
+        # Get weighted signal with confidence score
+        weighted_signal, confidence_score = self.get_weighted_signal(signals_dict)
+        
+        # Calculate signal strength for the weighted signal
+        signal_strength = self.calculate_signal_strength(df, weighted_signal) if weighted_signal else 0
+
+        buy_count = directions.count("BUY")
+        sell_count = directions.count("SELL")
+        total_signals = len(directions)
+        
+        # HIGH WIN RATE CONSENSUS LOGIC
+        trade_direction = None
+        consensus = None
+        
+        # Method 1: Strong Weighted Signal (แม่นสูงสุด)
+        if weighted_signal and confidence_score > 0.35 and signal_strength > 40:
+            trade_direction = weighted_signal
+            consensus = f"🎯 STRONG Weighted Signal: {weighted_signal} (Confidence: {confidence_score:.2f}, Strength: {signal_strength})"
+        
+        # Method 2: Clear Majority with No Opposition (แม่นสูง)
+        elif buy_count >= 3 and sell_count == 0 and total_signals >= 4:
+            trade_direction = "BUY"
+            consensus = f"🟢 CLEAR BUY Consensus: {buy_count} BUY, {sell_count} SELL"
+        
+        elif sell_count >= 3 and buy_count == 0 and total_signals >= 4:
+            trade_direction = "SELL"
+            consensus = f"🔴 CLEAR SELL Consensus: {buy_count} BUY, {sell_count} SELL"
+        
+        # Method 3: Dominant Direction (70%+ agreement)
+        elif total_signals >= 5:
+            buy_percentage = buy_count / total_signals
+            sell_percentage = sell_count / total_signals
+            
+            if buy_percentage >= 0.7 and sell_percentage <= 0.1:
+                trade_direction = "BUY"  
+                consensus = f"🟢 DOMINANT BUY: {buy_percentage:.0%} agreement"
+                
+            elif sell_percentage >= 0.7 and buy_percentage <= 0.1:
+                trade_direction = "SELL"
+                consensus = f"🔴 DOMINANT SELL: {sell_percentage:.0%} agreement"
+        
+        # REMOVED: Low-confidence mixed signals จะไม่เข้า position
+
+        result.update({
+            'signals': signals,
+            'signals_dict': signals_dict,
+            'weighted_signal': weighted_signal,
+            'confidence_score': confidence_score,
+            'signal_strength': signal_strength,
+            'consensus': consensus,
+            'trade_direction': trade_direction,
+            # MARKET CONDITION FILTER ผ่านแล้วใน stage 1-3
+            'filter_reason': "Favorable market conditions",
+        })
+        if not trade_direction:
+            result['rejected_stage'] = 'signal'
+        return result
+
     async def check_market_conditions(self, symbol):
         try:
-            # ตรวจสอบ balance ก่อน
-            await self.update_account_balance()
+            # ตรวจสอบ balance ก่อน (account model - ดึงใหม่เมื่อเก่ากว่า ACCOUNT_REFRESH_INTERVAL)
+            await self.refresh_account()
             if self.account_balance is None:
                 logger.warning(f"Cannot check market conditions for {symbol}: Account balance is None")
                 return
             
-            account = await self.safe_api_call(self.client.futures_account)
-            available_balance = float(account['availableBalance'])
+            available_balance = self.available_balance
             
             if available_balance < 5:  # ขั้นต่ำ 5 USDT
                 logger.warning(f"Insufficient balance for trading: {available_balance} USDT")
@@ -1118,39 +1403,30 @@ class TradingBot:
             klines = await self.safe_api_call(
                 self.client.futures_klines,
                 symbol=symbol,
-                interval=Client.KLINE_INTERVAL_1MINUTE,
-                limit=100
+                interval=config.CANDLE_INTERVAL,
+                limit=101
             )
+            # ใช้เฉพาะแท่งที่ปิดแล้ว (แท่งที่ยังวิ่งอยู่ทำให้สัญญาณกระพริบ)
+            klines = self.closed_klines(klines)[-100:]
             
             if not klines:
                 logger.warning(f"No kline data available for {symbol}")
                 return
             
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            df['close'] = pd.to_numeric(df['close'])
-            df['high'] = pd.to_numeric(df['high'])
-            df['low'] = pd.to_numeric(df['low'])
-            df['volume'] = pd.to_numeric(df['volume'])
-            
-            current_price = float(df['close'].iloc[-1])
-            
-            # คำนวณ indicators
-            indicators = self.calculate_indicators(df)
-            current_rsi = indicators['rsi'].iloc[-1]
+            columns = klines_to_columns(klines)
+            current_price = float(columns['close'][-1])
+            self.last_prices[symbol] = (current_price, time.time())
+            self.activity.update(symbol, columns)
+            # แท่ง 1m ล่าสุดต่อให้ timeframe อื่นและเมตริกของ coin analysis ในเครื่อง (ไม่ต้องดึง REST เพิ่ม)
+            self.coin_analyzer.on_bars_closed(symbol, columns, config.CANDLE_INTERVAL)
             
             # ตรวจสอบ margin ก่อนที่จะทำการเทรด
             try:
-                # ดึง leverage ปัจจุบัน
-                position_info = await self.safe_api_call(self.client.futures_position_information, symbol=symbol)
-                current_leverage = float(position_info[0]['leverage']) if position_info else config.LEVERAGE
+                # leverage ปัจจุบัน (cache)
+                current_leverage = await self.current_leverage(symbol)
                 
                 # คำนวณ position size ที่ต้องการ
-                coin_recommendations = await self.get_coin_recommendations(symbol)
+                coin_recommendations = self.get_coin_recommendations(symbol)
                 position_size_multiplier = coin_recommendations.get('recommendations', {}).get('position_size_multiplier', 0.6)
                 
                 # คำนวณ margin requirement
@@ -1178,115 +1454,34 @@ class TradingBot:
                 logger.warning(f"Could not verify margin for {symbol}: {e}")
                 # ดำเนินการต่อแม้จะไม่สามารถตรวจสอบ margin ได้
             
-            # ตรวจสอบสัญญาณต่างๆ
-            signals_dict_local = {}
-            signals = []
-            directions = []
-            # Helper to append
-            def _add_signal(res, name):
-                signals_dict_local[name] = res  # Store raw result for weighted analysis
-                if res == "BUY":
-                    signals.append(f"{name} (BUY)")
-                    directions.append("BUY")
-                elif res == "SELL":
-                    signals.append(f"{name} (SELL)")
-                    directions.append("SELL")
-
-            # Evaluate indicators
-            # HIGH WIN RATE SIGNALS ONLY (เฉพาะสัญญาณที่แม่นสูง)
-            
-            # Core Technical Analysis (ความแม่นสูง)
-            _add_signal(self.check_macd_trend_signal(df), "MACD Trend")
-            _add_signal(self.check_bollinger_rsi_signal(df, current_price), "Bollinger RSI")
-            _add_signal(self.check_parabolic_sar_adx_signal(df), "Parabolic SAR ADX")
-            
-            # Volume & Momentum (แม่นในการยืนยัน)
-            _add_signal(self.check_volume_profile_signal(df), "Volume Profile")
-            _add_signal(self.check_obv_price_action_signal(df), "OBV Price Action")
-            _add_signal(self.check_strong_trend_signal(df), "Strong Trend")
-            
-            # Breakout & Emergency (สำหรับ high-probability entries)
-            _add_signal(self.check_breakout_signal(df), "Breakout")
-            _add_signal(self.check_emergency_signal(df), "Emergency")
-            
-            # Market Structure (Support/Resistance)
-            _add_signal(self.check_market_structure_signal(df), "Market Structure")
-            
-            # REMOVED LOW WIN RATE SIGNALS:
-            # - Stochastic Williams (เปลี่ยนแปลงบอย, false signals)
-            # - Momentum (ไม่มี confirmation, whipsaws)
-            # - Fibonacci RSI (ซับซ้อนเกินไป, unreliable)
-            # - Keltner CCI (false signals มาก)
-            # - Pivot Points RSI (ไม่แม่นในตลาด sideways)
-            # - Money Flow Volume (noise มาก)
-            # - ATR Moving Average (ช้าเกินไป, lagging)
-            # - RVI Stochastic (ไม่มี volume confirmation)
-            # - CCI Bollinger (oversensitive, too many signals)
-            # - Chaikin Money Flow MACD (ซับซ้อน, mixed results)
-            # - ROC MA Crossover (false crossovers, unreliable)
-            # - Momentum Acceleration (เปลี่ยนทิศทางเร็ว)
-            # - Order Flow (ใช้ข้อมูลไม่เพียงพอ)
-
-            # ส่งข้อมูล technical indicators
-            await self.send_technical_indicators(symbol, current_price, current_rsi)
-
-            # Enhanced signal analysis with weighted scoring
-            signals_dict = signals_dict_local.copy()
-
-            # Get weighted signal with confidence score
-            weighted_signal, confidence_score = self.get_weighted_signal(signals_dict)
-            
-            # Calculate signal strength for the weighted signal
-            if weighted_signal:
-                signal_strength = self.calculate_signal_strength(df, weighted_signal)
-                logger.info(f"🎯 Weighted Signal for {symbol}: {weighted_signal} (Confidence: {confidence_score:.2f}, Strength: {signal_strength}/100)")
-            else:
-                signal_strength = 0
+            # indicators + strategies เป็นงาน CPU: ส่งไปทำใน worker pool (event loop ว่างสำหรับ I/O)
+            result = await self.signal_pool.evaluate(columns, current_price)
+            signal_time = time.perf_counter()
+            signals = result['signals']
+            confidence_score = result['confidence_score']
+            signal_strength = result['signal_strength']
+            trade_direction = result['trade_direction']
 
-            buy_count = directions.count("BUY")
-            sell_count = directions.count("SELL")
-            total_signals = len(directions)
-            
-            # HIGH WIN RATE CONSENSUS LOGIC
-            trade_direction = None
-            
-            # Method 1: Strong Weighted Signal (แม่นสูงสุด)
-            if weighted_signal and confidence_score > 0.35 and signal_strength > 40:
-                trade_direction = weighted_signal
-                logger.info(f"🎯 STRONG Weighted Signal for {symbol}: {weighted_signal} (Confidence: {confidence_score:.2f}, Strength: {signal_strength})")
-            
-            # Method 2: Clear Majority with No Opposition (แม่นสูง)
-            elif buy_count >= 3 and sell_count == 0 and total_signals >= 4:
-                trade_direction = "BUY"
-                logger.info(f"🟢 CLEAR BUY Consensus for {symbol}: {buy_count} BUY, {sell_count} SELL")
-            
-            elif sell_count >= 3 and buy_count == 0 and total_signals >= 4:
-                trade_direction = "SELL"
-                logger.info(f"🔴 CLEAR SELL Consensus for {symbol}: {buy_count} BUY, {sell_count} SELL")
-            
-            # Method 3: Dominant Direction (70%+ agreement)
-            elif total_signals >= 5:
-                buy_percentage = buy_count / total_signals
-                sell_percentage = sell_count / total_signals
-                
-                if buy_percentage >= 0.7 and sell_percentage <= 0.1:
-                    trade_direction = "BUY"  
-                    logger.info(f"🟢 DOMINANT BUY for {symbol}: {buy_percentage:.0%} agreement")
-                    
-                elif sell_percentage >= 0.7 and buy_percentage <= 0.1:
-                    trade_direction = "SELL"
-                    logger.info(f"🔴 DOMINANT SELL for {symbol}: {sell_percentage:.0%} agreement")
-            
-            # REMOVED: Low-confidence mixed signals จะไม่เข้า position
-
-            # MARKET CONDITION FILTER (High Win Rate Check)
+            if result['rejected_stage']:
+                self.stage_rejections[result['rejected_stage']] += 1
+            if result['weighted_signal']:
+                logger.info(f"🎯 Weighted Signal for {symbol}: {result['weighted_signal']} (Confidence: {confidence_score:.2f}, Strength: {signal_strength}/100)")
+            if result['consensus']:
+                logger.info(f"{result['consensus']} for {symbol}")
             if trade_direction:
-                is_favorable, reason = self.check_market_conditions_filter(df) 
-                if not is_favorable:
-                    logger.info(f"⚠️ Skipping {symbol} - {reason}")
-                    trade_direction = None  # Cancel the trade
-                else:
-                    logger.info(f"✅ {symbol} - {reason}")
+                logger.info(f"✅ {symbol} - {result['filter_reason']}")
+            elif result['rejected_stage'] != 'signal':
+                logger.debug(f"⚠️ Skipping {symbol} at {result['rejected_stage']} stage - {result['filter_reason']}")
+
+            # MULTI-TIMEFRAME CONFIRMATION (แท่งจาก aggregator ไม่มี API call เพิ่ม)
+            if trade_direction and config.MTF_MIN_CONFIRM:
+                tf_signals = self.timeframe_signals(symbol)
+                if tf_signals:
+                    confirmed = self.confirm_signal_across_timeframes(tf_signals, config.MTF_MIN_CONFIRM)
+                    if confirmed != trade_direction.lower():
+                        logger.info(f"⚠️ Skipping {symbol} - {trade_direction} not confirmed across timeframes {tf_signals}")
+                        self.stage_rejections['timeframes'] += 1
+                        trade_direction = None
 
             if trade_direction:
                 logger.info(
@@ -1298,13 +1493,17 @@ class TradingBot:
                 if symbol not in self.active_trades:
                     if available_balance >= 5:
                         side = SIDE_BUY if trade_direction == "BUY" else SIDE_SELL
-                        await self.place_order(symbol, side, 0)
+                        # shield: timeout ของ symbol ต้องไม่ตัด order กลางทาง
+                        await asyncio.shield(self.open_position(symbol, side, signal_time=signal_time))
                     else:
                         logger.warning(f"Insufficient balance for {symbol}: {available_balance} USDT")
                 else:
                     logger.info(f"Position already exists for {symbol}")
             else:
                 logger.debug(f"No strong signal for {symbol}. Signals: {signals} | Confidence: {confidence_score:.2f}")
+
+            # ส่งข้อมูล technical indicators (หลังส่ง order - ไม่หน่วง path ของ order)
+            await self.send_technical_indicators(symbol, current_price, result['current_rsi'])
         except Exception as e:
             logger.error(f"Error checking market conditions for {symbol}: {str(e)}")
 
@@ -1316,8 +1515,10 @@ class TradingBot:
             
             # Test futures API specifically
             try:
-                # Get futures account information
-                account = await self.safe_api_call(self.client.futures_account)
+                # Get futures account information and API permissions together
+                account, api_permissions = await asyncio.gather(
+                    self.safe_api_call(self.client.futures_account),
+                    self.safe_api_call(self.client.get_account_api_permissions))
                 logger.info("Futures Account Information:")
                 logger.info(f"Total Wallet Balance: {account['totalWalletBalance']} USDT")
                 logger.info(f"Available Balance: {account['availableBalance']} USDT")
@@ -1331,7 +1532,6 @@ class TradingBot:
                     logger.warning("Futures trading is not enabled for this account")
                     
                 # Check API permissions
-                api_permissions = await self.safe_api_call(self.client.get_account_api_permissions)
                 logger.info("API Permissions:")
                 logger.info(f"Enable Reading: {api_permissions.get('enableReading', False)}")
                 logger.info(f"Enable Futures: {api_permissions.get('enableFutures', False)}")
@@ -1339,6 +1539,7 @@ class TradingBot:
                 
                 if not api_permissions.get('enableFutures', False):
                     raise Exception("Futures trading is not enabled in API permissions")
+                return account
                     
             except Exception as e:
                 logger.error(f"Futures API Error: {str(e)}")
@@ -1348,11 +1549,23 @@ class TradingBot:
             logger.error(f"Failed to verify API connection: {str(e)}")
             raise Exception("Failed to connect to Binance API. Please check your API keys and permissions.")
 
-    async def update_account_balance(self):
+    async def refresh_account(self, max_age=None):
+        """refresh account model เมื่อเก่ากว่า ACCOUNT_REFRESH_INTERVAL วินาที (ยังใหม่ -> ไม่มี request)"""
+        max_age = config.ACCOUNT_REFRESH_INTERVAL if max_age is None else max_age
+        if self.available_balance is None or time.time() - self.account_time >= max_age:
+            await self.update_account_balance()
+
+    async def update_account_balance(self, account=None):
         try:
-            account = await self.safe_api_call(self.client.futures_account)
+            if account is None:
+                account = await self.safe_api_call(self.client.futures_account)
             self.account_balance = float(account['totalWalletBalance'])
             available_balance = float(account['availableBalance'])
+            self.available_balance = available_balance
+            self.account_time = time.time()
+            for position in account.get('positions', []):
+                if 'leverage' in position:
+                    self.symbol_leverage[position['symbol']] = parse_leverage(position['leverage'])
             unrealized_profit = float(account['totalUnrealizedProfit'])
             margin_balance = float(account['totalMarginBalance'])
             
@@ -1360,6 +1573,7 @@ class TradingBot:
             if self.initial_balance is None:
                 self.initial_balance = self.account_balance
                 logger.info(f"💰 Initial balance set for risk management: {self.initial_balance:.2f} USDT")
+            self.performance_stats.update_balance(time.time(), self.account_balance)
             
             logger.info("Detailed Balance Information:")
             logger.info(f"Total Wallet Balance: {self.account_balance} USDT")
@@ -1420,7 +1634,7 @@ class TradingBot:
             logger.info("🔄 เริ่มวิเคราะห์เหรียญ...")
             await self.notification.notify("🔄 กำลังวิเคราะห์เหรียญเพื่อคำนวณ order size และ leverage...")
             
-            self.coin_analyses = await self.coin_analyzer.analyze_all_coins(config.TRADING_PAIRS)
+            self.coin_analyses = await self.coin_analyzer.analyze_all_coins(self.trading_pairs)
             self.last_analysis_time = current_time
             
             # ส่งรายงานสรุป
@@ -1435,37 +1649,81 @@ class TradingBot:
             await self.notification.notify(f"❌ เกิดข้อผิดพลาดในการวิเคราะห์เหรียญ: {e}")
             return {}
 
-    async def get_coin_recommendations(self, symbol: str) -> Dict:
-        """ดึงคำแนะนำสำหรับเหรียญเฉพาะ"""
-        if not self.coin_analyses or symbol not in self.coin_analyses:
-            await self.analyze_coins()
-        
-        return self.coin_analyses.get(symbol, {})
+    async def screen_universe(self):
+        """
+        จัดอันดับ USDT-M perpetual ทั้งหมดจาก bulk endpoints (3 requests) แล้วปรับ self.trading_pairs
+
+        exchangeInfo ใช้ cache เดียวกับ initialize (ดึงใหม่ตาม EXCHANGE_INFO_TTL)
+        symbol ที่มี position เปิดอยู่ไม่ถูก demote, symbol ใหม่ถูกตั้ง leverage ผ่าน initialize
+        """
+        try:
+            exchange_info, tickers, premium_index = await asyncio.gather(
+                self.get_exchange_info(),
+                self.safe_api_call(self.client.futures_ticker),
+                self.safe_api_call(self.client.futures_mark_price),
+            )
+            ranked = self.screener.rank(exchange_info, tickers, premium_index)
+            active, promoted, demoted = self.screener.update(ranked, pinned=self.active_trades)
+            logger.info(f"Screened {len(ranked)} symbols: {len(active)} active")
+            if not promoted and not demoted:
+                return
+            self.trading_pairs = active
+            summary = await self.initialize(promoted) if promoted else None
+            message = "🔭 Universe screener\n"
+            if promoted:
+                message += f"➕ {', '.join(promoted)}\n"
+            if demoted:
+                message += f"➖ {', '.join(demoted)}\n"
+            if summary:
+                message += summary
+            logger.info(message)
+            await self.notification.notify(message)
+        except Exception as e:
+            logger.error(f"Error screening universe: {str(e)}")
+
+    def get_coin_recommendations(self, symbol: str) -> Dict:
+        """
+        ดึงคำแนะนำสำหรับเหรียญเฉพาะจากผลวิเคราะห์ในหน่วยความจำ (ไม่ทำ I/O - เรียกก่อนส่ง order ได้)
+
+        ยังไม่มีผลวิเคราะห์ -> คืนค่าแบบอนุรักษ์นิยมทันที และวิเคราะห์เฉพาะ symbol นี้ใน background
+        """
+        analysis = self.coin_analyzer.cached_analysis(symbol)
+        if analysis is None:
+            analysis = self.coin_analyses.get(symbol)
+        if analysis is None:
+            return self.coin_analyzer._get_default_analysis(symbol)
+        return analysis
 
     async def calculate_position_size(self, symbol, current_price):
+        """
+        คำนวณขนาด position จาก state ใน cache (account model, exchangeInfo, leverage ปัจจุบัน)
+
+        ดึงจาก exchange เฉพาะเมื่อ cache ยังว่าง - บน path ปกติไม่มี request ก่อนส่ง order
+        """
         try:
-            await self.update_account_balance()
+            if self.available_balance is None:
+                await self.update_account_balance()
             if self.account_balance is None:
                 logger.error("Cannot calculate position size: Account balance is None")
                 return None
             
-            account = await self.safe_api_call(self.client.futures_account)
-            available_balance = float(account['availableBalance'])
+            available_balance = self.available_balance
             if available_balance <= 0:
                 logger.warning(f"Insufficient available balance: {available_balance} USDT")
                 return None
             
             # ดึงคำแนะนำจาก coin analysis
-            coin_recommendations = await self.get_coin_recommendations(symbol)
+            coin_recommendations = self.get_coin_recommendations(symbol)
             position_size_multiplier = coin_recommendations.get('recommendations', {}).get('position_size_multiplier', config.POSITION_SIZE_MULTIPLIER)
-            leverage_recommendation = coin_recommendations.get('recommendations', {}).get('leverage', {}).get('recommended', config.LEVERAGE)
             
-            # จำกัด leverage ให้อยู่ในขีดจำกัดที่ปลอดภัย
-            max_safe_leverage = min(leverage_recommendation, config.MAX_LEVERAGE)
+            # leverage ที่ตั้งอยู่จริง (align_leverage ปรับตามคำแนะนำไว้ล่วงหน้า นอก path ของ order)
+            max_safe_leverage = await self.current_leverage(symbol)
+            if max_safe_leverage != self.target_leverage(symbol):
+                logger.debug(f"{symbol} leverage {max_safe_leverage}x differs from recommended {self.target_leverage(symbol)}x")
             
-            # Get symbol info for margin requirements
-            symbol_info = await self.safe_api_call(self.client.futures_exchange_info)
-            symbol_filters = next(filter(lambda x: x['symbol'] == symbol, symbol_info['symbols']))
+            # Get symbol info for margin requirements (exchangeInfo จาก cache)
+            await self.get_exchange_info()
+            symbol_filters = self.symbols_info[symbol]
             lot_size_filter = next(filter(lambda x: x['filterType'] == 'LOT_SIZE', symbol_filters['filters']))
             step_size = float(lot_size_filter['stepSize'])
             
@@ -1480,13 +1738,6 @@ class TradingBot:
             # คำนวณ maximum position value ที่อนุญาต
             max_position_value = available_balance * max_position_percent
             
-            # ตั้ง leverage เป็นค่าที่เหมาะสม
-            try:
-                await self.safe_api_call(self.client.futures_change_leverage, symbol=symbol, leverage=max_safe_leverage)
-                logger.info(f"Set leverage for {symbol} to {max_safe_leverage}x")
-            except Exception as e:
-                logger.warning(f"Failed to set leverage for {symbol}: {e}")
-            
             # คำนวณ margin requirement
             margin_requirement = 1.0 / max_safe_leverage
             
@@ -1540,13 +1791,6 @@ class TradingBot:
                 )
                 return None
             
-            # ส่งข้อมูลการวิเคราะห์
-            analysis_notes = coin_recommendations.get('recommendations', {}).get('notes', [])
-            if analysis_notes:
-                await self.notification.notify(
-                    f"📊 การวิเคราะห์ {symbol}:\n" + "\n".join(analysis_notes[:3])
-                )
-            
             logger.info(f"✅ Final position size for {symbol}: {quantity} (Price: {current_price}, Notional: {final_notional:.2f} USDT, Margin: {final_margin:.2f} USDT)")
             return quantity
             
@@ -1580,7 +1824,36 @@ class TradingBot:
         with open(history_file, "w") as f:
             json.dump(history, f)
 
-    async def place_order(self, symbol, side, quantity):
+    def signal_price(self, symbol):
+        """ราคาที่ใช้ตัดสินสัญญาณล่าสุดของ symbol (None ถ้าเก่ากว่า ORDER_PRICE_MAX_AGE วินาที)"""
+        price, updated = self.last_prices.get(symbol, (None, 0))
+        if price is None or time.time() - updated > config.ORDER_PRICE_MAX_AGE:
+            return None
+        return price
+
+    def record_order_latency(self, symbol, seconds):
+        self.order_latency.append(seconds)
+        logger.info(f"⏱️ Signal-to-order latency for {symbol}: {seconds * 1000:.1f} ms")
+
+    def order_latency_stats(self) -> Dict:
+        """p50 / p95 / max ของ signal-to-order latency (ms) จาก order ล่าสุด"""
+        if not self.order_latency:
+            return {'count': 0}
+        samples = np.array(self.order_latency) * 1000
+        return {
+            'count': len(samples),
+            'p50_ms': float(np.percentile(samples, 50)),
+            'p95_ms': float(np.percentile(samples, 95)),
+            'max_ms': float(samples.max()),
+        }
+
+    async def place_order(self, symbol, side, quantity, signal_time=None):
+        """
+        วาง market order แบบ fast path: ราคา, balance, leverage และ lot size มาจาก state ใน cache
+        request เดียวบน path ปกติคือ futures_create_order
+
+        signal_time: time.perf_counter() ตอนสัญญาณเกิด -> บันทึก signal-to-order latency
+        """
         try:
             # Check circuit breaker first
             if config.CIRCUIT_BREAKER_ENABLED and self.circuit_breaker_triggered:
@@ -1588,17 +1861,20 @@ class TradingBot:
                 await self.notification.notify(f"🚨 Trading stopped: Circuit breaker is active")
                 return None
             
-            ticker = await self.safe_api_call(self.client.futures_symbol_ticker, symbol=symbol)
-            current_price = float(ticker['price'])
+            # ราคาที่ใช้ตัดสินสัญญาณ (ไม่มี / เก่าเกินไป -> ดึง ticker)
+            current_price = self.signal_price(symbol)
+            if current_price is None:
+                ticker = await self.safe_api_call(self.client.futures_symbol_ticker, symbol=symbol)
+                current_price = float(ticker['price'])
             
-            # ตรวจสอบ balance ก่อน
-            await self.update_account_balance()
+            # ตรวจสอบ balance ก่อน (account model)
+            if self.available_balance is None:
+                await self.update_account_balance()
             if self.account_balance is None:
                 await self.notification.notify(f"❌ Cannot place order for {symbol}: Account balance is None")
                 return None
             
-            account = await self.safe_api_call(self.client.futures_account)
-            available_balance = float(account['availableBalance'])
+            available_balance = self.available_balance
             
             if available_balance <= 0:
                 await self.notification.notify(
@@ -1656,38 +1932,51 @@ class TradingBot:
                 return None
             
             # ตรวจสอบ margin อีกครั้งก่อนวาง order
+            required_margin = 0.0
             try:
-                # ดึง leverage ปัจจุบัน
-                position_info = await self.safe_api_call(self.client.futures_position_information, symbol=symbol)
-                current_leverage = float(position_info[0]['leverage']) if position_info else config.LEVERAGE
-                margin_requirement = 1.0 / current_leverage
-                required_margin = notional_value * margin_requirement
-                
-                if required_margin > available_balance:
-                    await self.notification.notify(
-                        f"❌ Cannot place order for {symbol}:\n"
-                        f"Insufficient margin for order.\n"
-                        f"Available balance: {available_balance:.2f} USDT\n"
-                        f"Required margin: {required_margin:.2f} USDT\n"
-                        f"Notional value: {notional_value:.2f} USDT\n"
-                        f"Leverage: {current_leverage}x"
-                    )
-                    return None
-                
-                logger.info(f"✅ Margin check passed for {symbol}: Required={required_margin:.2f} USDT, Available={available_balance:.2f} USDT")
-                
+                # leverage ปัจจุบัน (cache)
+                current_leverage = await self.current_leverage(symbol)
+                required_margin = notional_value / current_leverage
             except Exception as e:
                 logger.warning(f"Could not verify margin for {symbol}: {e}")
                 # ดำเนินการต่อแม้จะไม่สามารถตรวจสอบ margin ได้
             
-            # วาง order
-            order = await self.safe_api_call(
-                self.client.futures_create_order,
-                symbol=symbol,
-                side=side,
-                type=FUTURE_ORDER_TYPE_MARKET,
-                quantity=quantity
-            )
+            # ตรวจ + จอง margin ใน account model ภายใต้ trades_lock (order ที่วิ่งพร้อมกันเห็นยอดที่เหลือจริง)
+            async with self.trades_lock:
+                available_balance = self.available_balance
+                reserved = required_margin <= available_balance
+                if reserved:
+                    self.available_balance -= required_margin
+            if not reserved:
+                await self.notification.notify(
+                    f"❌ Cannot place order for {symbol}:\n"
+                    f"Insufficient margin for order.\n"
+                    f"Available balance: {available_balance:.2f} USDT\n"
+                    f"Required margin: {required_margin:.2f} USDT\n"
+                    f"Notional value: {notional_value:.2f} USDT\n"
+                    f"Leverage: {current_leverage}x"
+                )
+                return None
+            logger.info(f"✅ Margin check passed for {symbol}: Required={required_margin:.2f} USDT, Available={available_balance:.2f} USDT")
+            
+            # วาง order นอก lock (ไม่หน่วงหลัง ack - latency วัดถึงตอน order ถูกรับ)
+            try:
+                order = await self.safe_api_call(
+                    self.client.futures_create_order,
+                    symbol=symbol,
+                    side=side,
+                    type=FUTURE_ORDER_TYPE_MARKET,
+                    quantity=quantity,
+                    pause=0
+                )
+            except Exception:
+                self.available_balance += required_margin  # order ไม่ผ่าน - คืน margin ที่จองไว้
+                raise
+            latency = time.perf_counter() - signal_time if signal_time is not None else None
+            if latency is not None:
+                self.record_order_latency(symbol, latency)
+            # account model: margin ที่จองไว้ถูกใช้แล้ว - ดึงจาก exchange ใหม่รอบถัดไป
+            self.account_time = 0
             
             # Update daily trade count
             self.daily_trades_count += 1
@@ -1710,13 +1999,19 @@ class TradingBot:
                 order_id=order.get('orderId'),
                 reason="Manual"
             )
-            await self.notification.notify(
+            message = (
                 f"✅ New {position_side} position opened for {symbol}\n"
                 f"Entry Price: {entry_price}\n"
                 f"Quantity: {quantity}\n"
                 f"Notional Value: {notional_value:.2f} USDT\n"
                 f"Daily Trades: {self.daily_trades_count}/{config.MAX_DAILY_TRADES}"
             )
+            if latency is not None:
+                message += f"\nSignal → Order: {latency * 1000:.0f} ms"
+            analysis_notes = self.get_coin_recommendations(symbol).get('recommendations', {}).get('notes', [])
+            if analysis_notes:
+                message += f"\n📊 การวิเคราะห์ {symbol}:\n" + "\n".join(analysis_notes[:3])
+            await self.notification.notify(message)
             logger.info(f"Order placed successfully: {order}")
             return order
         except Exception as e:
@@ -1724,7 +2019,34 @@ class TradingBot:
             await self.notification.notify(f"Failed to place order: {str(e)}")
             return None
 
+    async def open_position(self, symbol, side, signal_time=None):
+        """
+        เปิด position ถ้ายังไม่มี
+
+        trades_lock ครอบแค่การตรวจและจอง symbol - order ส่งนอก lock จึงไม่ต่อคิวกับ symbol อื่น
+        """
+        async with self.trades_lock:
+            if symbol in self.active_trades or symbol in self.pending_orders:
+                logger.info(f"Position already exists for {symbol}")
+                return None
+            self.pending_orders.add(symbol)
+        try:
+            return await self.place_order(symbol, side, 0, signal_time=signal_time)
+        finally:
+            self.pending_orders.discard(symbol)
+
     async def close_position(self, symbol):
+        """ปิด position (จอง symbol ภายใต้ trades_lock, ส่ง order นอก lock)"""
+        async with self.trades_lock:
+            if symbol not in self.active_trades or symbol in self.pending_orders:
+                return
+            self.pending_orders.add(symbol)
+        try:
+            await self._close_position(symbol)
+        finally:
+            self.pending_orders.discard(symbol)
+
+    async def _close_position(self, symbol):
         try:
             trade = self.active_trades[symbol]
             side = SIDE_SELL if trade['position_side'] == "LONG" else SIDE_BUY
@@ -1736,9 +2058,11 @@ class TradingBot:
                 quantity=trade['quantity']
             )
             current_price = float(order['avgPrice'])
+            self.account_time = 0  # margin คืนแล้ว - account model ดึงใหม่รอบถัดไป
             pnl = (current_price - trade['entry_price']) * trade['quantity']
             if trade['position_side'] == "SHORT":
                 pnl = -pnl
+            self.performance_stats.record_trade(pnl, trade.get('strategy'), time.time())
             
             # Update daily PnL
             if self.update_daily_pnl(pnl):
@@ -1770,43 +2094,175 @@ class TradingBot:
             await self.notification.notify(f"Failed to close position: {str(e)}")
 
     async def setup_bot(self):
-        """Async setup method to be called after bot creation"""
-        await self.verify_api_connection()
-        await self.update_account_balance()
-        # วิเคราะห์เหรียญครั้งแรก
-        await self.analyze_coins()
+        """
+        Async setup method to be called after bot creation
+
+        หลังตรวจ API แล้ว balance, การเตรียม symbol และผลวิเคราะห์เหรียญทำพร้อมกัน
+        แล้วส่งแจ้งเตือนเริ่มต้นรวมข้อความเดียว
+        """
+        self.loop = asyncio.get_running_loop()
+        account = await self.verify_api_connection()
+        _, summary, _ = await asyncio.gather(
+            self.update_account_balance(account),
+            self.initialize(),
+            self.prepare_coin_analyses())
+        await self.align_leverage()
+        self.setup_complete = True
+        await self.notification.notify(
+            "🤖 Trading Bot Started\n"
+            f"Trailing Stop: {config.TRAILING_STOP_PERCENTAGE}%\n"
+            f"Min Notional: ${config.MIN_NOTIONAL}\n"
+            f"{summary}"
+        )
+
+    async def prepare_coin_analyses(self):
+        """วิเคราะห์เหรียญครั้งแรก (มี snapshot ที่ยังใหม่ -> ใช้เลย แล้วตรวจใหม่ใน background)"""
+        if self.coin_analyses or not self.load_coin_snapshot():
+            await self.analyze_coins()
+
+    def save_coin_snapshot(self):
+        """บันทึกผลวิเคราะห์ + แท่ง / metrics ของ CoinAnalyzer สำหรับ warm restart"""
+        try:
+            self.snapshot_store.save('coin_analyzer', self.coin_analyzer.snapshot_state())
+            self.last_snapshot_time = time.time()
+        except Exception as e:
+            logger.error(f"Error saving coin analysis snapshot: {str(e)}")
+
+    def load_coin_snapshot(self) -> bool:
+        """
+        โหลด snapshot ของ CoinAnalyzer แทนการวิเคราะห์ทุกเหรียญใหม่ตอน start
+
+        ทุก symbol ถูก refresh ใน background (ดึงแค่แท่ง 1m ที่ขาดไประหว่างปิด) ระหว่างนั้นใช้ผลจาก snapshot
+        """
+        try:
+            state = self.snapshot_store.load('coin_analyzer')
+            if not state:
+                return False
+            restored = self.coin_analyzer.restore_state(state, config.COIN_SNAPSHOT_MAX_AGE)
+            if not restored:
+                return False
+            self.coin_analyses = {symbol: self.coin_analyzer.coin_analysis_cache.get(symbol, allow_stale=True)
+                                  for symbol in restored}
+            self.last_analysis_time = time.time()
+            for symbol in self.trading_pairs:
+                self.coin_analyzer.schedule_refresh(symbol)
+            age = (time.time() - state['saved_at']) / 60
+            logger.info(f"♻️ Loaded coin analysis snapshot: {len(restored)} symbols, {age:.0f} min old - revalidating in background")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading coin analysis snapshot: {str(e)}")
+            return False
 
     async def run(self):
-        await self.setup_bot()
-        await self.initialize()
+        if not self.setup_complete:
+            await self.setup_bot()
         
         # วิเคราะห์เหรียญทุกชั่วโมง
         last_analysis = time.time()
         
         while True:
             try:
+                # ประเมินเต็มรูปแบบเมื่อแท่งปิด, ระหว่างแท่งเช็คแค่ exit
+                event, close_ms = await self.scheduler.wait(
+                    lambda: self.safe_api_call(self.client.get_server_time))
                 self.send_heartbeat()
+                if event != EVENT_CANDLE_CLOSE:
+                    await self.check_exits()
+                    continue
                 
                 # วิเคราะห์เหรียญทุกชั่วโมง
                 current_time = time.time()
                 if current_time - last_analysis >= self.analysis_interval:
                     await self.analyze_coins()
+                    await self.align_leverage()
                     last_analysis = current_time
                 
-                for symbol in config.TRADING_PAIRS:
-                    await self.check_market_conditions(symbol)
-                    
-                await asyncio.sleep(1)  # Check every second
+                # symbol ที่เคลื่อนไหว / มี position ถูกประเมินถี่กว่า symbol ที่เงียบ
+                # ปรับชุด symbol จาก USDT-M perpetual ทั้งหมด (ถ้าเปิดใช้)
+                if config.UNIVERSE_SCREENER and current_time - self.last_screen_time >= config.UNIVERSE_SCREEN_INTERVAL:
+                    await self.screen_universe()
+                    self.last_screen_time = current_time
+                
+                symbols = self.activity.select(self.trading_pairs, close_ms // self.scheduler.interval_ms,
+                                               self.active_trades)
+                logger.debug(f"Evaluating {len(symbols)}/{len(self.trading_pairs)} symbols this candle")
+                await self.evaluate_symbols(symbols)
+                
+                if time.time() - self.last_snapshot_time >= config.COIN_SNAPSHOT_INTERVAL:
+                    self.save_coin_snapshot()
             except Exception as e:
                 logger.error(f"Error in main loop: {str(e)}")
                 await self.notification.notify(f"Error in main loop: {str(e)}")
                 await asyncio.sleep(5)  # Wait before retrying
 
+    def closed_klines(self, klines):
+        """ตัดแท่งที่ยังไม่ปิด (close_time หลังเวลา server ปัจจุบัน) ออก"""
+        now_ms = self.scheduler.server_now_ms()
+        return [k for k in klines if int(k[6]) <= now_ms]
+
+    async def check_exits(self):
+        """
+        เช็ค take-profit / trailing stop ระหว่างแท่งด้วย ticker call เดียว (ไม่คำนวณ indicators)
+        """
+        if not self.active_trades:
+            return
+        try:
+            tickers = await self.safe_api_call(self.client.futures_symbol_ticker)
+            prices = {t['symbol']: float(t['price']) for t in tickers}
+            trail = config.TRAILING_STOP_PERCENTAGE / 100
+            take_profit = config.TAKE_PROFIT_PERCENTAGE / 100
+            for symbol, trade in list(self.active_trades.items()):
+                price = prices.get(symbol)
+                if price is None:
+                    continue
+                entry = trade['entry_price']
+                if trade['position_side'] == "LONG":
+                    peak = trade['peak_price'] = max(trade.get('peak_price', entry), price)
+                    tp_hit = price >= entry * (1 + take_profit)
+                    stop_hit = price <= peak * (1 - trail)
+                else:
+                    peak = trade['peak_price'] = min(trade.get('peak_price', entry), price)
+                    tp_hit = price <= entry * (1 - take_profit)
+                    stop_hit = price >= peak * (1 + trail)
+                if tp_hit or stop_hit:
+                    logger.info(f"🚪 Exit for {symbol} at {price}: {'take profit' if tp_hit else 'trailing stop'}")
+                    await self.close_position(symbol)
+        except Exception as e:
+            logger.error(f"Error checking exits: {str(e)}")
+
+    async def evaluate_symbol(self, symbol, semaphore):
+        async with semaphore:
+            try:
+                await asyncio.wait_for(self.check_market_conditions(symbol), self.symbol_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱️ {symbol} evaluation timed out after {self.symbol_timeout}s")
+
+    async def evaluate_symbols(self, symbols):
+        """
+        ตรวจทุก symbol พร้อมกัน (สูงสุด max_concurrent_symbols)
+
+        เวลาต่อรอบจึงขึ้นกับ symbol ที่ช้าที่สุด ไม่ใช่ผลรวมของทุก symbol
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_symbols)
+        results = await asyncio.gather(
+            *(self.evaluate_symbol(symbol, semaphore) for symbol in symbols),
+            return_exceptions=True,
+        )
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error evaluating {symbol}: {str(result)}")
+
     def save_status(self, running=True):
         status = {
             "running": running,
             "active_trades_count": len(self.active_trades),
             "total_pnl": self.calculate_total_pnl(),
+            "total_trades": self.performance_stats.total_trades,
+            "win_rate": self.performance_stats.win_rate,
+            "max_drawdown_pct": self.performance_stats.max_drawdown * 100,
+            "stage_rejections": dict(self.stage_rejections),
+            "coin_analysis_cache": self.coin_analyzer.cache_stats(),
+            "order_latency": self.order_latency_stats(),
             "last_update": time.strftime("%Y-%m-%d %H:%M:%S"),
         }
         with open("bot_status.json", "w") as f:
@@ -1826,8 +2282,29 @@ class TradingBot:
             json.dump(trades, f)
 
     def calculate_total_pnl(self):
-        # This is a placeholder. You can implement real P&L calculation if you store trade history.
-        return 0.0
+        """Realized P&L ของ trades ที่ปิดตั้งแต่บอทเริ่มทำงาน"""
+        return self.performance_stats.total_pnl
+
+    def timeframe_signals(self, symbol):
+        """
+        ทิศทาง trend ของแต่ละ timeframe ใน MTF_CONFIRM_TIMEFRAMES จากแท่งที่ปิดแล้วใน aggregator
+        'buy': close > EMA20 > EMA50, 'sell': close < EMA20 < EMA50, นอกนั้น 'hold'
+        """
+        signals = {}
+        for tf in config.MTF_CONFIRM_TIMEFRAMES:
+            columns = self.coin_analyzer.aggregator.columns(symbol, tf)
+            if columns is None or len(columns['close']) < 50:
+                continue
+            close = columns['close']
+            fast = indicator_kernels.ema(close, 20)[-1]
+            slow = indicator_kernels.ema(close, 50)[-1]
+            if close[-1] > fast > slow:
+                signals[tf] = 'buy'
+            elif close[-1] < fast < slow:
+                signals[tf] = 'sell'
+            else:
+                signals[tf] = 'hold'
+        return signals
 
     def confirm_signal_across_timeframes(self, tf_signals, min_confirm=2):
         """
@@ -2191,6 +2668,49 @@ class TradingBot:
             logger.warning(f"Error in weighted signal calculation: {e}")
             return (None, 0)
 
+    # ---- market condition gates (ใช้ร่วมกันระหว่าง check_market_conditions_filter และ pipeline ใน evaluate_signals)
+    # แต่ละ gate คืนเหตุผลที่ปฏิเสธ หรือ None ถ้าผ่าน
+
+    def gate_sideways(self, current_price, sma20_current, sma50_current):
+        # Price should be clearly above or below key SMAs
+        price_vs_sma20 = abs(current_price - sma20_current) / sma20_current * 100
+        price_vs_sma50 = abs(current_price - sma50_current) / sma50_current * 100
+        if price_vs_sma20 < 1.0 and price_vs_sma50 < 1.5:
+            return "Price stuck between SMAs - sideways market"
+        return None
+
+    def gate_trend_strength(self, current_adx):
+        if current_adx < 20:
+            return f"Weak trend strength (ADX: {current_adx:.1f})"
+        return None
+
+    def gate_extreme_rsi(self, current_rsi):
+        # likely reversal zones
+        if current_rsi > 80 or current_rsi < 15:
+            return f"Extreme RSI zone (RSI: {current_rsi:.1f})"
+        return None
+
+    def gate_volume(self, current_volume, avg_volume_20):
+        volume_ratio = current_volume / avg_volume_20
+        if volume_ratio < 0.8:  # Low volume = unreliable signals
+            return f"Low volume (Volume ratio: {volume_ratio:.2f})"
+        return None
+
+    def gate_volatility(self, recent_highs, recent_lows, current_price):
+        # Look for clean price movements (no excessive whipsaws)
+        price_range = (recent_highs.max() - recent_lows.min()) / current_price * 100
+        if price_range > 8:  # Too volatile
+            return f"High volatility (Range: {price_range:.1f}%)"
+        return None
+
+    def gate_momentum(self, macd_current, macd_prev, current_price, previous_price):
+        # Check MACD-Price alignment
+        macd_trend = "UP" if macd_current > macd_prev else "DOWN"
+        price_trend = "UP" if current_price > previous_price else "DOWN"
+        if macd_trend != price_trend:
+            return "MACD-Price divergence detected"
+        return None
+
     def check_market_conditions_filter(self, df):
         """
         Advanced market condition filter for high win rate
@@ -2201,61 +2721,28 @@ class TradingBot:
             volume = df['volume'].astype(float)
             current_rsi = float(df['rsi'].iloc[-1])
             current_adx = float(df['adx'].iloc[-1]) if 'adx' in df.columns else 25
-            
-            # 1. Avoid Choppy/Sideways Markets
-            sma20 = df['sma20'].astype(float)
-            sma50 = df['sma50'].astype(float)
-            
-            # Check if price is stuck between SMAs (sideways)
             current_price = float(close.iloc[-1])
-            sma20_current = float(sma20.iloc[-1])
-            sma50_current = float(sma50.iloc[-1])
-            
-            # Price should be clearly above or below key SMAs
-            price_vs_sma20 = abs(current_price - sma20_current) / sma20_current * 100
-            price_vs_sma50 = abs(current_price - sma50_current) / sma50_current * 100
-            
-            if price_vs_sma20 < 1.0 and price_vs_sma50 < 1.5:
-                return False, "Price stuck between SMAs - sideways market"
-            
-            # 2. Require Minimum Trend Strength (ADX)
-            if current_adx < 20:
-                return False, f"Weak trend strength (ADX: {current_adx:.1f})"
-            
-            # 3. Avoid Extreme RSI (likely reversal zones)
-            if current_rsi > 80 or current_rsi < 15:
-                return False, f"Extreme RSI zone (RSI: {current_rsi:.1f})"
-            
-            # 4. Volume Confirmation Required
-            current_volume = float(volume.iloc[-1])
-            avg_volume_20 = float(df['volume_sma20'].iloc[-1])
-            volume_ratio = current_volume / avg_volume_20
-            
-            if volume_ratio < 0.8:  # Low volume = unreliable signals
-                return False, f"Low volume (Volume ratio: {volume_ratio:.2f})"
-            
-            # 5. Price Action Quality Check
-            # Look for clean price movements (no excessive whipsaws)
-            recent_highs = df['high'].tail(5).astype(float)
-            recent_lows = df['low'].tail(5).astype(float)
-            
-            # Calculate volatility
-            price_range = (recent_highs.max() - recent_lows.min()) / current_price * 100
-            if price_range > 8:  # Too volatile
-                return False, f"High volatility (Range: {price_range:.1f}%)"
             
+            reason = (
+                # 1. Avoid Choppy/Sideways Markets
+                self.gate_sideways(current_price, float(df['sma20'].iloc[-1]), float(df['sma50'].iloc[-1]))
+                # 2. Require Minimum Trend Strength (ADX)
+                or self.gate_trend_strength(current_adx)
+                # 3. Avoid Extreme RSI (likely reversal zones)
+                or self.gate_extreme_rsi(current_rsi)
+                # 4. Volume Confirmation Required
+                or self.gate_volume(float(volume.iloc[-1]), float(df['volume_sma20'].iloc[-1]))
+                # 5. Price Action Quality Check
+                or self.gate_volatility(df['high'].tail(5).astype(float), df['low'].tail(5).astype(float),
+                                        current_price)
+            )
             # 6. Momentum Consistency Check
-            if 'macd' in df.columns:
+            if not reason and 'macd' in df.columns:
                 macd_line = df['macd'].astype(float)
-                macd_current = float(macd_line.iloc[-1])
-                macd_prev = float(macd_line.iloc[-2])
-                macd_trend = "UP" if macd_current > macd_prev else "DOWN"
-                
-                # Check MACD-Price alignment
-                price_trend = "UP" if current_price > float(close.iloc[-2]) else "DOWN"
-                
-                if macd_trend != price_trend:
-                    return False, "MACD-Price divergence detected"
+                reason = self.gate_momentum(float(macd_line.iloc[-1]), float(macd_line.iloc[-2]),
+                                            current_price, float(close.iloc[-2]))
+            if reason:
+                return False, reason
             
             return True, "Favorable market conditions"
             
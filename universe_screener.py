@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Universe Screener - เลือกชุด symbol ที่เทรดจาก USDT-M perpetual ทั้งหมดของ Binance
+
+ใช้ bulk endpoint 3 ตัวต่อรอบ (ไม่ต้องเรียกทีละ symbol):
+- futures_exchange_info: symbol ที่เป็น PERPETUAL / USDT / TRADING
+- futures_ticker (ไม่ระบุ symbol): 24h quote volume, high / low, % เปลี่ยนแปลง
+- futures_mark_price (ไม่ระบุ symbol): funding rate ล่าสุด
+
+ทุก symbol ได้คะแนนจาก percentile ของสภาพคล่อง, ความผันผวน และความแรงของเทรนด์ (NumPy ครั้งเดียว)
+ชุดที่เทรดเปลี่ยนแบบมี hysteresis: เข้าเมื่อติดอันดับ max_symbols, ออกเมื่อหลุดอันดับ exit_rank
+ติดต่อกัน demote_after รอบ - symbol ที่ติดขอบไม่สลับเข้าออกทุกรอบ
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from coin_scoring import percentile_rank
+
+
+def eligible_symbols(exchange_info: Dict, quote_asset: str = 'USDT') -> List[str]:
+    """USDT-M perpetual ที่เปิดเทรดอยู่"""
+    return [s['symbol'] for s in exchange_info.get('symbols', [])
+            if s.get('contractType') == 'PERPETUAL' and s.get('quoteAsset') == quote_asset
+            and s.get('status') == 'TRADING']
+
+
+class UniverseScreener:
+    def __init__(self, max_symbols: int = 35, exit_rank: int = 50, demote_after: int = 3,
+                 min_quote_volume: float = 50_000_000, max_abs_funding: float = 0.001):
+        """
+        Args:
+            max_symbols: ขนาดชุดที่เทรด (อันดับ 1..max_symbols ถูก promote)
+            exit_rank: symbol ในชุดที่อันดับแย่กว่านี้นับเป็นรอบที่หลุด
+            demote_after: หลุดติดต่อกันกี่รอบจึงถูก demote
+            min_quote_volume: 24h quote volume (USDT) ขั้นต่ำ
+            max_abs_funding: |funding rate| สูงสุด (ตลาดที่ฝั่งเดียวแน่นเกินไปถูกตัด)
+        """
+        self.max_symbols = max_symbols
+        self.exit_rank = max(exit_rank, max_symbols)
+        self.demote_after = demote_after
+        self.min_quote_volume = min_quote_volume
+        self.max_abs_funding = max_abs_funding
+        self.active: List[str] = []
+        self.misses: Dict[str, int] = {}
+
+    def rank(self, exchange_info: Dict, tickers: List[Dict], premium_index: List[Dict]) -> List[Dict]:
+        """
+        จัดอันดับ symbol ที่ผ่านเกณฑ์ (ดีที่สุดก่อน)
+
+        Returns:
+            [{'symbol', 'score', 'quote_volume', 'volatility', 'change', 'funding'}, ...]
+        """
+        eligible = set(eligible_symbols(exchange_info))
+        funding_by_symbol = {p['symbol']: float(p.get('lastFundingRate') or 0) for p in premium_index}
+        rows = [t for t in tickers if t['symbol'] in eligible]
+        if not rows:
+            return []
+
+        symbols = np.array([t['symbol'] for t in rows])
+        quote_volume = np.array([float(t['quoteVolume']) for t in rows])
+        high = np.array([float(t['highPrice']) for t in rows])
+        low = np.array([float(t['lowPrice']) for t in rows])
+        last = np.array([float(t['lastPrice']) for t in rows])
+        change = np.array([float(t['priceChangePercent']) for t in rows])
+        funding = np.array([funding_by_symbol.get(t['symbol'], 0.0) for t in rows])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volatility = np.where(last > 0, (high - low) / last * 100, np.nan)
+        keep = (quote_volume >= self.min_quote_volume) & (np.abs(funding) <= self.max_abs_funding) & ~np.isnan(volatility)
+        if not keep.any():
+            return []
+        symbols, quote_volume, volatility, change, funding = (
+            symbols[keep], quote_volume[keep], volatility[keep], change[keep], funding[keep])
+
+        # สภาพคล่องสำคัญที่สุด (slippage / ความเสี่ยงปิด position ไม่ได้) แล้วจึงความเคลื่อนไหว
+        score = (0.5 * percentile_rank(np.log(quote_volume))
+                 + 0.25 * percentile_rank(volatility)
+                 + 0.25 * percentile_rank(np.abs(change)))
+        order = np.argsort(-score, kind='stable')
+        return [{
+            'symbol': str(symbols[i]),
+            'score': float(score[i]),
+            'quote_volume': float(quote_volume[i]),
+            'volatility': float(volatility[i]),
+            'change': float(change[i]),
+            'funding': float(funding[i]),
+        } for i in order]
+
+    def update(self, ranked: List[Dict], pinned: Iterable[str] = ()) -> Tuple[List[str], List[str], List[str]]:
+        """
+        ปรับชุดที่เทรดตามอันดับรอบนี้
+
+        Args:
+            ranked: ผลของ rank()
+            pinned: symbol ที่ห้าม demote (เช่นมี position เปิดอยู่)
+
+        Returns:
+            (active, promoted, demoted)
+        """
+        if not ranked:
+            return list(self.active), [], []  # ข้อมูลรอบนี้ใช้ไม่ได้ - คงชุดเดิม
+        position = {row['symbol']: i + 1 for i, row in enumerate(ranked)}
+        pinned = set(pinned)
+
+        demoted = []
+        for symbol in self.active:
+            if symbol in pinned or position.get(symbol, len(ranked) + 1) <= self.exit_rank:
+                self.misses.pop(symbol, None)
+                continue
+            self.misses[symbol] = self.misses.get(symbol, 0) + 1
+            if self.misses[symbol] >= self.demote_after:
+                demoted.append(symbol)
+        for symbol in demoted:
+            self.active.remove(symbol)
+            self.misses.pop(symbol, None)
+
+        promoted = []
+        for row in ranked[:self.max_symbols]:
+            if len(self.active) >= self.max_symbols:
+                break
+            if row['symbol'] not in self.active:
+                self.active.append(row['symbol'])
+                promoted.append(row['symbol'])
+        return list(self.active), promoted, demoted
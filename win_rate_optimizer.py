@@ -6,6 +6,7 @@ Win Rate Optimizer - เครื่องมือปรับปรุง Win
 import json
 import os
 from datetime import datetime
+from backtest_store import BacktestResultStore
 
 class WinRateOptimizer:
     def __init__(self):
@@ -70,10 +71,12 @@ class WinRateOptimizer:
     def analyze_current_performance(self):
         """วิเคราะห์ performance ปัจจุบัน"""
         try:
-            if os.path.exists('backtest_report.json'):
+            results = BacktestResultStore().load_summary('backtest_report')
+            if results is None and os.path.exists('backtest_report.json'):
                 with open('backtest_report.json', 'r') as f:
                     results = json.load(f)
-                    
+            
+            if results is not None:
                 current_win_rate = results.get('win_rate_pct', 0)
                 print(f"📊 Win Rate ปัจจุบัน: {current_win_rate:.2f}%")
                 